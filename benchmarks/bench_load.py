@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+End-to-end load test of the summarizer against the local stub server.
+
+Generates a synthetic vault, starts stub_openai_server.py in-process with
+the requested latency and fault injection, and runs the normal
+process_dates pipeline against it. Reports journal throughput, the run
+metrics (stage latency percentiles, tokens, retries) and the responses the
+stub served, as JSON. Runs are reproducible with --seed and need no
+network access or API key.
+
+Usage:
+    python benchmarks/bench_load.py [--days N] [--concurrency N]
+        [--latency lognormal:800:0.6] [--error-rate P] [--rate-limit-prob P]
+        [--rate-limit-burst N] [--rpm N] [--max-prompt-chars N] [--no-stream]
+        [--pipeline-workers N]
+"""
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import contextlib
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'src'))
+sys.path.insert(0, BENCH_DIR)
+
+from synthetic_vault import generate_vault  # noqa: E402
+from stub_openai_server import StubOpenAIServer  # noqa: E402
+from main import setup_services, collect_dates, process_dates  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--files-per-day', type=int, default=2)
+    parser.add_argument('--file-kb', type=float, default=10)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--latency', default='lognormal:500:0.5')
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit-prob', type=float, default=0.0)
+    parser.add_argument('--rate-limit-burst', type=int, default=1)
+    parser.add_argument('--rpm', type=int)
+    parser.add_argument('--max-prompt-chars', type=int)
+    parser.add_argument('--no-stream', action='store_true')
+    parser.add_argument('--pipeline-workers', type=int, default=0,
+                        help="Preprocess in this many processes (PIPELINE_WORKERS)")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--verbose', action='store_true', help="Show the pipeline's own output")
+    args = parser.parse_args()
+
+    server = StubOpenAIServer(latency=args.latency, error_rate=args.error_rate,
+                              rate_limit_prob=args.rate_limit_prob, rate_limit_burst=args.rate_limit_burst,
+                              rpm=args.rpm, max_prompt_chars=args.max_prompt_chars, seed=args.seed)
+    output = sys.stdout if args.verbose else io.StringIO()
+    with server, tempfile.TemporaryDirectory() as root:
+        config = generate_vault(root, args.days, args.files_per_day, int(args.file_kb * 1000),
+                                organized=True, seed=args.seed)
+        config.update({
+            'OPENAI_BASE_URL': server.base_url,
+            # Let the handler's own retry logic see every injected failure
+            'OPENAI_SDK_MAX_RETRIES': 0,
+            'RESPONSE_CACHE': False,
+            'STREAM_RESPONSES': not args.no_stream,
+            'MAX_CONCURRENCY': args.concurrency,
+            'PIPELINE_WORKERS': args.pipeline_workers,
+        })
+        with contextlib.redirect_stdout(output):
+            reader, summarizer = setup_services(config)
+            dates = collect_dates(reader)
+            start = time.perf_counter()
+            processed, failed, skipped = process_dates(reader, summarizer, dates, args.concurrency)
+            elapsed = time.perf_counter() - start
+
+    metrics = summarizer.metrics.summary()
+    report = {
+        'params': {k: v for k, v in vars(args).items() if k != 'verbose'},
+        'elapsed_seconds': round(elapsed, 3),
+        'journals_per_second': round(processed / elapsed, 3) if elapsed else None,
+        'processed': processed,
+        'failed': failed,
+        'skipped': skipped,
+        'stages': metrics['stages'],
+        'counters': metrics['counters'],
+        'server': server.stats(),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
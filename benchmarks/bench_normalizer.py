@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for transcript preprocessing.
+
+Compares the NLTK-based 'compat' pipeline with the single-pass 'fast'
+tokenizer and reports MB/s for each, plus how closely the outputs agree.
+
+Usage:
+    python benchmarks/bench_normalizer.py                 # synthetic transcript
+    python benchmarks/bench_normalizer.py FILE [FILE...]  # real transcripts
+    python benchmarks/bench_normalizer.py --diff FILE     # show compat vs fast diff
+"""
+import os
+import sys
+import json
+import time
+import random
+import difflib
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from utils.text_normalizer import TextNormalizer  # noqa: E402
+
+WORDS = ("so I was thinking we could walk the dog after lunch and then maybe "
+         "call my doctor about the blood sugar numbers I don't know if that's "
+         "too much for today but it's fine we'll see how I feel at 3:30 "
+         "journal weight steps anxiety meeting coffee Larry Bruce okay yeah").split()
+
+
+def synthetic_transcript(size_bytes, seed=7):
+    """Build a speech-to-text style transcript of roughly size_bytes."""
+    rng = random.Random(seed)
+    lines = []
+    total = 0
+    while total < size_bytes:
+        line = "- " + " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 24))) + "."
+        if rng.random() < 0.2:
+            line += " you know, you know, right, right."
+        lines.append(line)
+        total += len(line) + 1
+    return "\n".join(lines)
+
+
+def measure(normalizer, texts, repeat=3):
+    """Return (best seconds, outputs) for normalizing all texts."""
+    best = None
+    outputs = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        outputs = [normalizer.normalize(text) for text in texts]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, outputs
+
+
+def agreement(a_outputs, b_outputs):
+    """Token-level similarity ratio between two sets of outputs."""
+    a_tokens = " ".join(a_outputs).split()
+    b_tokens = " ".join(b_outputs).split()
+    return difflib.SequenceMatcher(None, a_tokens, b_tokens, autojunk=False).ratio()
+
+
+def main(argv):
+    if argv and argv[0] == '--diff':
+        for path in argv[1:]:
+            with open(path, 'r', encoding='utf-8') as f:
+                text = f.read()
+            compat = TextNormalizer('compat').normalize(text).split()
+            fast = TextNormalizer('fast').normalize(text).split()
+            sys.stdout.writelines(line + "\n" for line in difflib.unified_diff(
+                compat, fast, f"{path} (compat)", f"{path} (fast)", lineterm=""))
+        return
+
+    if argv:
+        texts = []
+        for path in argv:
+            with open(path, 'r', encoding='utf-8') as f:
+                texts.append(f.read())
+    else:
+        texts = [synthetic_transcript(200_000, seed=i) for i in range(5)]
+    megabytes = sum(len(t.encode('utf-8')) for t in texts) / 1_000_000
+
+    results = {'input_mb': round(megabytes, 3)}
+    fast_seconds, fast_outputs = measure(TextNormalizer('fast'), texts)
+    results['fast_mb_per_s'] = round(megabytes / fast_seconds, 2)
+    try:
+        compat_seconds, compat_outputs = measure(TextNormalizer('compat'), texts, repeat=1)
+    except LookupError as e:
+        # NLTK tokenizer data is not installed on this host
+        results['compat_error'] = str(e).strip().splitlines()[0]
+    else:
+        results['compat_mb_per_s'] = round(megabytes / compat_seconds, 2)
+        results['speedup'] = round(compat_seconds / fast_seconds, 1)
+        results['token_agreement'] = round(agreement(compat_outputs, fast_outputs), 4)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Stage-by-stage benchmark of the summarization pipeline on a synthetic vault.
+
+Each run generates a fresh vault (see synthetic_vault.py) and times the
+stages that do not involve the model: file organization, the cold and warm
+directory scan, date collection, stopword/repetition preprocessing, ingesting
+into and reading from the SQLite transcript store, saving journals and
+loading the journal catalog. The best time of --repeat
+runs is reported for every stage as JSON.
+
+Results can be appended to a JSON lines history with --save and checked
+against the latest comparable entry of a history with --compare, which exits
+non-zero when a stage is more than --tolerance slower.
+
+Usage:
+    python benchmarks/bench_pipeline.py [--days N] [--files-per-day N] [--file-kb N]
+                                        [--repeat N] [--save FILE] [--compare FILE]
+"""
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import contextlib
+import subprocess
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'src'))
+sys.path.insert(0, BENCH_DIR)
+
+from synthetic_vault import generate_vault  # noqa: E402
+from main import collect_dates  # noqa: E402
+from directory_reader import DirectoryReader  # noqa: E402
+from services.summarizer import Summarizer  # noqa: E402
+from utils.file_organizer import FileOrganizer  # noqa: E402
+
+# Stages faster than this are too noisy to flag as regressions
+NOISE_FLOOR_SECONDS = 0.005
+
+
+@contextlib.contextmanager
+def timed(results, stage):
+    """Record the wall time of the block under results[stage], with its output silenced."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        yield
+        results[stage] = time.perf_counter() - start
+
+
+def backdate_directories(root, seconds=3600):
+    """Move directory mtimes into the past so the date index treats them as settled."""
+    past = time.time() - seconds
+    for dirpath, _, _ in os.walk(root):
+        os.utime(dirpath, (past, past))
+
+
+def run_pipeline(root, days, files_per_day, file_size):
+    """Generate a vault under root and return {stage: seconds}."""
+    config = generate_vault(root, days, files_per_day, file_size)
+    config['RESPONSE_CACHE'] = False
+    results = {}
+
+    with timed(results, 'organize'):
+        FileOrganizer().organize_all_directories(config)
+    backdate_directories(root)
+
+    with timed(results, 'scan_cold'):
+        reader = DirectoryReader(config)
+        reader.refresh_index()
+    with timed(results, 'scan_warm'):
+        reader = DirectoryReader(config)
+        reader.refresh_index()
+
+    with timed(results, 'collect_dates'):
+        dates = collect_dates(reader)
+
+    with timed(results, 'preprocess'):
+        for date in dates:
+            reader.read_bee_data_for_date(date)
+            reader.read_limitless_data_for_date(date)
+
+    # The same reads served from the SQLite transcript store
+    store_config = dict(config, TRANSCRIPT_STORE='sqlite')
+    with timed(results, 'store_ingest'):
+        store_reader = DirectoryReader(store_config)
+        store_reader.refresh_index()
+    with timed(results, 'store_warm'):
+        store_reader = DirectoryReader(store_config)
+        store_reader.refresh_index()
+    with timed(results, 'store_read'):
+        for date in dates:
+            store_reader.read_bee_data_for_date(date)
+            store_reader.read_limitless_data_for_date(date)
+    store_reader.store.close()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        summarizer = Summarizer(config)
+    summary = "# Journal\n\n" + "A synthetic journal entry. " * 200
+    with timed(results, 'save_summary'):
+        for date in dates:
+            summarizer.save_summary(summary, date)
+
+    with timed(results, 'load_existing_files'):
+        summarizer._load_existing_files()
+
+    with timed(results, 'rebuild_catalog'):
+        summarizer.catalog.rebuild()
+
+    return results
+
+
+def git_commit():
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCH_DIR,
+                                capture_output=True, text=True, check=True)
+        return result.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_baseline(path, params):
+    """Return the latest record in a JSON lines history with the same parameters, or None."""
+    baseline = None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    if record.get('params') == params:
+                        baseline = record
+    except FileNotFoundError:
+        return None
+    return baseline
+
+
+def compare(report, baseline, tolerance):
+    """Return {stage: ratio} for stages slower than the baseline by more than tolerance."""
+    regressions = {}
+    for stage, seconds in report['stages'].items():
+        previous = baseline['stages'].get(stage)
+        if not previous or seconds < NOISE_FLOOR_SECONDS:
+            continue
+        ratio = seconds / previous
+        if ratio > 1 + tolerance:
+            regressions[stage] = round(ratio, 2)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--days', type=int, default=60)
+    parser.add_argument('--files-per-day', type=int, default=4)
+    parser.add_argument('--file-kb', type=float, default=20)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--save', metavar='FILE', help="Append the result to a JSON lines history")
+    parser.add_argument('--compare', metavar='FILE', help="Fail if slower than the latest comparable entry")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="Allowed slowdown before a stage counts as a regression (default: 0.25)")
+    args = parser.parse_args()
+
+    params = {'days': args.days, 'files_per_day': args.files_per_day, 'file_kb': args.file_kb}
+    file_size = int(args.file_kb * 1000)
+
+    best = {}
+    for _ in range(args.repeat):
+        with tempfile.TemporaryDirectory() as root:
+            for stage, seconds in run_pipeline(root, args.days, args.files_per_day, file_size).items():
+                best[stage] = min(seconds, best.get(stage, seconds))
+
+    source_mb = 2 * args.days * args.files_per_day * file_size / 1_000_000
+    report = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': sys.version.split()[0],
+        'params': params,
+        'stages': {stage: round(seconds, 5) for stage, seconds in best.items()},
+        'preprocess_mb_per_s': round(source_mb / best['preprocess'], 2),
+    }
+
+    exit_code = 0
+    if args.compare:
+        baseline = load_baseline(args.compare, params)
+        if baseline is None:
+            report['regressions'] = None
+        else:
+            report['baseline_commit'] = baseline.get('commit')
+            report['regressions'] = compare(report, baseline, args.tolerance)
+            exit_code = 1 if report['regressions'] else 0
+
+    print(json.dumps(report, indent=2))
+    if args.save:
+        with open(args.save, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({k: v for k, v in report.items() if k != 'regressions'}) + "\n")
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
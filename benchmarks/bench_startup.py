@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Startup budget check for `python src/main.py`.
+
+Spawns a fresh interpreter that performs the same imports as main.py and
+then runs the first directory scan (FileOrganizer over an empty directory),
+timing the whole thing from process launch. Exits non-zero when the median
+exceeds the budget.
+
+Usage:
+    python benchmarks/bench_startup.py [--budget SECONDS] [--runs N]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+CHILD = """
+import sys
+sys.path.insert(0, {src!r})
+import main
+from utils.file_organizer import FileOrganizer
+FileOrganizer().organize_directory({scan_dir!r})
+print(int('nltk' in sys.modules), int('openai' in sys.modules))
+"""
+
+
+def time_startup(scan_dir):
+    """Return (seconds, nltk_loaded, openai_loaded) for one cold start."""
+    code = CHILD.format(src=SRC_DIR, scan_dir=scan_dir)
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    elapsed = time.perf_counter() - start
+    nltk_loaded, openai_loaded = result.stdout.split()[-2:]
+    return elapsed, nltk_loaded == '1', openai_loaded == '1'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--budget', type=float, default=0.5, help="Median seconds allowed (default: 0.5)")
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scan_dir:
+        samples = [time_startup(scan_dir) for _ in range(args.runs)]
+
+    median = statistics.median(s[0] for s in samples)
+    report = {
+        'median_seconds': round(median, 3),
+        'max_seconds': round(max(s[0] for s in samples), 3),
+        'budget_seconds': args.budget,
+        'nltk_imported': samples[-1][1],
+        'openai_imported': samples[-1][2],
+        'within_budget': median <= args.budget,
+    }
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if report['within_budget'] else 1)
+
+
+if __name__ == "__main__":
+    main()
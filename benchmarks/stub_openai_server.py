@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Local OpenAI-compatible stub server for load and failure testing.
+
+Implements POST /v1/chat/completions (plain and streamed) with canned
+journal-like responses, so the summarizer can be pointed at it through the
+OPENAI_BASE_URL config key. Latency, 429 bursts, 5xx errors and
+context-length failures can be injected, and a requests-per-minute limit
+returns x-ratelimit-* headers like the real API. Prompt prefix caching is
+emulated: usage reports cached_tokens for the prefix shared with a recent
+prompt (from 1024 tokens, in 128-token steps, at ~4 chars per token).
+GET /stats reports what was served.
+
+Latency specs (milliseconds):
+    fixed:MS            every response takes MS
+    uniform:LOW:HIGH    uniformly distributed
+    lognormal:MEDIAN:SIGMA
+                        long-tailed, like real completions
+
+Usage:
+    python benchmarks/stub_openai_server.py [--port 8089] [--latency lognormal:800:0.6]
+        [--error-rate 0.05] [--rate-limit-prob 0.02 --rate-limit-burst 5]
+        [--rpm 500] [--max-prompt-chars 400000] [--seed 1]
+"""
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import os
+import threading
+from collections import deque, Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WORDS = ("today I walked the dog had coffee with a friend talked about work "
+         "checked blood sugar felt tired in the afternoon but better after "
+         "dinner and planned tomorrow").split()
+
+
+def parse_latency(spec):
+    """Return a function rng -> seconds for a latency spec like 'uniform:100:400'."""
+    kind, _, args = (spec or 'fixed:0').partition(':')
+    values = [float(v) for v in args.split(':') if v]
+    if kind == 'fixed' and len(values) == 1:
+        return lambda rng: values[0] / 1000
+    if kind == 'uniform' and len(values) == 2:
+        return lambda rng: rng.uniform(values[0], values[1]) / 1000
+    if kind == 'lognormal' and len(values) == 2:
+        return lambda rng: rng.lognormvariate(math.log(values[0]), values[1]) / 1000
+    raise ValueError(f"Invalid latency spec: {spec!r}")
+
+
+class StubOpenAIServer:
+    """
+    Threaded chat-completions stub with fault injection.
+
+    Run in-process with start()/stop() (or as a context manager) and point
+    the client at .base_url.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, latency='fixed:0', error_rate=0.0,
+                 rate_limit_prob=0.0, rate_limit_burst=1, rpm=None, max_prompt_chars=None,
+                 response_words=200, token_delay_ms=0.0, retry_after_ms=1000, seed=None):
+        self.latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.rate_limit_prob = rate_limit_prob
+        self.rate_limit_burst = rate_limit_burst
+        self.rpm = rpm
+        self.max_prompt_chars = max_prompt_chars
+        self.response_words = response_words
+        self.token_delay = token_delay_ms / 1000
+        self.retry_after_ms = retry_after_ms
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counts = Counter()
+        self.burst_remaining = 0
+        self.window = deque()
+        self.recent_prompts = deque(maxlen=64)
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def stats(self):
+        with self.lock:
+            return dict(self.counts)
+
+    def decide(self, prompt_chars):
+        """
+        Pick the outcome of one request.
+
+        Returns:
+            tuple: (status, latency_seconds, rate_limit_headers)
+        """
+        with self.lock:
+            self.counts['requests'] += 1
+            latency = self.latency(self.rng)
+            headers = self._rate_limit_headers()
+
+            if self.max_prompt_chars and prompt_chars > self.max_prompt_chars:
+                status = 400
+            elif self._window_full():
+                status = 429
+            elif self.burst_remaining > 0:
+                self.burst_remaining -= 1
+                status = 429
+            elif self.rng.random() < self.rate_limit_prob:
+                self.burst_remaining = self.rate_limit_burst - 1
+                status = 429
+            elif self.rng.random() < self.error_rate:
+                status = self.rng.choice((500, 502, 503))
+            else:
+                status = 200
+                if self.rpm:
+                    self.window.append(time.monotonic())
+                    headers = self._rate_limit_headers()
+            self.counts[str(status)] += 1
+            return status, latency, headers
+
+    def _window_full(self):
+        return bool(self.rpm) and len(self.window) >= self.rpm
+
+    def _rate_limit_headers(self):
+        """x-ratelimit-* headers for the sliding one-minute request window."""
+        if not self.rpm:
+            return {}
+        now = time.monotonic()
+        while self.window and now - self.window[0] >= 60:
+            self.window.popleft()
+        reset = 60 - (now - self.window[0]) if self.window else 0.0
+        return {
+            'x-ratelimit-limit-requests': str(self.rpm),
+            'x-ratelimit-remaining-requests': str(max(0, self.rpm - len(self.window))),
+            'x-ratelimit-reset-requests': f"{reset:.3f}s",
+        }
+
+    def cached_prefix_tokens(self, prompt):
+        """Tokens of the prompt covered by the prefix cache, remembering the prompt for later requests."""
+        with self.lock:
+            shared = max((len(os.path.commonprefix([prompt, earlier])) for earlier in self.recent_prompts),
+                         default=0)
+            self.recent_prompts.append(prompt)
+        tokens = shared // 4
+        cached = 0 if tokens < 1024 else tokens // 128 * 128
+        if cached:
+            with self.lock:
+                self.counts['cached_tokens'] += cached
+        return cached
+
+    def completion_text(self):
+        with self.lock:
+            words = [self.rng.choice(WORDS) for _ in range(self.response_words)]
+        return "# Journal\n\n" + " ".join(words).capitalize() + "."
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.rstrip('/') == '/stats':
+                    self._send_json(200, server.stats())
+                else:
+                    self._send_json(404, _error("Not found", 'invalid_request_error'))
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                try:
+                    body = json.loads(self.rfile.read(length) or b'{}')
+                except ValueError:
+                    self._send_json(400, _error("Invalid JSON body", 'invalid_request_error'))
+                    return
+                if not self.path.rstrip('/').endswith('/chat/completions'):
+                    self._send_json(404, _error(f"Unknown endpoint {self.path}", 'invalid_request_error'))
+                    return
+
+                messages = body.get('messages') or []
+                prompt = "".join(m.get('content') or '' for m in messages)
+                prompt_chars = len(prompt)
+                status, latency, headers = server.decide(prompt_chars)
+                time.sleep(latency)
+
+                if status == 400:
+                    self._send_json(400, _error(
+                        f"This model's maximum context length is {server.max_prompt_chars // 4} tokens. "
+                        f"However, your messages resulted in {prompt_chars // 4} tokens.",
+                        'invalid_request_error', 'context_length_exceeded'), headers)
+                elif status == 429:
+                    headers = dict(headers, **{
+                        'retry-after': str(math.ceil(server.retry_after_ms / 1000)),
+                        'retry-after-ms': str(server.retry_after_ms),
+                    })
+                    self._send_json(429, _error("Rate limit reached for requests", 'requests',
+                                                'rate_limit_exceeded'), headers)
+                elif status != 200:
+                    self._send_json(status, _error("The server had an error while processing your request",
+                                                   'server_error'), headers)
+                elif body.get('stream'):
+                    self._stream(body, prompt_chars, server.cached_prefix_tokens(prompt), headers)
+                else:
+                    self._send_json(200, _completion(body, server.completion_text(), prompt_chars,
+                                                     server.cached_prefix_tokens(prompt)), headers)
+
+            def _send_json(self, status, payload, headers=None):
+                data = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _stream(self, body, prompt_chars, cached_tokens, headers):
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Transfer-Encoding', 'chunked')
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                created = int(time.time())
+                text = server.completion_text()
+                for i, token in enumerate(text.split(' ')):
+                    if i and server.token_delay:
+                        time.sleep(server.token_delay)
+                    self._write_chunk(_event(_chunk(body, created, {'content': token if i == 0 else ' ' + token})))
+                self._write_chunk(_event(_chunk(body, created, {}, 'stop')))
+                if (body.get('stream_options') or {}).get('include_usage'):
+                    usage_chunk = dict(_chunk(body, created, {}), choices=[],
+                                       usage=_completion(body, text, prompt_chars, cached_tokens)['usage'])
+                    self._write_chunk(_event(usage_chunk))
+                self._write_chunk(b"data: [DONE]\n\n")
+                self.wfile.write(b"0\r\n\r\n")
+
+            def _write_chunk(self, data):
+                self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+
+        return Handler
+
+
+def _error(message, error_type, code=None):
+    return {'error': {'message': message, 'type': error_type, 'param': None, 'code': code}}
+
+
+def _completion(body, text, prompt_chars, cached_tokens=0):
+    prompt_tokens = prompt_chars // 4
+    completion_tokens = len(text) // 4
+    return {
+        'id': f"chatcmpl-stub{random.getrandbits(32):08x}",
+        'object': 'chat.completion',
+        'created': int(time.time()),
+        'model': body.get('model', 'stub'),
+        'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': text}, 'finish_reason': 'stop'}],
+        'usage': {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                  'total_tokens': prompt_tokens + completion_tokens,
+                  'prompt_tokens_details': {'cached_tokens': cached_tokens}},
+    }
+
+
+def _chunk(body, created, delta, finish_reason=None):
+    return {
+        'id': 'chatcmpl-stub',
+        'object': 'chat.completion.chunk',
+        'created': created,
+        'model': body.get('model', 'stub'),
+        'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}],
+    }
+
+
+def _event(payload):
+    return f"data: {json.dumps(payload)}\n\n".encode('utf-8')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--latency', default='fixed:0', help="Latency spec in ms (see module docstring)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Probability of a 5xx response")
+    parser.add_argument('--rate-limit-prob', type=float, default=0.0, help="Probability a request starts a 429 burst")
+    parser.add_argument('--rate-limit-burst', type=int, default=1, help="Consecutive 429s per burst")
+    parser.add_argument('--rpm', type=int, help="Requests per minute before 429s (sends x-ratelimit-* headers)")
+    parser.add_argument('--max-prompt-chars', type=int, help="Reject longer prompts as context_length_exceeded")
+    parser.add_argument('--response-words', type=int, default=200)
+    parser.add_argument('--token-delay-ms', type=float, default=0.0, help="Delay between streamed tokens")
+    parser.add_argument('--retry-after-ms', type=int, default=1000, help="Retry-After sent with injected 429s")
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    server = StubOpenAIServer(args.host, args.port, args.latency, args.error_rate, args.rate_limit_prob,
+                              args.rate_limit_burst, args.rpm, args.max_prompt_chars,
+                              args.response_words, args.token_delay_ms, args.retry_after_ms, args.seed)
+    print(f"Stub OpenAI server listening on {server.base_url} (set OPENAI_BASE_URL to use it)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        print(json.dumps(server.stats()))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Synthetic Bee/Limitless vault generator for benchmarks.
+
+Writes dated transcript files for a range of days into bee/ and limitless/
+source trees, together with facts/, errors/ and journal/ directories, and
+returns a config dict pointing at them.
+
+Usage:
+    python benchmarks/synthetic_vault.py DEST [--days N] [--files-per-day N]
+                                              [--file-kb N] [--organized]
+"""
+import os
+import sys
+import json
+import random
+import argparse
+import calendar
+import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_normalizer import synthetic_transcript  # noqa: E402
+
+
+def vault_config(root):
+    """Return the application config for a vault rooted at root."""
+    return {
+        'BEE_DATA': os.path.join(root, 'bee'),
+        'LIMITLESS_DATA': os.path.join(root, 'limitless'),
+        'FACTS': os.path.join(root, 'facts'),
+        'ERRORS': os.path.join(root, 'errors'),
+        'OUTPUT_DIR': os.path.join(root, 'journal'),
+        'OPEN_AI_MODEL': 'gpt-4o-mini',
+        'OPENAI_API_KEY': 'benchmark',
+        'JOURNAL_PROMPT': os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                       '..', 'src', 'templates', 'journal_prompt.md'),
+    }
+
+
+def generate_vault(root, days=30, files_per_day=4, file_size=20_000,
+                   start_date=datetime.date(2024, 1, 1), organized=False, seed=1):
+    """
+    Create a synthetic vault under root.
+
+    Args:
+        root (str): Destination directory (created if missing)
+        days (int): Number of consecutive days starting at start_date
+        files_per_day (int): Files per day in each source
+        file_size (int): Approximate size of each file in bytes
+        organized (bool): Place files in year/month folders instead of the
+                          source root, as FileOrganizer would
+
+    Returns:
+        dict: Config for the vault (see vault_config)
+    """
+    config = vault_config(root)
+    for key in ('BEE_DATA', 'LIMITLESS_DATA', 'FACTS', 'ERRORS', 'OUTPUT_DIR'):
+        os.makedirs(config[key], exist_ok=True)
+
+    rng = random.Random(seed)
+    # A handful of transcripts reused across files keeps generation cheap
+    bodies = [synthetic_transcript(file_size, seed=rng.randrange(1 << 30)) for _ in range(8)]
+
+    for offset in range(days):
+        date = start_date + datetime.timedelta(days=offset)
+        date_str = date.isoformat()
+        for source, prefix in (('BEE_DATA', 'bee'), ('LIMITLESS_DATA', 'lifelog')):
+            directory = config[source]
+            if organized:
+                directory = os.path.join(directory, str(date.year), calendar.month_name[date.month])
+                os.makedirs(directory, exist_ok=True)
+            for index in range(files_per_day):
+                path = os.path.join(directory, f"{date_str}-{prefix}-{index:02d}.md")
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write(f"# {prefix} {date_str} #{index}\n\n{rng.choice(bodies)}\n")
+
+    with open(os.path.join(config['FACTS'], 'facts.md'), 'w', encoding='utf-8') as f:
+        f.write("- The dog is called Bruce.\n- Blood sugar is checked before lunch.\n")
+    with open(os.path.join(config['ERRORS'], 'errors.md'), 'w', encoding='utf-8') as f:
+        f.write("- 'Larry' is usually a transcription error for 'Laurie'.\n")
+    return config
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('dest')
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--files-per-day', type=int, default=4)
+    parser.add_argument('--file-kb', type=float, default=20)
+    parser.add_argument('--organized', action='store_true', help="Write files into year/month folders")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    config = generate_vault(args.dest, args.days, args.files_per_day, int(args.file_kb * 1000),
+                            organized=args.organized, seed=args.seed)
+    print(json.dumps(config, indent=2))
+
+
+if __name__ == "__main__":
+    main()
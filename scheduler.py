@@ -5,6 +5,7 @@ import os
 import sys
 import datetime
 import subprocess
+import json
 import pytz
 from pathlib import Path
 
@@ -13,10 +14,8 @@ current_dir = Path(__file__).parent
 parent_dir = current_dir.parent
 sys.path.append(str(parent_dir))
 
-def run_summarizer():
-    """Run the main.py script for AI summarizer."""
-    print(f"\n=== Scheduled Run at {datetime.datetime.now()} ===")
-    
+def find_main_script():
+    """Locate src/main.py, exiting with an error if it can't be found."""
     # Get the path to main.py - try different possible locations
     possible_paths = [
         os.path.join(current_dir, "src", "main.py"),                        # /python-directory-reader/src/main.py
@@ -40,6 +39,13 @@ def run_summarizer():
         print("The application will now exit. Please check your directory structure.")
         sys.exit(1)
     
+    return main_script
+
+def run_summarizer():
+    """Run the main.py script for AI summarizer."""
+    print(f"\n=== Scheduled Run at {datetime.datetime.now()} ===")
+    main_script = find_main_script()
+    
     # Run the script as a subprocess
     try:
         subprocess.run([sys.executable, main_script], check=True)
@@ -70,7 +76,148 @@ def get_time_until_next_run():
     
     return f"{time_diff.days} days, {hours} hours, {minutes} minutes, {seconds} seconds"
 
+def last_due_time(now, run_at):
+    """Return the most recent scheduled time at or before now."""
+    due = now.tzinfo.localize(datetime.datetime.combine(now.date(), run_at))
+    if due > now:
+        due = now.tzinfo.localize(datetime.datetime.combine(now.date() - datetime.timedelta(days=1), run_at))
+    return due
+
+def next_due_time(now, run_at):
+    """Return the first scheduled time strictly after now."""
+    due = now.tzinfo.localize(datetime.datetime.combine(now.date(), run_at))
+    if due <= now:
+        due = now.tzinfo.localize(datetime.datetime.combine(now.date() + datetime.timedelta(days=1), run_at))
+    return due
+
+def load_daemon_state(path):
+    """Return the time of the last daemon run, or None."""
+    try:
+        with open(path, 'r') as f:
+            return datetime.datetime.fromisoformat(json.load(f)['last_run'])
+    except (OSError, ValueError, KeyError):
+        return None
+
+def save_daemon_state(path, last_run):
+    """Persist the time of the last daemon run."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({'last_run': last_run.isoformat()}, f)
+    os.replace(tmp_path, path)
+
+def load_application():
+    """Import the summarizer in-process and load its configuration with a non-interactive API key."""
+    sys.path.insert(0, os.path.dirname(find_main_script()))
+    import main as summarizer_app
+    from config import load_config
+
+    config = load_config()
+    config['OPENAI_API_KEY'] = summarizer_app.get_api_key(config, interactive=False)
+    if not config['OPENAI_API_KEY']:
+        print("❌ FATAL ERROR: No API key. Set OPENAI_API_KEY or OPENAI_API_KEY_FILE for unattended runs.")
+        sys.exit(1)
+    return summarizer_app, config
+
+def run_watch():
+    """
+    Summarize each day as soon as its transcripts settle.
+
+    BEE_DATA and LIMITLESS_DATA are watched with inotify (or polled where
+    inotify is unavailable). Changes are grouped by the date in their path,
+    and a date is summarized once its files have been quiet for
+    WATCH_QUIET_SECONDS. The run manifest decides whether a settled date
+    actually needs a new journal.
+    """
+    summarizer_app, config = load_application()
+    from services.watcher import create_watcher, DateDebouncer
+
+    quiet_seconds = config.get('WATCH_QUIET_SECONDS', 300)
+    include_today = config.get('WATCH_INCLUDE_TODAY', True)
+    print(f"\n=== AI Summarizer Watch Mode ===")
+    print(f"Summarizing dates after {quiet_seconds}s without changes")
+
+    # Catch up on anything that arrived while we weren't watching
+    reader, summarizer = summarizer_app.run_once(config)
+
+    watcher = create_watcher([config['BEE_DATA'], config['LIMITLESS_DATA']],
+                             config.get('WATCH_BACKEND', 'auto'),
+                             config.get('WATCH_POLL_SECONDS', 30))
+    debouncer = DateDebouncer(quiet_seconds)
+    try:
+        while True:
+            deadline = debouncer.next_deadline()
+            timeout = quiet_seconds if deadline is None else max(deadline, 0.5)
+            dates = debouncer.record(watcher.wait_for_changes(timeout))
+            if dates:
+                print(f"Change detected for {', '.join(sorted(dates))}")
+
+            settled = debouncer.pop_settled()
+            if not include_today:
+                today_str = datetime.date.today().strftime("%Y-%m-%d")
+                settled = [date for date in settled if date != today_str]
+            if not settled:
+                continue
+
+            print(f"\n=== Summarizing settled dates at {datetime.datetime.now()}: {', '.join(settled)} ===")
+            try:
+                summarizer_app.summarize_dates(config, reader, summarizer, settled)
+            except Exception as e:
+                print(f"❌ Error running summarizer: {e}")
+    finally:
+        watcher.close()
+
+def run_daemon():
+    """
+    Run the summarizer in-process on a daily schedule.
+
+    Services (OpenAI client, date indexes) are created once and reused. The
+    API key comes from OPENAI_API_KEY or OPENAI_API_KEY_FILE instead of a
+    prompt. Between runs the process sleeps until the next due time, and a
+    run that was missed while the daemon was down is made up at startup.
+    """
+    summarizer_app, config = load_application()
+    from config import get_cache_dir
+
+    tz = pytz.timezone(config.get('SCHEDULE_TIMEZONE', 'US/Eastern'))
+    run_at = datetime.datetime.strptime(config.get('SCHEDULE_TIME', '01:00'), '%H:%M').time()
+    state_path = os.path.join(get_cache_dir(config), 'scheduler_state.json')
+    print(f"\n=== AI Summarizer Daemon ===")
+    print(f"Running daily at {run_at.strftime('%H:%M')} {tz.zone}")
+
+    reader = summarizer = None
+    while True:
+        now = datetime.datetime.now(tz)
+        last_run = load_daemon_state(state_path)
+        if last_run is None or last_run < last_due_time(now, run_at):
+            if last_run is not None:
+                print(f"Catching up on run missed since {last_run.astimezone(tz)}")
+            print(f"\n=== Scheduled Run at {now} ===")
+            try:
+                reader, summarizer = summarizer_app.run_once(config, reader, summarizer)
+                print(f"✓ Summarizer completed successfully at {datetime.datetime.now(tz)}")
+            except Exception as e:
+                print(f"❌ Error running summarizer: {e}")
+            # Record the attempt either way so a failing run isn't retried in a tight loop
+            save_daemon_state(state_path, now)
+            continue
+
+        next_run = next_due_time(now, run_at)
+        print(f"Next scheduled run at {next_run} ({next_run - now} from now)")
+        # Sleep in at most hour-long steps so suspend/resume and DST changes
+        # can't make us oversleep by more than that
+        while datetime.datetime.now(tz) < next_run:
+            remaining = (next_run - datetime.datetime.now(tz)).total_seconds()
+            time.sleep(max(1.0, min(remaining, 3600.0)))
+
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--daemon":
+        run_daemon()
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == "--watch":
+        run_watch()
+        return
+
     print("\n=== AI Summarizer Scheduler ===")
     print("Setting up scheduled job to run daily at 1:00 AM EST")
     
@@ -8,4 +8,12 @@ def load_config():
         with open(config_path, 'r') as f:
             return json.load(f)
     except Exception as e:
-        raise Exception(f"Error loading config: {e}")
\ No newline at end of file
+        raise Exception(f"Error loading config: {e}")
+
+def get_cache_dir(config):
+    """Return the directory used for persistent run caches (indexes, manifests)."""
+    cache_dir = config.get('CACHE_DIR')
+    if not cache_dir:
+        # Hidden directory so recursive *.md globs and the organizer ignore it
+        cache_dir = os.path.join(config['OUTPUT_DIR'], '.cache')
+    return cache_dir
\ No newline at end of file
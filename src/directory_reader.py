@@ -1,102 +1,104 @@
 import os
 import re
 from datetime import datetime
-from utils.file_handler import read_file, write_file
-from utils.openai_handler import OpenAIHandler
-import nltk
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-from collections import Counter # Added import
-
-# Download stopwords if not already downloaded
-try:
-    stop_words = set(stopwords.words('english'))
-except LookupError:
-    nltk.download('stopwords')
-    stop_words = set(stopwords.words('english'))
-
-# Download punkt tokenizer if not already downloaded (needed for word_tokenize)
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
-
-# Download punkt_tab tokenizer if not already downloaded (sometimes needed)
-try:
-    nltk.data.find('tokenizers/punkt_tab')
-except LookupError:
-    nltk.download('punkt_tab')
-
-def _remove_stopwords(text):
-    """Remove stop words from a given text."""
-    if not text:
-        return text
-    word_tokens = word_tokenize(text)
-    filtered_sentence = [w for w in word_tokens if not w.lower() in stop_words]
-    return " ".join(filtered_sentence)
-
-def _remove_repetitive_phrases(text, n=2, threshold=0.2):
-    """Remove repetitive phrases from a given text."""
-    if not text:
-        return text
-    
-    # Tokenize the text into words
-    words = word_tokenize(text)
-    
-    # Avoid processing if text is too short for n-grams
-    if len(words) < n:
-        return text
-
-    # Generate n-grams (phrases of n words)
-    ngrams = list(nltk.ngrams(words, n))
-    
-    # Avoid division by zero if no n-grams are generated
-    if not ngrams:
-        return text
-
-    # Count the frequency of each n-gram
-    ngram_counts = Counter(ngrams)
-    
-    # Calculate the total number of n-grams
-    total_ngrams = len(ngrams)
-    
-    # Identify repetitive n-grams based on the threshold
-    repetitive_ngrams = {ngram: count for ngram, count in ngram_counts.items()
-                         if count / total_ngrams > threshold}
-    
-    # Remove repetitive n-grams from the text
-    filtered_words = []
-    i = 0
-    while i < len(words):
-        found_repetitive = False
-        # Check only if there are enough words left for an n-gram
-        if i <= len(words) - n:
-            current_ngram = tuple(words[i:i+n])
-            if current_ngram in repetitive_ngrams:
-                i += n  # Skip the entire n-gram
-                found_repetitive = True
-        
-        if not found_repetitive:
-            filtered_words.append(words[i])
-            i += 1
-    
-    # Join the filtered words back into a text
-    return " ".join(filtered_words)
+from config import get_cache_dir
+from utils.file_handler import read_file, read_text_prefix
+from utils.date_index import DateIndex
+from utils.text_normalizer import TextNormalizer
+from utils.run_manifest import fingerprint_files
+from utils.metrics import RunMetrics
+from utils.dedup import create_deduplicator
+from utils.transcript_store import TranscriptStore
+from utils.token_budget import max_file_chars
 
 
 class DirectoryReader:
-    def __init__(self, config):
+    def __init__(self, config, metrics=None):
         print("\nInitializing Directory Reader...")
         self.config = config
+        self.metrics = metrics or RunMetrics()
+        cache_dir = get_cache_dir(config)
+        # Date-keyed file indexes, refreshed once per run on first use
+        self.indexes = {
+            'BEE': DateIndex(config['BEE_DATA'], os.path.join(cache_dir, 'bee_index.json')),
+            'LIMITLESS': DateIndex(config['LIMITLESS_DATA'], os.path.join(cache_dir, 'limitless_index.json')),
+        }
+        self._indexes_refreshed = False
+        # Optional SQLite store of ingested transcripts (TRANSCRIPT_STORE: 'sqlite')
+        self.store = None
+        if config.get('TRANSCRIPT_STORE', 'files') == 'sqlite':
+            self.store = TranscriptStore(
+                config.get('TRANSCRIPT_DB') or os.path.join(cache_dir, 'transcripts.db'),
+                settings={'PREPROCESS_MODE': config.get('PREPROCESS_MODE'), 'MAX_FILE_CHARS': max_file_chars(config)})
+        # Stopword and repetition filtering ('fast' or NLTK-identical 'compat')
+        self.normalizer = TextNormalizer(config.get('PREPROCESS_MODE', 'fast'),
+                                         allow_download=config.get('NLTK_DOWNLOAD', False))
+        # Drops Limitless passages that repeat the Bee transcript of the same day
+        self.deduplicator = create_deduplicator(config)
         print("✓ Directory Reader initialized")
 
+    def refresh_index(self):
+        """Incrementally refresh the date indexes for both sources (and ingest new files into the store)."""
+        for source_name, index in self.indexes.items():
+            with self.metrics.stage('index'):
+                rescanned = index.refresh()
+            print(f"✓ {source_name} index: {len(index.dates())} dates ({rescanned} directories rescanned)")
+            if self.store is not None:
+                with self.metrics.stage('ingest'):
+                    ingested, removed = self.store.ingest(
+                        source_name, index.by_date,
+                        lambda file, date: self._load_file(file, source_name, date))
+                if ingested or removed:
+                    print(f"✓ {source_name} store: {ingested} file(s) ingested, {removed} removed")
+        self._indexes_refreshed = True
+
+    def _get_index(self, source_name):
+        """Return the date index for a source, refreshing it on first use."""
+        if not self._indexes_refreshed:
+            self.refresh_index()
+        return self.indexes[source_name]
+
+    def _get_store(self):
+        """Return the transcript store, ingesting new files on first use."""
+        if not self._indexes_refreshed:
+            self.refresh_index()
+        return self.store
+
     def get_bee_files(self):
-        """Gets all files from the BEE_DATA directory."""
-        return self._get_files(self.config['BEE_DATA'])
+        """Gets all dated files from the BEE_DATA directory."""
+        return self._get_index('BEE').all_files()
 
     def get_limitless_files(self):
-        """Gets all files from the LIMITLESS_DATA directory."""
-        return self._get_files(self.config['LIMITLESS_DATA'])
+        """Gets all dated files from the LIMITLESS_DATA directory."""
+        return self._get_index('LIMITLESS').all_files()
+
+    def get_files_for_date(self, date, source_type):
+        """Return the files for a date from the given source ('BEE' or 'LIMITLESS')."""
+        source_name = source_type.upper()
+        if source_name not in self.indexes:
+            print(f"Invalid source type: {source_type}")
+            return []
+        if self.store is not None:
+            return self._get_store().files_for_date(date, source_name)
+        return self._get_index(source_name).files_for_date(date)
+
+    def get_all_dates(self):
+        """Return the set of dates that have files in either source."""
+        if self.store is not None:
+            return self._get_store().dates()
+        return self._get_index('BEE').dates() | self._get_index('LIMITLESS').dates()
+
+    def search(self, query, limit=20):
+        """Full-text search over the stored transcripts (requires TRANSCRIPT_STORE 'sqlite')."""
+        if self.store is None:
+            print("Transcript search needs TRANSCRIPT_STORE set to 'sqlite'")
+            return []
+        return self._get_store().search(query, limit)
+
+    def fingerprint_date(self, date):
+        """Fingerprint the source files for a date (path, size, mtime; content with MANIFEST_HASH_CONTENT)."""
+        files = self.get_files_for_date(date, 'BEE') + self.get_files_for_date(date, 'LIMITLESS')
+        return fingerprint_files(files, self.config.get('MANIFEST_HASH_CONTENT', False))
 
     def extract_date_from_filename(self, file_path):
         """Public wrapper for _extract_date method."""
@@ -113,49 +115,109 @@ class DirectoryReader:
         Returns:
             str: Combined content from all matching files or None if no files found
         """
-        # Determine which source files to use
-        if source_type.upper() == 'BEE':
-            source_files = self.get_bee_files()
-            source_name = 'BEE'
-        elif source_type.upper() == 'LIMITLESS':
-            source_files = self.get_limitless_files()
-            source_name = 'LIMITLESS'
-        else:
+        source_name = source_type.upper()
+        if source_name not in self.indexes:
             print(f"Invalid source type: {source_type}")
             return None
             
-        # Find files matching the date pattern
-        matching_files = []
-        for file in source_files:
-            file_date = self.extract_date_from_filename(file)
-            if file_date == date:
-                matching_files.append(file)
-        
-        if not matching_files:
+        if not self.get_files_for_date(date, source_name):
             print(f"No {source_name} data found for {date}")
             return None
-        
-        # Read and combine the content
-        combined_content = ""
-        for file in matching_files:
-            try:
-                with open(file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    # Truncate extremely large files if needed
-                    if len(content) > 30000:  # Arbitrary limit to prevent context explosion
-                        print(f"⚠️ Truncating large {source_name} file: {file}")
-                        print(f"File size: {len(content)} characters")
-                        content = content[:30000] + "\n...[content truncated due to size]..."
-                    
-                    # Remove stop words
-                    content_without_stopwords = _remove_stopwords(content)
-                    # Remove repetitive phrases
-                    final_content = _remove_repetitive_phrases(content_without_stopwords)
-                    combined_content += f"\n\n--- File: {os.path.basename(file)} ---\n{final_content}"
-            except Exception as e:
-                print(f"Error reading {file}: {e}")
-        
-        return combined_content
+        return self._join_sections(self.iter_data_for_date(date, source_name))
+
+    def read_files(self, files, source_type, date):
+        """
+        Read and preprocess the given files of one date into the same text as
+        read_data_for_date (used by pipeline workers that received the file list).
+        """
+        if not files:
+            return None
+        return self._join_sections(self._iter_files(files, source_type.upper(), date))
+
+    def _join_sections(self, sections):
+        """Assemble (file, content) sections with a single join instead of repeated concatenation."""
+        return "".join(f"\n\n--- File: {os.path.basename(file)} ---\n{content}" for file, content in sections)
+
+    def iter_data_for_date(self, date, source_type):
+        """
+        Yield (file_path, preprocessed_content) for each file of a date, one file at a time.
+
+        Only the first MAX_FILE_CHARS characters of each file are read (default
+        8 per context token; null disables the limit), so memory stays bounded however large
+        the source files are. Files of at least MMAP_THRESHOLD_MB are read via mmap.
+        """
+        source_name = source_type.upper()
+        if source_name not in self.indexes:
+            print(f"Invalid source type: {source_type}")
+            return
+
+        if self.store is not None:
+            # Already read and preprocessed at ingestion
+            with self.metrics.stage('read', date):
+                transcripts = self._get_store().transcripts_for_date(date, source_name)
+            for file, normalized, _, _ in transcripts:
+                yield file, normalized
+            return
+
+        yield from self._iter_files(self._get_index(source_name).files_for_date(date), source_name, date)
+
+    def _iter_files(self, files, source_name, date):
+        for file in files:
+            loaded = self._load_file(file, source_name, date)
+            if loaded is not None:
+                yield file, loaded[1]
+
+    def _load_file(self, file, source_name, date):
+        """
+        Read the first MAX_FILE_CHARS characters of a source file and preprocess them.
+
+        Returns:
+            tuple: (content, normalized content, truncated), or None if the file can't be read
+        """
+        max_chars = max_file_chars(self.config)
+        mmap_threshold_mb = self.config.get('MMAP_THRESHOLD_MB')
+        mmap_threshold = int(mmap_threshold_mb * 1024 * 1024) if mmap_threshold_mb else None
+        try:
+            with self.metrics.stage('read', date):
+                content, truncated, size_bytes = read_text_prefix(file, max_chars, mmap_threshold)
+        except Exception as e:
+            print(f"Error reading {file}: {e}")
+            return None
+
+        # Large files are cut to prevent context explosion
+        if truncated:
+            print(f"⚠️ Truncating large {source_name} file: {file}")
+            print(f"File size: {size_bytes} bytes, keeping first {max_chars} characters")
+            bytes_kept = len(content.encode('utf-8'))
+            self.metrics.add('bytes_read', bytes_kept, date)
+            self.metrics.add('bytes_truncated', size_bytes - bytes_kept, date)
+            content += "\n...[content truncated due to size]..."
+        else:
+            self.metrics.add('bytes_read', size_bytes, date)
+
+        # Remove stop words and repetitive phrases
+        with self.metrics.stage('preprocess', date):
+            normalized = self.normalizer.normalize(content)
+        return content, normalized, truncated
+
+    def deduplicate_sources(self, date, bee_data, limitless_data):
+        """
+        Remove the parts of the Limitless data that repeat the Bee data (Bee is preferred).
+
+        Returns:
+            str: The Limitless data without the overlapping passages
+        """
+        if self.deduplicator is None or not bee_data or not limitless_data:
+            return limitless_data
+        with self.metrics.stage('dedup', date):
+            deduplicated, removed_chars, removed_windows = self.deduplicator.deduplicate(bee_data, limitless_data)
+        if removed_windows:
+            # ~4 characters per token, as for rate limiting
+            tokens_saved = removed_chars // 4
+            self.metrics.add('dedup_tokens_saved', tokens_saved, date)
+            print(f"✓ Removed {removed_windows} Limitless passage(s) already in the Bee transcript "
+                  f"(~{tokens_saved} tokens, {removed_chars / len(limitless_data):.0%} of Limitless data)")
+        return deduplicated
 
     def read_bee_data_for_date(self, date):
         """Read bee data for a specific date, remove stop words and repetitive phrases."""
@@ -165,21 +227,6 @@ class DirectoryReader:
         """Read limitless data for a specific date, remove stop words and repetitive phrases."""
         return self.read_data_for_date(date, 'LIMITLESS')
 
-    def _get_files(self, directory):
-        """Gets a list of files recursively from the given directory and its subdirectories."""
-        try:
-            all_files = []
-            # Walk through directory tree
-            for root, dirs, files in os.walk(directory):
-                for file in files:
-                    # Add full path to each file
-                    file_path = os.path.join(root, file)
-                    all_files.append(file_path)
-            return all_files
-        except FileNotFoundError:
-            print(f"Directory not found: {directory}")
-            return []
-
     def _extract_date(self, file_path):
         """Extracts the date from the filename using a regular expression."""
         match = re.search(r"(\d{4}-\d{2}-\d{2})", file_path)
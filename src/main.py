@@ -1,60 +1,74 @@
 import os
-import glob
+import sys
 import datetime
 import shutil
 import calendar
-import re
 import getpass
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, as_completed, wait
 from config import load_config
 from directory_reader import DirectoryReader
 from services.summarizer import Summarizer
+from services.batch_backfill import BatchBackfill
+from services.pipeline import StagedPipeline
+from services.rollups import RollupBuilder
 from utils.file_organizer import FileOrganizer
 from utils.file_handler import ensure_directory_exists
+from utils.metrics import create_metrics, print_metrics_summary
+from utils.fact_index import create_fact_index
+from utils.output_catalog import create_output_catalog, print_catalog_drift
+from utils.openai_handler import FatalAPIError
+from utils.token_budget import max_prompt_chars
 
 
-def get_api_key():
-    """Prompt for and return the OpenAI API key."""
+def get_api_key(config=None, interactive=True):
+    """
+    Return the OpenAI API key.
+
+    The key is taken from the OPENAI_API_KEY environment variable, then from
+    the file named by OPENAI_API_KEY_FILE (environment or config), and only
+    then prompted for. Unattended callers pass interactive=False and get None
+    when no key is available.
+    """
+    config = config or {}
+    api_key = os.environ.get('OPENAI_API_KEY')
+    if api_key:
+        return api_key.strip()
+
+    key_file = os.environ.get('OPENAI_API_KEY_FILE') or config.get('OPENAI_API_KEY_FILE')
+    if key_file:
+        try:
+            with open(os.path.expanduser(key_file), 'r') as f:
+                return f.read().strip()
+        except OSError as e:
+            print(f"❌ Could not read API key file {key_file}: {e}")
+
+    if not interactive:
+        return None
     print("\nPlease enter your OpenAI API key:")
     return getpass.getpass("API Key: ")
 
 
-def setup_services(config):
-    """Initialize and return the directory reader and summarizer services."""
+def setup_services(config, metrics=None):
+    """Initialize and return the directory reader and summarizer services, sharing one metrics sink."""
     print("\nInitializing services...")
     # Ensure OUTPUT_DIR exists
     ensure_directory_exists(config['OUTPUT_DIR'])
-    reader = DirectoryReader(config)
-    summarizer = Summarizer(config)
+    metrics = metrics or create_metrics(config)
+    reader = DirectoryReader(config, metrics)
+    summarizer = Summarizer(config, metrics)
     print("✓ Services initialized")
     return reader, summarizer
 
 
-def collect_dates(reader, bee_files, limitless_files):
-    """Extract and return unique dates from the files in a more efficient way."""
+def collect_dates(reader):
+    """Return the sorted unique dates available in the reader's date index."""
     print("\nExtracting dates from files...")
     
-    # Combine files from both sources
-    all_files = bee_files + limitless_files
-    if not all_files:
+    all_dates = reader.get_all_dates()
+    if not all_dates:
         print("❌ No files to process")
         return []
     
-    # Extract all dates at once using regex
-    date_pattern = re.compile(r"(\d{4}-\d{2}-\d{2})")
-    all_dates = set()
-    
-    # Process files in batches to avoid memory issues with very large datasets
-    batch_size = 1000
-    for i in range(0, len(all_files), batch_size):
-        batch_files = all_files[i:i+batch_size]
-        
-        # Join all filenames in the batch with a separator for efficient regex processing
-        combined_paths = "\n".join(batch_files)
-        
-        # Find all dates in the combined string
-        for match in date_pattern.finditer(combined_paths):
-            all_dates.add(match.group(1))
-    
     # Exclude today's date
     today_str = datetime.date.today().strftime("%Y-%m-%d")
     if today_str in all_dates:
@@ -71,48 +85,183 @@ def collect_dates(reader, bee_files, limitless_files):
     return all_dates
 
 
-def process_dates(reader, summarizer, all_dates):
-    """Process data for each date and return success counts."""
+def check_date(reader, summarizer, date):
+    """
+    Decide whether a date needs a journal.
+
+    Returns:
+        tuple: (needs_journal, fingerprint of the date's source files)
+    """
+    print(f"\nChecking data for {date}...")
+    
+    # Skip if the journal exists and its inputs haven't changed since it was written
+    fingerprint = reader.fingerprint_date(date) if summarizer.manifest is not None else None
+    if not summarizer.needs_update(date, fingerprint):
+        print(f"✓ Journal entry already exists for {date}, skipping...")
+        return False, fingerprint
+    if summarizer.file_exists_for_date(date):
+        print(f"↻ Source files or prompt changed for {date}, regenerating journal...")
+    return True, fingerprint
+
+
+def read_date_inputs(reader, summarizer, date):
+    """
+    Read and preprocess the inputs for one date.
+
+    Returns:
+        tuple: (status, bee_data, limitless_data, fingerprint) where status is
+               'ready', 'exists' (journal up to date) or 'empty' (no source data)
+    """
+    needed, fingerprint = check_date(reader, summarizer, date)
+    if not needed:
+        return 'exists', None, None, fingerprint
+    
+    # Read the data for this date
+    bee_data = reader.read_bee_data_for_date(date)
+    limitless_data = reader.read_limitless_data_for_date(date)
+    
+    # Skip this date if we don't have data
+    if not bee_data and not limitless_data:
+        print(f"⚠️ No data found for {date}, skipping...")
+        return 'empty', None, None, fingerprint
+
+    # Both devices often recorded the same conversations; keep the Bee copy
+    limitless_data = reader.deduplicate_sources(date, bee_data, limitless_data)
+    
+    return 'ready', bee_data, limitless_data, fingerprint
+
+
+def read_supplements(reader, summarizer):
+    """
+    Read facts.md and errors.md and index them for per-date retrieval.
+
+    A file that is narrowed down per date can't be part of the journal
+    prompt's cached prefix, so the summarizer moves it after the instructions;
+    files sent whole stay in the prefix.
+
+    Returns:
+        tuple: (facts_index, errors_index) FactIndex objects
+    """
+    print("\nReading facts and errors...")
+    indexes = []
+    per_date_fields = []
+    for name, field, text in (('facts', 'FACTS_CONTENT', reader.read_facts()),
+                              ('errors', 'ERRORS_CONTENT', reader.read_errors())):
+        index = create_fact_index(text, reader.config)
+        if index.retrieve:
+            print(f"✓ Indexed {len(index.entries)} {name} entries ({len(text)} chars); "
+                  f"sending up to {index.top_k} relevant entries per date")
+            per_date_fields.append(field)
+        indexes.append(index)
+    summarizer.set_per_date_fields(*per_date_fields)
+    print("✓ Facts and errors loaded")
+    return tuple(indexes)
+
+
+def select_supplements(supplements, summarizer, date, bee_data, limitless_data):
+    """Return (facts, errors) for one date, narrowed to the entries relevant to its transcripts."""
+    facts_index, errors_index = supplements
+    with summarizer.metrics.stage('retrieve', date):
+        facts = facts_index.select(bee_data, limitless_data)
+        errors = errors_index.select(bee_data, limitless_data)
+    for index, selected in ((facts_index, facts), (errors_index, errors)):
+        if index.retrieve:
+            summarizer.metrics.add('supplement_chars_omitted', len(index.text) - len(selected or ""), date)
+    return facts, errors
+
+
+def generate_for_date(summarizer, date, bee_data, limitless_data, facts, errors, fingerprint=None):
+    """Generate the journal for one date and record its inputs on success."""
+    success = summarizer.process_all(bee_data, limitless_data, facts, errors, date)
+    if success:
+        summarizer.record_inputs(date, fingerprint)
+    return success
+
+
+def process_dates(reader, summarizer, all_dates, max_concurrency=1):
+    """
+    Process data for each date and return success counts.
+
+    With max_concurrency > 1, up to that many journal requests are kept in
+    flight on a worker pool while the next dates' inputs are read and
+    preprocessed on the calling thread. With PIPELINE_WORKERS, preprocessing
+    moves to that many processes instead (see StagedPipeline).
+    """
     processed_count = 0
     failed_count = 0
     skipped_count = 0
 
-    # Read supplementary data first
-    print("\nReading facts and errors...")
-    facts = reader.read_facts()
-    errors = reader.read_errors()
-    print("✓ Facts and errors loaded")
+    # Read and index supplementary data first
+    supplements = read_supplements(reader, summarizer)
 
-    # Process each date
-    for date in all_dates:
-        print(f"\nChecking data for {date}...")
-        
-        # Skip if a journal file already exists for this date
-        if summarizer.file_exists_for_date(date):
-            print(f"✓ Journal entry already exists for {date}, skipping...")
-            skipped_count += 1
-            continue
-        
-        # Read the data for this date
-        bee_data = reader.read_bee_data_for_date(date)
-        limitless_data = reader.read_limitless_data_for_date(date)
-        
-        # Skip this date if we don't have data
-        if not bee_data and not limitless_data:
-            print(f"⚠️ No data found for {date}, skipping...")
-            continue
-        
-        # Process the data
-        if summarizer.process_all(bee_data, limitless_data, facts, errors, date):
-            processed_count += 1
-        else:
-            failed_count += 1
+    # Transcripts from the SQLite store are already preprocessed
+    pipeline_workers = reader.config.get('PIPELINE_WORKERS', 0)
+    if pipeline_workers and reader.store is None:
+        pipeline = StagedPipeline(reader, summarizer, pipeline_workers,
+                                  queue_size=reader.config.get('PIPELINE_QUEUE_SIZE', 4),
+                                  api_concurrency=max_concurrency)
+        counts = pipeline.run(
+            all_dates,
+            check=lambda date: check_date(reader, summarizer, date),
+            select_supplements=lambda date, bee_data, limitless_data: select_supplements(
+                supplements, summarizer, date, bee_data, limitless_data))
+        if summarizer.manifest is not None:
+            summarizer.manifest.save()
+        return counts
+
+    executor = None
+    in_flight = set()
+    if max_concurrency > 1:
+        print(f"Processing dates with up to {max_concurrency} concurrent requests")
+        executor = ThreadPoolExecutor(max_workers=max_concurrency)
+
+    try:
+        # Process each date
+        for date in all_dates:
+            status, bee_data, limitless_data, fingerprint = read_date_inputs(reader, summarizer, date)
+            if status == 'exists':
+                skipped_count += 1
+                continue
+            if status == 'empty':
+                continue
+            facts, errors = select_supplements(supplements, summarizer, date, bee_data, limitless_data)
+            
+            # Process the data
+            if executor is None:
+                if generate_for_date(summarizer, date, bee_data, limitless_data, facts, errors, fingerprint):
+                    processed_count += 1
+                else:
+                    failed_count += 1
+                continue
+
+            # Wait for a free slot before submitting the next request
+            while len(in_flight) >= max_concurrency:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.result():
+                        processed_count += 1
+                    else:
+                        failed_count += 1
+            in_flight.add(executor.submit(
+                generate_for_date, summarizer, date, bee_data, limitless_data, facts, errors, fingerprint))
+
+        # Drain the remaining requests
+        for future in as_completed(in_flight):
+            if future.result():
+                processed_count += 1
+            else:
+                failed_count += 1
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True)
+        if summarizer.manifest is not None:
+            summarizer.manifest.save()
 
     return processed_count, failed_count, skipped_count
 
 
-def print_results(processed_count, failed_count, skipped_count, config):
-    """Print processing results and debug information."""
+def print_results(processed_count, failed_count, skipped_count, config, summarizer):
+    """Print processing results, close the run's metrics and print their summary."""
     print(f"\n=== AI Summarizer Complete ===")
     print(f"Successfully processed: {processed_count} date(s)")
     if skipped_count > 0:
@@ -120,21 +269,21 @@ def print_results(processed_count, failed_count, skipped_count, config):
     if failed_count > 0:
         print(f"Failed to process: {failed_count} date(s)")
 
-    # Debug: Count files in output directory (recursively)
-    recursive_pattern = os.path.join(config['OUTPUT_DIR'], "**", "*.md")
-    result_files = glob.glob(recursive_pattern, recursive=True)
-    print(f"\nDebug: Found {len(result_files)} files in output directory (recursive search)")
+    # Journals in the output directory, from the catalog
+    catalog = summarizer.catalog
+    print(f"\nDebug: Found {len(catalog)} journals in output directory (catalog)")
     
     # Show the most recent files
-    sorted_files = sorted(result_files, key=os.path.getmtime, reverse=True)
-    most_recent = sorted_files[:10] if len(sorted_files) > 10 else sorted_files
-    
-    for file in most_recent:
+    for file in catalog.recent(10):
         relative_path = os.path.relpath(file, config['OUTPUT_DIR'])
         print(f"- {relative_path}")
     
-    if len(sorted_files) > 10:
-        print(f"  ... and {len(sorted_files)-10} more files")
+    if len(catalog) > 10:
+        print(f"  ... and {len(catalog)-10} more files")
+
+    summary = summarizer.metrics.finish(dates_processed=processed_count, dates_failed=failed_count,
+                                        dates_skipped=skipped_count)
+    print_metrics_summary(summary)
 
 
 def check_specific_date_files(reader, summarizer, dates_to_check):
@@ -151,17 +300,9 @@ def check_specific_date_files(reader, summarizer, dates_to_check):
     for date in dates_to_check:
         print(f"\nChecking date: {date}")
         
-        # Check for LIMITLESS files
-        limitless_files = []
-        for file_path in reader.get_limitless_files():
-            if date in file_path:
-                limitless_files.append(file_path)
-        
-        # Check for BEE files
-        bee_files = []
-        for file_path in reader.get_bee_files():
-            if date in file_path:
-                bee_files.append(file_path)
+        # Look up source files in the date index
+        limitless_files = reader.get_files_for_date(date, 'LIMITLESS')
+        bee_files = reader.get_files_for_date(date, 'BEE')
         
         # Check if journal file exists
         journal_exists = summarizer.file_exists_for_date(date)
@@ -183,50 +324,198 @@ def check_specific_date_files(reader, summarizer, dates_to_check):
         
         print(f"  Journal file exists: {'Yes' if journal_exists else 'No'}")
         if journal_exists:
-            print(f"    - Path: {summarizer.existing_files[date]}")
+            print(f"    - Path: {summarizer.catalog.path_for(date)}")
     
     print("\n=== END DIAGNOSTIC CHECK ===\n")
 
 
-def main():
-    """Main entry point for the AI Summarizer application."""
-    print("\n=== Starting AI Summarizer ===")
-    
-    # 1. Load configuration
-    print("\nLoading configuration...")
-    config = load_config()
-    config['OPENAI_API_KEY'] = get_api_key()
-    print("✓ Configuration loaded with API key")
-    
+def run_once(config, reader=None, summarizer=None):
+    """
+    Run one organize / index / summarize pass.
+
+    Services are created on the first call; long-running callers pass them
+    back in so the OpenAI client and date indexes stay warm between runs.
+
+    Returns:
+        tuple: (reader, summarizer) for reuse on the next run
+    """
+    metrics = summarizer.metrics if summarizer is not None else create_metrics(config)
+
     # 2. Organize directories
     print("\nOrganizing directory structure...")
     file_organizer = FileOrganizer()
-    file_organizer.organize_all_directories(config)
+    with metrics.stage('organize'):
+        organized = file_organizer.organize_all_directories(config)
     
-    # 3. Initialize services
-    reader, summarizer = setup_services(config)
+    # 3. Initialize services (or pick up files written since the last run)
+    if reader is None or summarizer is None:
+        reader, summarizer = setup_services(config, metrics)
+    # Journals moved by the organizer were dropped into OUTPUT_DIR by hand: catalog them
+    summarizer.reload_existing_files(rescan=organized[2] > 0)
 
-    # 4. Collect files
-    print("\nCollecting available files...")
-    bee_files = reader.get_bee_files()
-    limitless_files = reader.get_limitless_files()
+    # 4. Build the date index (incremental, persisted between runs)
+    print("\nIndexing available files...")
+    reader.refresh_index()
     
-    if not bee_files and not limitless_files:
+    if not reader.get_all_dates():
         print("❌ No source files found")
-        return
+        return reader, summarizer
 
     # Add diagnostic output for specific dates
     check_specific_date_files(reader, summarizer, ["2025-04-21", "2025-04-22", "2025-04-23", "2025-04-24"])
         
     # 5. Extract dates and process
-    all_dates = collect_dates(reader, bee_files, limitless_files)
+    all_dates = collect_dates(reader)
     if not all_dates:
-        return
+        return reader, summarizer
         
-    processed_count, failed_count, skipped_count = process_dates(reader, summarizer, all_dates)
+    processed_count, failed_count, skipped_count = process_dates(
+        reader, summarizer, all_dates, config.get('MAX_CONCURRENCY', 1))
+    if config.get('ROLLUPS', False):
+        build_rollups(summarizer)
     
     # 6. Print results
-    print_results(processed_count, failed_count, skipped_count, config)
+    print_results(processed_count, failed_count, skipped_count, config, summarizer)
+    return reader, summarizer
+
+
+def summarize_dates(config, reader, summarizer, dates):
+    """
+    Organize, re-index and summarize only the given dates with warm services.
+
+    Used by watch mode once a date's transcripts have settled.
+    """
+    with summarizer.metrics.stage('organize'):
+        organized = FileOrganizer().organize_all_directories(config)
+    reader.refresh_index()
+    summarizer.reload_existing_files(rescan=organized[2] > 0)
+    processed_count, failed_count, skipped_count = process_dates(
+        reader, summarizer, dates, config.get('MAX_CONCURRENCY', 1))
+    if config.get('ROLLUPS', False):
+        build_rollups(summarizer)
+    print_results(processed_count, failed_count, skipped_count, config, summarizer)
+
+
+def run_batch_backfill(config):
+    """
+    Backfill all pending dates through the OpenAI Batch API.
+
+    Cheaper and higher-throughput than run_once for large historical backfills,
+    at the cost of latency (results arrive within the batch completion window).
+    Re-running after an interruption resumes the already submitted batch.
+    """
+    print("\nOrganizing directory structure...")
+    organized = FileOrganizer().organize_all_directories(config)
+    reader, summarizer = setup_services(config)
+    if organized[2]:
+        summarizer.reload_existing_files(rescan=True)
+
+    print("\nIndexing available files...")
+    reader.refresh_index()
+    all_dates = collect_dates(reader)
+
+    skipped_dates = []
+
+    def render_jobs():
+        """Yield (date, prompt, fingerprint) for every date that needs a journal."""
+        supplements = read_supplements(reader, summarizer)
+        template = summarizer.load_journal_template()
+        if template is None:
+            return
+        prompt_limit = max_prompt_chars(config)
+        for date in all_dates:
+            status, bee_data, limitless_data, fingerprint = read_date_inputs(reader, summarizer, date)
+            if status == 'exists':
+                skipped_dates.append(date)
+                continue
+            if status == 'empty':
+                continue
+            facts, errors = select_supplements(supplements, summarizer, date, bee_data, limitless_data)
+            bee_data, limitless_data, facts, errors = summarizer.fit_to_budget(
+                template, date, bee_data, limitless_data, facts, errors)
+            prompt = summarizer.format_journal_prompt(template, bee_data, limitless_data, facts, errors)
+            if prompt_limit and len(prompt) > prompt_limit:
+                print(f"⚠️ {date} needs chunked summarization; leaving it for a regular run")
+                continue
+            yield date, prompt, fingerprint
+
+    backfill = BatchBackfill(config, summarizer)
+    processed_count, failed_count = backfill.run(render_jobs())
+    if summarizer.manifest is not None:
+        summarizer.manifest.save()
+    print_results(processed_count, failed_count, len(skipped_dates), config, summarizer)
+
+
+def build_rollups(summarizer):
+    """Bring the weekly and monthly rollups up to date with the saved daily journals."""
+    print("\nUpdating weekly and monthly rollups...")
+    with summarizer.metrics.stage('rollups'):
+        return RollupBuilder(summarizer).build()
+
+
+def check_catalog(config, rebuild=False):
+    """Report drift between the journal catalog and OUTPUT_DIR; with rebuild, rescan the tree."""
+    catalog = create_output_catalog(config)
+    drift = catalog.verify()
+    print_catalog_drift(drift)
+    if rebuild:
+        count = catalog.rebuild()
+        print(f"✓ Rebuilt journal catalog with {count} entries")
+    return drift
+
+
+def search_transcripts(config, query, limit=20):
+    """Print the stored transcripts that match a full-text query."""
+    reader = DirectoryReader(config)
+    results = reader.search(query, limit)
+    print(f"\n{len(results)} match(es) for {query!r}")
+    for date, source, path, snippet in results:
+        print(f"- {date} {source} {os.path.basename(path)}: {' '.join(snippet.split())}")
+    return results
+
+
+def main():
+    """Main entry point for the AI Summarizer application."""
+    print("\n=== Starting AI Summarizer ===")
+    
+    # 1. Load configuration
+    print("\nLoading configuration...")
+    config = load_config()
+    if '--dry-run' in sys.argv:
+        # Show what the organizer would move; nothing is changed and no key is needed
+        print("\nPlanning directory organization (dry run)...")
+        FileOrganizer().organize_all_directories(config, dry_run=True)
+        return
+    if '--verify-catalog' in sys.argv or '--rebuild-catalog' in sys.argv:
+        print("\nChecking the journal catalog...")
+        check_catalog(config, rebuild='--rebuild-catalog' in sys.argv)
+        return
+    if '--search' in sys.argv:
+        position = sys.argv.index('--search')
+        if position + 1 >= len(sys.argv):
+            print("Usage: python src/main.py --search QUERY")
+            return
+        search_transcripts(config, sys.argv[position + 1])
+        return
+    config['OPENAI_API_KEY'] = get_api_key(config)
+    if '--no-cache' in sys.argv:
+        config['RESPONSE_CACHE_BYPASS'] = True
+    print("✓ Configuration loaded with API key")
+    
+    try:
+        if '--batch' in sys.argv:
+            run_batch_backfill(config)
+        elif '--rollups' in sys.argv:
+            # Only the rollups: the daily journals are already in the catalog
+            summarizer = Summarizer(config, create_metrics(config))
+            counts = build_rollups(summarizer)
+            print_metrics_summary(summarizer.metrics.finish(rollups_failed=counts['failed']))
+        else:
+            run_once(config)
+    except FatalAPIError as e:
+        print(f"\n❌ {e}")
+        print("Exiting application.")
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,174 @@
+import os
+import json
+import time
+from datetime import datetime
+from config import get_cache_dir
+from utils.response_cache import ResponseCache
+
+
+class BatchBackfill:
+    """
+    Offline backfill of many dates through the OpenAI Batch API.
+
+    Journal prompts for all pending dates are written to one JSONL file,
+    submitted as a batch job and polled until the job finishes; each result
+    is then saved through Summarizer.save_summary. The submitted batch is
+    recorded in the cache directory, so an interrupted backfill resumes
+    polling the same job instead of submitting (and paying for) it again.
+    """
+
+    ENDPOINT = "/v1/chat/completions"
+    TERMINAL_STATUSES = ('completed', 'failed', 'expired', 'cancelled')
+
+    def __init__(self, config, summarizer, client=None):
+        self.config = config
+        self.summarizer = summarizer
+        self.openai = summarizer.openai
+        # Any object exposing the SDK's files/batches interface works here
+        self.client = client or self.openai.client
+        self.poll_seconds = config.get('BATCH_POLL_SECONDS', 60)
+        self.max_requests = config.get('BATCH_MAX_REQUESTS', 50000)
+        cache_dir = get_cache_dir(config)
+        self.state_path = os.path.join(cache_dir, 'batch_state.json')
+        self.input_path = os.path.join(cache_dir, 'batch_input.jsonl')
+
+    def load_state(self):
+        """Return the state of a submitted but uncollected batch, or None."""
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_state(self, state):
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=1)
+        os.replace(tmp_path, self.state_path)
+
+    def _clear_state(self):
+        for path in (self.state_path, self.input_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def run(self, jobs):
+        """
+        Submit (or resume) a batch and save its results.
+
+        Args:
+            jobs: Iterable of (date, prompt, input_fingerprint); only consumed
+                  when no earlier batch is waiting to be collected
+
+        Returns:
+            tuple: (processed_count, failed_count)
+        """
+        state = self.load_state()
+        if state:
+            print(f"\nResuming batch {state['batch_id']} submitted {state['submitted']} "
+                  f"({len(state['jobs'])} date(s))")
+        else:
+            state = self.submit(jobs)
+            if not state:
+                print("No dates to submit")
+                return 0, 0
+
+        batch = self.wait(state['batch_id'])
+        return self.collect(batch, state)
+
+    def submit(self, jobs):
+        """Write the batch input file, upload it and create the batch job."""
+        os.makedirs(os.path.dirname(self.input_path), exist_ok=True)
+        state_jobs = {}
+        with open(self.input_path, 'w', encoding='utf-8') as f:
+            for date, prompt, fingerprint in jobs:
+                if len(state_jobs) >= self.max_requests:
+                    print(f"⚠️ Batch limit of {self.max_requests} requests reached; "
+                          f"remaining dates will be submitted on the next run")
+                    break
+                request = {
+                    'custom_id': date,
+                    'method': 'POST',
+                    'url': self.ENDPOINT,
+                    'body': self.openai.build_request(prompt),
+                }
+                f.write(json.dumps(request, ensure_ascii=False) + "\n")
+                state_jobs[date] = {
+                    'fingerprint': fingerprint,
+                    'cache_key': ResponseCache.make_key(self.openai.model, prompt, request['body']['temperature']),
+                }
+
+        if not state_jobs:
+            os.remove(self.input_path)
+            return None
+
+        print(f"\nUploading batch input with {len(state_jobs)} date(s)...")
+        with open(self.input_path, 'rb') as f:
+            input_file = self.client.files.create(file=f, purpose='batch')
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=self.ENDPOINT,
+            completion_window='24h'
+        )
+        state = {
+            'batch_id': batch.id,
+            'input_file_id': input_file.id,
+            'submitted': datetime.now().isoformat(timespec='seconds'),
+            'jobs': state_jobs,
+        }
+        self._save_state(state)
+        print(f"✓ Submitted batch {batch.id}")
+        return state
+
+    def wait(self, batch_id):
+        """Poll a batch until it reaches a terminal status."""
+        while True:
+            batch = self.client.batches.retrieve(batch_id)
+            if batch.status in self.TERMINAL_STATUSES:
+                print(f"✓ Batch {batch_id} finished with status: {batch.status}")
+                return batch
+            counts = getattr(batch, 'request_counts', None)
+            progress = f" ({counts.completed}/{counts.total} done)" if counts else ""
+            print(f"Batch {batch_id} is {batch.status}{progress}; checking again in {self.poll_seconds}s")
+            time.sleep(self.poll_seconds)
+
+    def collect(self, batch, state):
+        """Save every successful result and return (processed_count, failed_count)."""
+        jobs = state['jobs']
+        results = {}
+        if getattr(batch, 'output_file_id', None):
+            for line in self.client.files.content(batch.output_file_id).text.splitlines():
+                if line.strip():
+                    record = json.loads(line)
+                    results[record.get('custom_id')] = record
+
+        processed_count = 0
+        failed_count = 0
+        for date, job in sorted(jobs.items()):
+            content = self._extract_content(results.get(date))
+            if not content:
+                print(f"❌ No batch result for {date}")
+                failed_count += 1
+                continue
+            filepath = self.summarizer.save_summary(content, date)
+            self.summarizer.record_inputs(date, job.get('fingerprint'))
+            if self.openai.cache and job.get('cache_key'):
+                self.openai.cache.put(job['cache_key'], content, self.openai.model)
+            print(f"✓ Journal entry saved to: {filepath}")
+            processed_count += 1
+
+        # Every date has been saved or reported; the next run starts fresh
+        self._clear_state()
+        return processed_count, failed_count
+
+    def _extract_content(self, record):
+        """Return the completion text from one batch output record, or None."""
+        if not record or record.get('error'):
+            return None
+        response = record.get('response') or {}
+        if response.get('status_code') != 200:
+            return None
+        try:
+            return response['body']['choices'][0]['message']['content']
+        except (KeyError, IndexError, TypeError):
+            return None
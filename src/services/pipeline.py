@@ -0,0 +1,257 @@
+import io
+import time
+import queue
+import threading
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from directory_reader import DirectoryReader
+from utils.metrics import RunMetrics
+from utils.openai_handler import FatalAPIError
+
+# Reader of each preprocessing worker process, created once by _init_worker
+_worker_reader = None
+
+
+def _init_worker(config):
+    global _worker_reader
+    with contextlib.redirect_stdout(io.StringIO()):
+        _worker_reader = DirectoryReader(config)
+
+
+def _preprocess_date(date, bee_files, limitless_files):
+    """
+    Read, preprocess and deduplicate one date's files in a worker process.
+
+    Returns:
+        tuple: (bee_data, limitless_data, exported metrics, seconds busy, printed output)
+    """
+    start = time.perf_counter()
+    reader = _worker_reader
+    reader.metrics = RunMetrics()
+    # Output goes back to the parent, which prints it in one piece
+    with contextlib.redirect_stdout(io.StringIO()) as log:
+        bee_data = reader.read_files(bee_files, 'BEE', date)
+        limitless_data = reader.read_files(limitless_files, 'LIMITLESS', date)
+        limitless_data = reader.deduplicate_sources(date, bee_data, limitless_data)
+    return bee_data, limitless_data, reader.metrics.export(), time.perf_counter() - start, log.getvalue()
+
+
+class StagedPipeline:
+    """
+    Producer/consumer pipeline that overlaps preprocessing with API calls.
+
+    Stages:
+      1. preprocess: a process pool reads, normalizes and deduplicates the
+         files of upcoming dates in parallel (the CPU-bound part, outside the
+         GIL of the main process);
+      2. api: api_concurrency threads take preprocessed dates from a bounded
+         queue, select their facts/errors and generate the journal;
+      3. write: one thread saves journals through Summarizer.save_summary and
+         records their inputs.
+
+    Backpressure: at most one date per worker is being preprocessed and both
+    queues hold at most queue_size dates, so a slow API stalls preprocessing
+    instead of piling transcripts up in memory. Busy time per stage is
+    reported as utilisation at the end of the run.
+
+    A fatal error in a stage thread (FatalAPIError, or anything that isn't an
+    Exception) stops the run: no further dates are handed off, queue puts
+    give up once their consumers are gone, and the error is raised from run().
+    """
+
+    # Seconds a blocked queue put waits before checking its consumers are still alive
+    PUT_POLL_SECONDS = 0.1
+
+    def __init__(self, reader, summarizer, workers=2, queue_size=4, api_concurrency=1):
+        self.reader = reader
+        self.summarizer = summarizer
+        self.metrics = summarizer.metrics
+        self.workers = workers
+        self.queue_size = queue_size
+        self.api_concurrency = max(1, api_concurrency)
+        self._lock = threading.Lock()
+        self._fatal = None
+
+    def _count(self, key, value=1):
+        with self._lock:
+            self.counts[key] += value
+
+    def _put(self, target, item, consumers):
+        """
+        Put an item on a bounded queue, blocking while it is full.
+
+        Returns:
+            bool: False if every consumer thread has exited, so the item can never be taken
+        """
+        while True:
+            try:
+                target.put(item, timeout=self.PUT_POLL_SECONDS)
+                return True
+            except queue.Full:
+                if not any(thread.is_alive() for thread in consumers):
+                    return False
+
+    def _run_stage(self, stage, *args):
+        """Run a stage thread, keeping the first fatal error so run() can stop and raise it."""
+        try:
+            stage(*args)
+        except BaseException as e:
+            with self._lock:
+                if self._fatal is None:
+                    self._fatal = e
+
+    def run(self, dates, check, select_supplements):
+        """
+        Generate the journals of the given dates.
+
+        Args:
+            dates (list): Dates to process, in order
+            check (callable): check(date) -> (needs_journal, fingerprint), run on the calling thread
+            select_supplements (callable): select_supplements(date, bee_data, limitless_data) -> (facts, errors)
+
+        Returns:
+            tuple: (processed_count, failed_count, skipped_count)
+        """
+        self.counts = {'processed': 0, 'failed': 0, 'skipped': 0,
+                       'preprocess': 0.0, 'api': 0.0, 'write': 0.0, 'blocked': 0.0, 'starved': 0.0}
+        self._fatal = None
+        ready = queue.Queue(self.queue_size)
+        finished = queue.Queue(self.queue_size)
+        start = time.perf_counter()
+
+        writer = threading.Thread(target=self._run_stage, args=(self._write_stage, finished),
+                                  name="pipeline-write", daemon=True)
+        api_threads = [threading.Thread(target=self._run_stage,
+                                        args=(self._api_stage, ready, finished, select_supplements, [writer]),
+                                        name=f"pipeline-api-{i}", daemon=True)
+                       for i in range(self.api_concurrency)]
+        for thread in api_threads + [writer]:
+            thread.start()
+
+        # Workers are spawned rather than forked: the parent already runs API threads
+        context = multiprocessing.get_context('spawn')
+        config = dict(self.reader.config, TRANSCRIPT_STORE='files')
+        try:
+            with ProcessPoolExecutor(self.workers, mp_context=context,
+                                     initializer=_init_worker, initargs=(config,)) as pool:
+                pending = {}
+                for date in dates:
+                    if self._fatal is not None:
+                        break
+                    needed, fingerprint = check(date)
+                    if not needed:
+                        self._count('skipped')
+                        continue
+                    while len(pending) >= self.workers and self._fatal is None:
+                        self._hand_off(pending, ready, api_threads)
+                    if self._fatal is not None:
+                        break
+                    future = pool.submit(_preprocess_date, date,
+                                         self.reader.get_files_for_date(date, 'BEE'),
+                                         self.reader.get_files_for_date(date, 'LIMITLESS'))
+                    pending[future] = (date, fingerprint)
+                while pending and self._fatal is None:
+                    self._hand_off(pending, ready, api_threads)
+                for future in pending:
+                    future.cancel()
+        finally:
+            for _ in api_threads:
+                self._put(ready, None, api_threads)
+            for thread in api_threads:
+                thread.join()
+            self._put(finished, None, [writer])
+            writer.join()
+
+        self._report(time.perf_counter() - start)
+        if self._fatal is not None:
+            raise self._fatal
+        return self.counts['processed'], self.counts['failed'], self.counts['skipped']
+
+    def _hand_off(self, pending, ready, api_threads):
+        """Wait for preprocessed dates and queue them for the API stage (blocking while it is full)."""
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            date, fingerprint = pending.pop(future)
+            try:
+                bee_data, limitless_data, exported, seconds, log = future.result()
+            except Exception as e:
+                print(f"❌ Preprocessing failed for {date}: {e}")
+                self._count('failed')
+                continue
+            print(log, end="")
+            self.metrics.merge(exported, date)
+            self._count('preprocess', seconds)
+            blocked = time.perf_counter()
+            handed_off = self._put(ready, (date, fingerprint, bee_data, limitless_data), api_threads)
+            self._count('blocked', time.perf_counter() - blocked)
+            if not handed_off:
+                # Every API thread stopped on a fatal error
+                return
+
+    def _api_stage(self, ready, finished, select_supplements, consumers):
+        while True:
+            waiting = time.perf_counter()
+            item = ready.get()
+            if item is None:
+                return
+            self._count('starved', time.perf_counter() - waiting)
+            date, fingerprint, bee_data, limitless_data = item
+            if not bee_data and not limitless_data:
+                print(f"⚠️ No data found for {date}, skipping...")
+                continue
+
+            start = time.perf_counter()
+            try:
+                facts, errors = select_supplements(date, bee_data, limitless_data)
+                print(f"\nGenerating journal for {date}...")
+                with self.metrics.stage('generate', date):
+                    journal = self.summarizer.compose_journal(date, bee_data, limitless_data, facts, errors)
+            except FatalAPIError:
+                raise
+            except Exception as e:
+                print(f"❌ Error generating journal for {date}: {e}")
+                journal = None
+            self._count('api', time.perf_counter() - start)
+
+            if journal:
+                if not self._put(finished, (date, fingerprint, journal), consumers):
+                    return
+            else:
+                print(f"❌ Failed to generate journal for {date}")
+                self._count('failed')
+
+    def _write_stage(self, finished):
+        while True:
+            item = finished.get()
+            if item is None:
+                return
+            date, fingerprint, journal = item
+            start = time.perf_counter()
+            try:
+                filepath = self.summarizer.save_summary(journal, date)
+                self.summarizer.record_inputs(date, fingerprint)
+                print(f"✓ Journal entry saved to: {filepath}")
+                self._count('processed')
+            except Exception as e:
+                print(f"❌ {e}")
+                self._count('failed')
+            self._count('write', time.perf_counter() - start)
+
+    def utilisation(self, wall):
+        """Return {stage: busy fraction of its workers over wall seconds}."""
+        capacity = {'preprocess': self.workers, 'api': self.api_concurrency, 'write': 1}
+        return {stage: (self.counts[stage] / (wall * n) if wall > 0 else 0.0) for stage, n in capacity.items()}
+
+    def _report(self, wall):
+        utilisation = self.utilisation(wall)
+        for stage, fraction in utilisation.items():
+            self.metrics.add(f'pipeline_{stage}_busy_seconds', round(self.counts[stage], 3))
+            self.metrics.add(f'pipeline_{stage}_utilisation', round(fraction, 3))
+        self.metrics.add('pipeline_backpressure_seconds', round(self.counts['blocked'], 3))
+        print(f"\nPipeline utilisation over {wall:.1f}s: "
+              f"preprocess {utilisation['preprocess']:.0%} of {self.workers} process(es), "
+              f"api {utilisation['api']:.0%} of {self.api_concurrency} thread(s), "
+              f"write {utilisation['write']:.0%}")
+        print(f"  Preprocessing waited {self.counts['blocked']:.1f}s on a full queue (backpressure); "
+              f"API threads waited {self.counts['starved']:.1f}s for input")
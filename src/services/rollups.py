@@ -0,0 +1,169 @@
+import os
+import calendar
+from datetime import date as Date, datetime, timedelta
+from config import get_cache_dir
+from utils.file_handler import AtomicFileWriter, ensure_directory_exists
+from utils.run_manifest import RunManifest, fingerprint_files, fingerprint_text
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), '..', 'templates')
+DEFAULT_WEEKLY_PROMPT = os.path.join(TEMPLATES_DIR, 'weekly_prompt.md')
+DEFAULT_MONTHLY_PROMPT = os.path.join(TEMPLATES_DIR, 'monthly_prompt.md')
+
+
+class RollupBuilder:
+    """
+    Builds weekly and monthly rollup journals from the saved daily journals.
+
+    Weeklies (ISO weeks, OUTPUT_DIR/<year>/Weeks/<year>-Www.md) are generated
+    from the daily journals in the catalog, monthlies
+    (OUTPUT_DIR/<year>/<month>/<year>-MM.md) from the weeklies overlapping the
+    month, so no rollup call ever sees raw transcripts. Each rollup is
+    recorded in a manifest with the fingerprint of its constituent files and
+    the hash of its prompt template, and is only generated again when one of
+    those changed: a regenerated daily changes its weekly, which in turn
+    changes its monthly.
+
+    Periods that haven't ended yet are left for a later run unless
+    ROLLUP_INCLUDE_PARTIAL is set; a monthly waits until all of its weeks
+    have their weekly.
+    """
+
+    def __init__(self, summarizer):
+        self.summarizer = summarizer
+        self.config = summarizer.config
+        self.output_dir = summarizer.output_dir
+        self.metrics = summarizer.metrics
+        self.include_partial = self.config.get('ROLLUP_INCLUDE_PARTIAL', False)
+        self.manifest = RunManifest(os.path.join(get_cache_dir(self.config), 'rollups.json'))
+
+    def weekly_path(self, year, week):
+        """Return the path of an ISO week's rollup."""
+        return os.path.join(self.output_dir, str(year), 'Weeks', f"{year}-W{week:02d}.md")
+
+    def monthly_path(self, year, month):
+        """Return the path of a month's rollup, next to the month's daily journals."""
+        return os.path.join(self.output_dir, str(year), calendar.month_name[month], f"{year}-{month:02d}.md")
+
+    def build(self, today=None):
+        """
+        Bring every weekly and monthly rollup up to date.
+
+        Args:
+            today (date): Reference date for deciding which periods have ended (default: today)
+
+        Returns:
+            dict: Number of rollups 'generated', 'current', 'failed' and 'pending'
+        """
+        today = today or Date.today()
+        counts = {'generated': 0, 'current': 0, 'failed': 0, 'pending': 0}
+        templates = {kind: self._load_template(kind) for kind in ('weekly', 'monthly')}
+        if None in templates.values():
+            return counts
+
+        dailies = {}
+        for date_str, path in self.summarizer.catalog.paths().items():
+            try:
+                dailies[datetime.strptime(date_str, '%Y-%m-%d').date()] = path
+            except ValueError:
+                continue
+
+        weeks = {}
+        months = {}
+        for day in sorted(dailies):
+            weeks.setdefault(day.isocalendar()[:2], []).append(day)
+            months.setdefault((day.year, day.month), []).append(day)
+
+        weeklies = {}
+        for (year, week), days in sorted(weeks.items()):
+            start = Date.fromisocalendar(year, week, 1)
+            end = start + timedelta(days=6)
+            if end >= today and not self.include_partial:
+                counts['pending'] += 1
+                continue
+            sources = [(f"{day.isoformat()} ({calendar.day_name[day.weekday()]})", dailies[day]) for day in days]
+            status = self._build_rollup(
+                f"week:{year}-W{week:02d}", templates['weekly'], f"{year}-W{week:02d}",
+                start, end, sources, self.weekly_path(year, week))
+            counts[status] += 1
+            if status != 'failed':
+                weeklies[(year, week)] = (start, end)
+
+        for (year, month), days in sorted(months.items()):
+            start = Date(year, month, 1)
+            end = Date(year, month, calendar.monthrange(year, month)[1])
+            month_weeks = sorted({day.isocalendar()[:2] for day in days})
+            if (end >= today and not self.include_partial) or any(week not in weeklies for week in month_weeks):
+                counts['pending'] += 1
+                continue
+            sources = []
+            for week_year, week in month_weeks:
+                week_start, week_end = weeklies[(week_year, week)]
+                sources.append((f"{week_year}-W{week:02d} ({week_start.isoformat()} to {week_end.isoformat()})",
+                                self.weekly_path(week_year, week)))
+            status = self._build_rollup(
+                f"month:{year}-{month:02d}", templates['monthly'], f"{calendar.month_name[month]} {year}",
+                start, end, sources, self.monthly_path(year, month))
+            counts[status] += 1
+
+        print(f"✓ Rollups: {counts['generated']} generated, {counts['current']} up to date, "
+              f"{counts['failed']} failed, {counts['pending']} waiting for their period or weeks to complete")
+        return counts
+
+    def _build_rollup(self, key, template, period, start, end, sources, output_path):
+        """
+        Generate one rollup unless it is current with its sources and template.
+
+        Args:
+            key (str): Manifest key, e.g. 'week:2025-W17' or 'month:2025-04'
+            template (str): Prompt template with {PERIOD}, {START}, {END} and {CONTENT}
+            sources (list): (heading, file path) of the constituent journals, in order
+
+        Returns:
+            str: 'generated', 'current' or 'failed'
+        """
+        inputs = fingerprint_files([path for _, path in sources])
+        template_hash = fingerprint_text(template)
+        if os.path.exists(output_path) and self.manifest.matches(key, inputs, template_hash):
+            return 'current'
+
+        sections = []
+        for heading, path in sources:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    sections.append(f"## {heading}\n\n{f.read().strip()}")
+            except OSError as e:
+                print(f"❌ Can't read {path} for the {period} rollup: {e}")
+                return 'failed'
+
+        print(f"\nGenerating rollup for {period}...")
+        prompt = (template.replace("{PERIOD}", period)
+                  .replace("{START}", start.isoformat())
+                  .replace("{END}", end.isoformat())
+                  .replace("{CONTENT}", "\n\n".join(sections)))
+        with self.metrics.stage('rollup'):
+            rollup = self.summarizer.openai.generate_text(prompt)
+        if not rollup:
+            print(f"❌ Failed to generate rollup for {period}")
+            return 'failed'
+
+        ensure_directory_exists(os.path.dirname(output_path))
+        with AtomicFileWriter(output_path) as writer:
+            writer.write(rollup)
+            writer.commit()
+        self.metrics.add('rollups_generated')
+        self.metrics.add('bytes_written', len(rollup.encode('utf-8')))
+        self.manifest.record(key, inputs, template_hash)
+        self.manifest.save()
+        print(f"✓ Rollup saved to: {output_path}")
+        return 'generated'
+
+    def _load_template(self, kind):
+        """Load the weekly or monthly prompt (WEEKLY_PROMPT / MONTHLY_PROMPT, or the bundled template)."""
+        default = DEFAULT_WEEKLY_PROMPT if kind == 'weekly' else DEFAULT_MONTHLY_PROMPT
+        path = self.config.get(f'{kind.upper()}_PROMPT') or default
+        try:
+            with open(path, 'r') as file:
+                return file.read()
+        except Exception as e:
+            print(f"❌ Failed to load {kind} prompt template: {e}")
+            return None
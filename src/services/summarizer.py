@@ -1,57 +1,108 @@
 import os
-import re
 from datetime import datetime
-from utils.openai_handler import OpenAIHandler
-from utils.file_handler import write_file, ensure_directory_exists
+from concurrent.futures import ThreadPoolExecutor
+from utils.openai_handler import OpenAIHandler, ContextLengthExceededError, FatalAPIError
+from utils.text_chunker import split_text
+from utils.run_manifest import RunManifest, fingerprint_text
+from config import get_cache_dir
+from utils.file_handler import AtomicFileWriter, ensure_directory_exists
+from utils.metrics import RunMetrics
+from utils.prompt_template import PromptTemplate
+from utils.output_catalog import create_output_catalog
+from utils.token_budget import create_budget_planner, format_budget_report, max_prompt_chars
 import calendar # Added import
-import sys # Added import
-import glob # Added import for recursive file search
+
+DEFAULT_CHUNK_PROMPT = os.path.join(os.path.dirname(__file__), '..', 'templates', 'chunk_prompt.md')
+
+# Journal prompt fields moved into the cached prompt prefix, in front of the
+# day's transcripts, as long as every date gets their untouched full text
+STATIC_PROMPT_FIELDS = ('FACTS_CONTENT', 'ERRORS_CONTENT')
 
 class Summarizer:
     """Service to handle data reading and OpenAI summarization."""
     
-    def __init__(self, config):
+    def __init__(self, config, metrics=None):
         """Initialize summarizer with configuration."""
         # print("\nInitializing Summarizer...")
-        self.openai = OpenAIHandler(config)
+        self.metrics = metrics or RunMetrics()
+        self.openai = OpenAIHandler(config, self.metrics)
         self.config = config  # Store the entire config object
         self.output_dir = config.get('OUTPUT_DIR')
         if not self.output_dir:
             raise ValueError("OUTPUT_DIR not configured")
         # print("✓ Summarizer initialized")
         
-        # Cache of existing journal files (date -> filepath)
-        self.existing_files = self._load_existing_files()
+        # Persistent catalog of existing journal files, updated on every save
+        self.catalog = self._load_existing_files()
+
+        # Inputs each journal was generated from, so changed dates are regenerated
+        self.manifest = None
+        if config.get('INCREMENTAL_RUNS', True):
+            self.manifest = RunManifest(os.path.join(get_cache_dir(config), 'manifest.json'))
+        self.template_hash = fingerprint_text(self.openai.journal_template)
+        # Parsed journal template and the mtime of the file it was parsed from
+        self._journal_template = None
+        self._journal_template_mtime = None
+        # Fits each day's prompt into the model's context window (TOKEN_BUDGET)
+        self.budget = create_budget_planner(config)
+        self._template_tokens = (None, 0)
+        # Fields in the cached prefix: the planner may trim facts and errors
+        # differently for every date, so with TOKEN_BUDGET they stay in place
+        self.static_prompt_fields = STATIC_PROMPT_FIELDS if self.budget is None else ()
         
     def _load_existing_files(self):
-        """Load existing journal files to avoid regenerating them."""
+        """Load the catalog of existing journal files to avoid regenerating them."""
         print("\nChecking for existing journal files...")
-        existing_files = {}
-        
-        # Recursively get all markdown files in the output directory
-        pattern = os.path.join(self.output_dir, "**", "*.md")
-        md_files = glob.glob(pattern, recursive=True)
-        
-        # Extract dates from filenames
-        date_pattern = re.compile(r"(\d{4}-\d{2}-\d{2})")
-        for file_path in md_files:
-            match = date_pattern.search(os.path.basename(file_path))
-            if match:
-                date = match.group(1)
-                existing_files[date] = file_path
-                
-        print(f"✓ Found {len(existing_files)} existing journal entries")
-        return existing_files
-        
+        catalog = create_output_catalog(self.config)
+        print(f"✓ Found {len(catalog)} existing journal entries")
+        return catalog
+
+    @property
+    def existing_files(self):
+        """Existing journal files (date -> filepath)."""
+        return self.catalog.paths()
+
+    def reload_existing_files(self, rescan=False):
+        """
+        Pick up journals saved by other processes; with rescan, walk OUTPUT_DIR
+        again (e.g. after the organizer moved files dropped there by hand).
+        """
+        if rescan:
+            self.catalog.rebuild()
+        elif not self.catalog.load():
+            self.catalog.rebuild()
+
     def file_exists_for_date(self, date):
         """Check if a journal file already exists for the given date."""
-        return date in self.existing_files
+        return self.catalog.exists(date)
 
-    def save_summary(self, summary, date=None, suffix=""):
-        """Save summary with YYYY-MM-DD format filename, organized by year and month."""
-        if not summary:
-            raise ValueError("Summary content cannot be empty")
-            
+    def needs_update(self, date, input_fingerprint=None):
+        """
+        Decide whether the journal for a date has to be (re)generated.
+
+        A journal is stale when its source files or the prompt template changed
+        since it was written. Journals that predate the manifest are adopted as
+        current rather than regenerated.
+        """
+        if not self.file_exists_for_date(date):
+            return True
+        if self.manifest is None or input_fingerprint is None:
+            return False
+        if self.manifest.get(date) is None:
+            self.manifest.record(date, input_fingerprint, self.template_hash)
+            return False
+        return not self.manifest.matches(date, input_fingerprint, self.template_hash)
+
+    def record_inputs(self, date, input_fingerprint):
+        """Record the inputs a freshly generated journal was built from."""
+        if self.manifest is None or input_fingerprint is None:
+            return
+        self.manifest.record(date, input_fingerprint, self.template_hash)
+        self.manifest.save()
+        self.catalog.record_inputs(date, input_fingerprint)
+
+    def summary_path(self, date=None, suffix=""):
+        """Return the YYYY-MM-DD.md path for a date inside OUTPUT_DIR/<year>/<month>, creating the directory."""
         # Ensure we have a valid date string
         if not date:
             date_str = datetime.now().strftime('%Y-%m-%d')
@@ -79,37 +130,162 @@ class Summarizer:
         
         # Create filename in YYYY-MM-DD format with optional suffix
         filename = f"{date_str}{suffix}.md"
-        filepath = os.path.join(target_dir, filename)
-        
+        return os.path.join(target_dir, filename)
+
+    def save_summary(self, summary, date=None, suffix=""):
+        """Save summary with YYYY-MM-DD format filename, organized by year and month."""
+        if not summary:
+            raise ValueError("Summary content cannot be empty")
+
+        filepath = self.summary_path(date, suffix)
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(summary)
+            # Write to a temporary file and rename, so a crash never leaves a partial journal
+            with self.metrics.stage('write', date), AtomicFileWriter(filepath) as writer:
+                writer.write(summary)
+                writer.commit()
+            self.metrics.add('bytes_written', len(summary.encode('utf-8')), date)
+            if not suffix:
+                date = date or os.path.basename(filepath)[:-3]
+                self._remove_previous_journal(date, filepath)
+                self.catalog.record(date, filepath)
             return filepath
         except Exception as e:
             raise IOError(f"Failed to save summary to {filepath}: {e}")
 
-    def generate_journal(self, date, bee_data, limitless_data, facts=None, errors=None):
-        """Generate a journal entry using the JOURNAL_PROMPT template."""
-        print(f"\nGenerating journal for {date}...")
+    def _stream_journal(self, prompt, date):
+        """
+        Generate a journal while streaming tokens into a temporary file next to
+        its final path; the file is renamed into place only once complete.
 
-        # 1. Load the journal prompt template
+        Returns:
+            str: Path of the saved journal, or None if generation failed
+        """
+        filepath = self.summary_path(date)
+        with AtomicFileWriter(filepath) as writer:
+            journal = self.openai.generate_text(prompt, stream_to=writer, date=date)
+            if not journal:
+                return None
+            if writer.chars_written != len(journal):
+                # Served from the response cache (or otherwise not streamed)
+                writer.reset()
+                writer.write(journal)
+            writer.commit()
+        self.metrics.add('bytes_written', len(journal.encode('utf-8')), date)
+        self._remove_previous_journal(date, filepath)
+        self.catalog.record(date, filepath)
+        return filepath
+
+    def _remove_previous_journal(self, date, filepath):
+        """
+        Remove the journal a regenerated one replaces when it had another name
+        (adopted journals may be any *YYYY-MM-DD*.md), so only one remains.
+        """
+        previous = self.catalog.path_for(date)
+        if not previous or os.path.abspath(previous) == os.path.abspath(filepath):
+            return
+        try:
+            os.remove(previous)
+            print(f"Replaced {os.path.relpath(previous, self.output_dir)} with the regenerated journal")
+        except FileNotFoundError:
+            pass
+
+    def set_per_date_fields(self, *fields):
+        """
+        Mark journal prompt fields whose content is selected per date (e.g.
+        retrieved facts), keeping them out of the cached prompt prefix.
+        """
+        static = () if self.budget is not None else tuple(
+            field for field in STATIC_PROMPT_FIELDS if field not in fields)
+        if static != self.static_prompt_fields:
+            self.static_prompt_fields = static
+            # Parsed again with the new layout on the next load
+            self._journal_template = None
+
+    def load_journal_template(self):
+        """
+        Return the parsed JOURNAL_PROMPT template, or None if it can't be read.
+
+        The file is only re-read and re-parsed when its mtime changes, so a
+        long-running process still picks up edits.
+        """
+        path = self.config['JOURNAL_PROMPT']
         try:
-            with open(self.config['JOURNAL_PROMPT'], 'r') as file:
-                template = file.read()
+            mtime = os.stat(path).st_mtime_ns
+            if self._journal_template is None or mtime != self._journal_template_mtime:
+                with open(path, 'r') as file:
+                    text = file.read()
+                self._journal_template = PromptTemplate(
+                    text, self.static_prompt_fields, self.config.get('PROMPT_CACHE_LAYOUT', True))
+                self._journal_template_mtime = mtime
+                self.template_hash = fingerprint_text(text)
+            return self._journal_template
         except Exception as e:
             print(f"❌ Failed to load journal prompt template: {e}")
-            return False
+            return None
 
-        # 2. Format the prompt with data
-        prompt = template.format(
+    def format_journal_prompt(self, template, bee_data, limitless_data, facts=None, errors=None):
+        """Fill the parsed journal template with one day's data (instructions, facts and errors first)."""
+        return template.render(
             BEE_CONTENT=bee_data if bee_data else "No data available",
             LIMITLESS_CONTENT=limitless_data if limitless_data else "No data available",
             FACTS_CONTENT=facts if facts else "No additional facts available",
             ERRORS_CONTENT=errors if errors else "No known errors"
         )
 
-        # 3. Generate the journal using OpenAI
-        journal = self.openai.generate_text(prompt)
+    def fit_to_budget(self, template, date, bee_data, limitless_data, facts=None, errors=None):
+        """
+        Reduce a day's inputs to the model's token budget and report the plan
+        (TOKEN_BUDGET); returns them unchanged when the planner is off.
+
+        Returns:
+            tuple: (bee_data, limitless_data, facts, errors)
+        """
+        if self.budget is None:
+            return bee_data, limitless_data, facts, errors
+        cached_template, fixed_tokens = self._template_tokens
+        if cached_template is not template:
+            # Instructions and labels: the template rendered without any data
+            fixed_tokens = self.budget.counter.count(self.format_journal_prompt(template, None, None))
+            self._template_tokens = (template, fixed_tokens)
+
+        with self.metrics.stage('budget', date):
+            components, report = self.budget.plan(fixed_tokens, {
+                'FACTS': facts, 'ERRORS': errors, 'BEE': bee_data, 'LIMITLESS': limitless_data})
+        print(format_budget_report(date, report))
+        self.metrics.event('budget', date, **report)
+        for reduction, tokens in report['saved'].items():
+            self.metrics.add(f'budget_{reduction}_tokens', tokens, date)
+        return components['BEE'], components['LIMITLESS'], components['FACTS'], components['ERRORS']
+
+    def generate_journal(self, date, bee_data, limitless_data, facts=None, errors=None):
+        """Generate a journal entry using the JOURNAL_PROMPT template."""
+        print(f"\nGenerating journal for {date}...")
+
+        # 1. Load the journal prompt template
+        template = self.load_journal_template()
+        if template is None:
+            return False
+
+        # 2. Fit the day into the token budget and format the prompt with data
+        bee_data, limitless_data, facts, errors = self.fit_to_budget(
+            template, date, bee_data, limitless_data, facts, errors)
+        prompt = self.format_journal_prompt(template, bee_data, limitless_data, facts, errors)
+
+        # 3. Generate the journal using OpenAI, splitting days that are too large
+        prompt_limit = max_prompt_chars(self.config)
+        fits = not (prompt_limit and len(prompt) > prompt_limit)
+        if fits and self.config.get('STREAM_RESPONSES', True):
+            try:
+                filepath = self._stream_journal(prompt, date)
+                if filepath:
+                    print(f"✓ Journal entry saved to: {filepath}")
+                    return True
+                journal = None
+            except ContextLengthExceededError:
+                print(f"⚠️ Falling back to chunked summarization for {date}")
+                journal = self._generate_chunked_journal(template, date, bee_data, limitless_data, facts, errors)
+        else:
+            journal = self._complete_journal(template, prompt, date, bee_data, limitless_data, facts, errors)
 
         if journal:
             # Save the journal with the specific date
@@ -120,10 +296,123 @@ class Summarizer:
             print(f"❌ Failed to generate journal for {date}")
             return False
 
+    def compose_journal(self, date, bee_data, limitless_data, facts=None, errors=None):
+        """
+        Generate a journal's text without saving it (the staged pipeline saves
+        in its own writer stage).
+
+        Returns:
+            str: The journal, or None if generation failed
+        """
+        template = self.load_journal_template()
+        if template is None:
+            return None
+        bee_data, limitless_data, facts, errors = self.fit_to_budget(
+            template, date, bee_data, limitless_data, facts, errors)
+        prompt = self.format_journal_prompt(template, bee_data, limitless_data, facts, errors)
+        return self._complete_journal(template, prompt, date, bee_data, limitless_data, facts, errors)
+
+    def _complete_journal(self, template, prompt, date, bee_data, limitless_data, facts=None, errors=None):
+        """Return the model's journal for a prompt, using chunked summarization for oversized days."""
+        prompt_limit = max_prompt_chars(self.config)
+        try:
+            if prompt_limit and len(prompt) > prompt_limit:
+                print(f"⚠️ Prompt for {date} is {len(prompt)} chars (limit {prompt_limit}), using chunked summarization")
+                return self._generate_chunked_journal(template, date, bee_data, limitless_data, facts, errors)
+            return self.openai.generate_text(prompt, date=date)
+        except ContextLengthExceededError:
+            print(f"⚠️ Falling back to chunked summarization for {date}")
+            return self._generate_chunked_journal(template, date, bee_data, limitless_data, facts, errors)
+
+    def _generate_chunked_journal(self, template, date, bee_data, limitless_data, facts=None, errors=None):
+        """
+        Map-reduce journal generation for days that exceed the model context.
+
+        Each source is split into CHUNK_CHARS-sized chunks that are condensed in
+        parallel (CHUNK_CONCURRENCY requests at a time); the notes then take the
+        place of the raw transcripts in the journal prompt. If the notes are
+        still too large they are condensed again, up to MAX_REDUCE_LEVELS times.
+        """
+        chunk_chars = self.config.get('CHUNK_CHARS', 40000)
+        max_levels = self.config.get('MAX_REDUCE_LEVELS', 3)
+        prompt_limit = max_prompt_chars(self.config)
+
+        chunk_template = self._load_chunk_template()
+        if not chunk_template:
+            return None
+
+        sources = {'Bee': bee_data, 'Limitless': limitless_data}
+        for level in range(1, max_levels + 1):
+            sources = self._condense_sources(chunk_template, date, sources, chunk_chars, level)
+            if sources is None:
+                return None
+
+            prompt = self.format_journal_prompt(template, sources['Bee'], sources['Limitless'], facts, errors)
+            if prompt_limit and len(prompt) > prompt_limit:
+                print(f"⚠️ Reduced prompt still {len(prompt)} chars, condensing again")
+                continue
+            try:
+                return self.openai.generate_text(prompt, date=date)
+            except ContextLengthExceededError:
+                print(f"⚠️ Reduced prompt still too large, condensing again")
+
+        print(f"❌ Could not fit {date} into the model context after {max_levels} reduction levels")
+        return None
+
+    def _condense_sources(self, chunk_template, date, sources, chunk_chars, level):
+        """Summarize every chunk of every source in parallel and return the notes per source."""
+        jobs = []
+        for source, content in sources.items():
+            chunks = split_text(content, chunk_chars) if content else []
+            for part, chunk in enumerate(chunks, 1):
+                jobs.append((source, chunk, f"{part}", f"{len(chunks)}"))
+
+        print(f"Condensing {len(jobs)} chunk(s) for {date} (level {level})...")
+        with ThreadPoolExecutor(max_workers=self.config.get('CHUNK_CONCURRENCY', 4)) as executor:
+            notes = list(executor.map(lambda job: self._condense_chunk(chunk_template, date, *job), jobs))
+
+        if any(note is None for note in notes):
+            print(f"❌ Failed to condense one or more chunks for {date}")
+            return None
+
+        condensed = {source: [] for source in sources}
+        for (source, _, _, _), note in zip(jobs, notes):
+            condensed[source].append(note)
+        return {source: "\n\n".join(parts) if parts else None for source, parts in condensed.items()}
+
+    def _condense_chunk(self, chunk_template, date, source, chunk, part, total):
+        """Condense a single chunk, splitting it further if it still overflows the context."""
+        prompt = chunk_template.replace("{SOURCE}", source)\
+                               .replace("{PART}", part)\
+                               .replace("{TOTAL}", total)\
+                               .replace("{CONTENT}", chunk)
+        try:
+            return self.openai.generate_text(prompt, date=date)
+        except ContextLengthExceededError:
+            halves = split_text(chunk, len(chunk) // 2 + 1)
+            if len(halves) < 2:
+                return None
+            notes = [self._condense_chunk(chunk_template, date, source, half, f"{part}.{i}", total)
+                     for i, half in enumerate(halves, 1)]
+            if any(note is None for note in notes):
+                return None
+            return "\n".join(notes)
+
+    def _load_chunk_template(self):
+        """Load the chunk condensing prompt (CHUNK_PROMPT, or the bundled template)."""
+        path = self.config.get('CHUNK_PROMPT') or DEFAULT_CHUNK_PROMPT
+        try:
+            with open(path, 'r') as file:
+                return file.read()
+        except Exception as e:
+            print(f"❌ Failed to load chunk prompt template: {e}")
+            return None
+
     def process_date(self, date, bee_data, limitless_data, facts=None, errors=None):
         """Process data for a specific date to generate journal."""
         # Generate the journal entry
-        journal_success = self.generate_journal(date, bee_data, limitless_data, facts, errors)
+        with self.metrics.stage('generate', date):
+            journal_success = self.generate_journal(date, bee_data, limitless_data, facts, errors)
         return journal_success
 
     def process_all(self, bee_data, limitless_data, facts, errors, date):
@@ -145,7 +434,9 @@ class Summarizer:
             
             return success
             
+        except FatalAPIError:
+            raise
         except Exception as e:
-            print(f"❌ Error in process_all: {e}")
-            print("Exiting application due to error.")
-            sys.exit(1) # Exit the application with an error code
\ No newline at end of file
+            # One bad date must not end a long-running daemon or watch session
+            print(f"❌ Error in process_all for {date}: {e}")
+            return False
\ No newline at end of file
@@ -0,0 +1,207 @@
+import os
+import re
+import sys
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+
+
+# inotify event flags (from <sys/inotify.h>)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+              IN_CREATE | IN_DELETE | IN_DELETE_SELF)
+
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+class InotifyWatcher:
+    """
+    Recursive directory watcher built on Linux inotify (via ctypes).
+
+    Every directory under the roots gets a watch; directories created later
+    are added as their creation events arrive.
+    """
+
+    def __init__(self, roots):
+        libc_name = ctypes.util.find_library('c')
+        if not sys.platform.startswith('linux') or not libc_name:
+            raise OSError(errno.ENOSYS, "inotify is only available on Linux")
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self.watches = {}
+        for root in roots:
+            self._add_tree(root)
+
+    def _add_watch(self, path):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err == errno.ENOSPC:
+                raise OSError(err, "inotify watch limit reached (raise fs.inotify.max_user_watches)")
+            return
+        self.watches[wd] = path
+
+    def _add_tree(self, root):
+        """Watch a directory and all of its subdirectories; return the files already inside."""
+        files = []
+        for dirpath, dirs, names in os.walk(root):
+            self._add_watch(dirpath)
+            files.extend(os.path.join(dirpath, name) for name in names)
+        return files
+
+    def wait_for_changes(self, timeout):
+        """
+        Block up to timeout seconds for filesystem events.
+
+        Returns:
+            list: Paths that were created, modified, moved or deleted
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+
+        changed = []
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b'\0')
+                offset += length
+
+                if mask & IN_Q_OVERFLOW:
+                    # Events were dropped; report every watched directory as changed
+                    changed.extend(self.watches.values())
+                    continue
+                if mask & IN_IGNORED:
+                    self.watches.pop(wd, None)
+                    continue
+                directory = self.watches.get(wd)
+                if directory is None:
+                    continue
+                path = os.path.join(directory, os.fsdecode(name)) if name else directory
+                if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                    changed.extend(self._add_tree(path))
+                changed.append(path)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Portable fallback watcher that compares (size, mtime) snapshots of the trees."""
+
+    def __init__(self, roots, interval=30.0):
+        self.roots = roots
+        self.interval = interval
+        self.snapshot = self._take_snapshot()
+
+    def _take_snapshot(self):
+        snapshot = {}
+        stack = [root for root in self.roots if os.path.isdir(root)]
+        while stack:
+            path = stack.pop()
+            try:
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                            continue
+                        try:
+                            st = entry.stat()
+                        except OSError:
+                            continue
+                        snapshot[entry.path] = (st.st_size, st.st_mtime_ns)
+            except OSError:
+                continue
+        return snapshot
+
+    def wait_for_changes(self, timeout):
+        """Sleep up to timeout seconds (at most one poll interval) and return changed paths."""
+        time.sleep(max(0.0, min(timeout, self.interval)))
+        current = self._take_snapshot()
+        previous = self.snapshot
+        self.snapshot = current
+        changed = [path for path, stat in current.items() if previous.get(path) != stat]
+        changed.extend(path for path in previous if path not in current)
+        return changed
+
+    def close(self):
+        pass
+
+
+def create_watcher(roots, backend='auto', poll_interval=30.0):
+    """Create an inotify watcher where available, falling back to polling."""
+    if backend in ('auto', 'inotify'):
+        try:
+            watcher = InotifyWatcher(roots)
+            print(f"✓ Watching {len(watcher.watches)} directories with inotify")
+            return watcher
+        except OSError as e:
+            if backend == 'inotify':
+                raise
+            print(f"⚠️ inotify unavailable ({e}), falling back to polling every {poll_interval}s")
+    return PollingWatcher(roots, poll_interval)
+
+
+class DateDebouncer:
+    """
+    Tracks the last change seen for each date and releases a date once its
+    files have been quiet for the configured interval.
+    """
+
+    def __init__(self, quiet_seconds):
+        self.quiet_seconds = quiet_seconds
+        self.date_pattern = re.compile(r"(\d{4}-\d{2}-\d{2})")
+        self.last_change = {}
+
+    def record(self, paths, now=None):
+        """Note changes to the given paths; returns the dates they belong to."""
+        now = time.monotonic() if now is None else now
+        dates = set()
+        for path in paths:
+            match = self.date_pattern.search(path)
+            if match:
+                dates.add(match.group(1))
+        for date in dates:
+            self.last_change[date] = now
+        return dates
+
+    def pop_settled(self, now=None):
+        """Return (and forget) the dates whose files have been quiet long enough."""
+        now = time.monotonic() if now is None else now
+        settled = sorted(date for date, changed in self.last_change.items()
+                         if now - changed >= self.quiet_seconds)
+        for date in settled:
+            del self.last_change[date]
+        return settled
+
+    def next_deadline(self, now=None):
+        """Seconds until the next pending date settles, or None if nothing is pending."""
+        if not self.last_change:
+            return None
+        now = time.monotonic() if now is None else now
+        return max(0.0, min(self.last_change.values()) + self.quiet_seconds - now)
@@ -0,0 +1,147 @@
+import os
+import re
+import json
+import time
+
+
+class DateIndex:
+    """
+    Persistent date -> file index for one source directory tree.
+
+    The index remembers every directory's mtime together with the dated files
+    and subdirectories it contained. On refresh a directory is only re-listed
+    (with os.scandir) when its mtime changed, so an unchanged vault costs one
+    stat per directory instead of a full os.walk.
+    """
+
+    VERSION = 1
+
+    # Directories modified this recently are rescanned on the next refresh,
+    # because coarse filesystem timestamps could hide a later change.
+    MTIME_SETTLE_SECONDS = 2.0
+
+    def __init__(self, root, cache_path=None):
+        self.root = root
+        self.cache_path = cache_path
+        self.date_pattern = re.compile(r"(\d{4}-\d{2}-\d{2})")
+        self.dirs = {}
+        self.by_date = {}
+        self._load()
+
+    def _load(self):
+        """Load a previously persisted index, ignoring stale or corrupt caches."""
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring unreadable date index {self.cache_path}: {e}")
+            return
+        if data.get('version') != self.VERSION or data.get('root') != self.root:
+            return
+        self.dirs = data.get('dirs', {})
+        self._rebuild_dates()
+
+    def save(self):
+        """Persist the index atomically."""
+        if not self.cache_path:
+            return
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        tmp_path = self.cache_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': self.VERSION, 'root': self.root, 'dirs': self.dirs}, f)
+        os.replace(tmp_path, self.cache_path)
+
+    def refresh(self):
+        """
+        Bring the index up to date with the directory tree and persist it.
+
+        Returns:
+            int: Number of directories that had to be re-listed
+        """
+        if not os.path.isdir(self.root):
+            print(f"Directory not found: {self.root}")
+            self.dirs = {}
+            self.by_date = {}
+            return 0
+
+        now = time.time()
+        old_dirs = self.dirs
+        new_dirs = {}
+        rescanned = 0
+        stack = [self.root]
+        while stack:
+            path = stack.pop()
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+
+            cached = old_dirs.get(path)
+            if cached is not None and cached['mtime_ns'] == mtime_ns:
+                entry = cached
+            else:
+                entry = self._scan_directory(path, mtime_ns, now)
+                if entry is None:
+                    continue
+                rescanned += 1
+
+            new_dirs[path] = entry
+            for name in entry['subdirs']:
+                stack.append(os.path.join(path, name))
+
+        self.dirs = new_dirs
+        self._rebuild_dates()
+        self.save()
+        return rescanned
+
+    def _scan_directory(self, path, mtime_ns, now):
+        """List a single directory, recording dated files and subdirectories."""
+        files = []
+        subdirs = []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        # Match os.walk: list symlinked directories but don't descend into them
+                        if not entry.is_symlink():
+                            subdirs.append(entry.name)
+                        continue
+                    date = self._extract_date(os.path.join(path, entry.name))
+                    if date:
+                        files.append([entry.name, date])
+        except OSError as e:
+            print(f"Error scanning {path}: {e}")
+            return None
+
+        if now - mtime_ns / 1e9 < self.MTIME_SETTLE_SECONDS:
+            mtime_ns = None
+        return {'mtime_ns': mtime_ns, 'files': files, 'subdirs': subdirs}
+
+    def _extract_date(self, file_path):
+        """Extracts the date from a file path using a regular expression."""
+        match = self.date_pattern.search(file_path)
+        return match.group(1) if match else None
+
+    def _rebuild_dates(self):
+        """Rebuild the date -> files mapping from the per-directory entries."""
+        by_date = {}
+        for path, entry in self.dirs.items():
+            for name, date in entry['files']:
+                by_date.setdefault(date, []).append(os.path.join(path, name))
+        for files in by_date.values():
+            files.sort()
+        self.by_date = by_date
+
+    def files_for_date(self, date):
+        """Return the indexed files for a date (YYYY-MM-DD)."""
+        return list(self.by_date.get(date, []))
+
+    def dates(self):
+        """Return the set of dates that have at least one file."""
+        return set(self.by_date)
+
+    def all_files(self):
+        """Return every indexed file."""
+        return [file for files in self.by_date.values() for file in files]
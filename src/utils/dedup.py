@@ -0,0 +1,115 @@
+import re
+
+# Sections of DirectoryReader.read_data_for_date output: "\n\n--- File: name ---\n<content>"
+FILE_HEADER = re.compile(r"(\n\n--- File: [^\n]* ---\n)")
+_WORD = re.compile(r"\S+")
+
+OVERLAP_MARKER = "[...]"
+DUPLICATE_NOTE = "[overlaps the Bee transcript]"
+
+
+class CrossSourceDeduplicator:
+    """
+    Removes the parts of a secondary transcript that repeat the primary one.
+
+    Bee and Limitless often record the same conversation. Both day texts are
+    shingled into overlapping word k-grams; the secondary text is cut into
+    windows of window_tokens words, and a window is dropped when at least
+    threshold of its shingles also occur in the primary text. Consecutive
+    dropped windows collapse into a single marker, and a file whose content
+    is dropped entirely keeps its header with a note, so the model still
+    knows both sources covered the day.
+    """
+
+    def __init__(self, shingle_size=3, window_tokens=30, threshold=0.5):
+        self.shingle_size = shingle_size
+        self.window_tokens = window_tokens
+        self.threshold = threshold
+
+    def _shingles(self, words):
+        k = self.shingle_size
+        if len(words) < k:
+            return {tuple(words)} if words else set()
+        return {tuple(words[i:i + k]) for i in range(len(words) - k + 1)}
+
+    def deduplicate(self, primary, secondary):
+        """
+        Return the secondary text without the windows already covered by primary.
+
+        Returns:
+            tuple: (deduplicated secondary text, characters removed, windows removed)
+        """
+        if not primary or not secondary:
+            return secondary, 0, 0
+
+        primary_shingles = set()
+        for part in FILE_HEADER.split(primary):
+            if not FILE_HEADER.fullmatch(part):
+                primary_shingles |= self._shingles(part.lower().split())
+        if not primary_shingles:
+            return secondary, 0, 0
+
+        pieces = []
+        removed_chars = 0
+        removed_windows = 0
+        for part in FILE_HEADER.split(secondary):
+            if not part or FILE_HEADER.fullmatch(part):
+                pieces.append(part)
+                continue
+            kept, chars, windows = self._filter_section(part, primary_shingles)
+            pieces.append(kept)
+            removed_chars += chars
+            removed_windows += windows
+        return "".join(pieces), removed_chars, removed_windows
+
+    def _filter_section(self, text, primary_shingles):
+        """
+        Drop the duplicated windows of one file's content.
+
+        Only the character spans of dropped windows are cut, so the line
+        breaks and speaker turns around the kept windows stay as they were.
+        """
+        words = list(_WORD.finditer(text))
+        pieces = []
+        position = 0
+        dropped = None
+        removed_chars = 0
+        removed_windows = 0
+        kept_windows = 0
+        for start in range(0, len(words), self.window_tokens):
+            window = words[start:start + self.window_tokens]
+            shingles = self._shingles([w.group().lower() for w in window])
+            overlap = len(shingles & primary_shingles) / len(shingles) if shingles else 0.0
+            if overlap >= self.threshold:
+                removed_windows += 1
+                # Consecutive dropped windows become one span (and one marker)
+                dropped = (dropped[0] if dropped else window[0].start(), window[-1].end())
+                continue
+            kept_windows += 1
+            if dropped:
+                pieces += [text[position:dropped[0]], OVERLAP_MARKER]
+                removed_chars += dropped[1] - dropped[0]
+                position = dropped[1]
+                dropped = None
+        if dropped:
+            pieces += [text[position:dropped[0]], OVERLAP_MARKER]
+            removed_chars += dropped[1] - dropped[0]
+            position = dropped[1]
+        pieces.append(text[position:])
+
+        if not removed_windows:
+            return text, 0, 0
+        if not kept_windows:
+            return DUPLICATE_NOTE, removed_chars, removed_windows
+        return "".join(pieces), removed_chars, removed_windows
+
+
+def create_deduplicator(config):
+    """Create the cross-source deduplicator, or None if CROSS_SOURCE_DEDUP is off."""
+    if not config.get('CROSS_SOURCE_DEDUP', True):
+        return None
+    return CrossSourceDeduplicator(
+        shingle_size=config.get('DEDUP_SHINGLE_SIZE', 3),
+        window_tokens=config.get('DEDUP_WINDOW_TOKENS', 30),
+        threshold=config.get('DEDUP_THRESHOLD', 0.5)
+    )
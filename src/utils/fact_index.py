@@ -0,0 +1,153 @@
+import re
+import math
+from collections import Counter, defaultdict
+from utils.stopwords import ENGLISH_STOPWORDS
+
+_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+_HEADING_PATTERN = re.compile(r"^\s{0,3}#{1,6}\s")
+_ITEM_PATTERN = re.compile(r"^\s{0,3}(?:[-*+]|\d+[.)])\s")
+
+
+def index_terms(text):
+    """Lowercased content words of a text, with stopwords dropped and plurals folded."""
+    terms = []
+    for word in _WORD_PATTERN.findall(text.lower()):
+        if len(word) < 2 or word in ENGLISH_STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+            word = word[:-1]
+        terms.append(word)
+    return terms
+
+
+def split_entries(text):
+    """
+    Split a markdown facts/errors file into entries.
+
+    Every list item (with its continuation lines) and every other paragraph
+    is one entry. Headings are not entries themselves; each entry remembers
+    the heading it appears under.
+
+    Returns:
+        list: (heading, entry_text) tuples in file order
+    """
+    entries = []
+    heading = None
+    current = []
+
+    def flush():
+        if current:
+            entries.append((heading, "\n".join(current).strip()))
+            current.clear()
+
+    for line in text.splitlines():
+        if not line.strip():
+            flush()
+        elif _HEADING_PATTERN.match(line):
+            flush()
+            heading = line.strip()
+        elif _ITEM_PATTERN.match(line):
+            flush()
+            current.append(line.rstrip())
+        else:
+            current.append(line.rstrip())
+    flush()
+    return entries
+
+
+class FactIndex:
+    """
+    BM25 index over the entries of a supplemental file (facts.md, errors.md).
+
+    select() returns only the entries relevant to one day's transcripts: the
+    best scoring ones up to top_k entries and budget_chars characters, in file
+    order and under their headings. Files that already fit in the budget, or
+    any file when retrieval is disabled, are returned whole.
+    """
+
+    def __init__(self, text, top_k=20, budget_chars=4000, enabled=True, k1=1.2, b=0.75):
+        self.text = text
+        self.top_k = top_k
+        self.budget_chars = budget_chars
+        self.k1 = k1
+        self.b = b
+        self.retrieve = bool(enabled and text and budget_chars and len(text) > budget_chars)
+        self.entries = []
+        if not self.retrieve:
+            return
+
+        self.entries = split_entries(text)
+        # term -> [(entry index, term frequency)]
+        self.postings = defaultdict(list)
+        self.lengths = []
+        for i, (heading, entry) in enumerate(self.entries):
+            terms = index_terms(entry) + (index_terms(heading) if heading else [])
+            self.lengths.append(len(terms))
+            for term, count in Counter(terms).items():
+                self.postings[term].append((i, count))
+        count = len(self.entries)
+        self.average_length = (sum(self.lengths) / count) if count else 0.0
+        self.idf = {term: math.log(1 + (count - len(p) + 0.5) / (len(p) + 0.5))
+                    for term, p in self.postings.items()}
+
+    def scores(self, query):
+        """Return {entry index: BM25 score} for the distinct terms of query."""
+        scores = defaultdict(float)
+        k1, b, average = self.k1, self.b, self.average_length or 1.0
+        for term in set(index_terms(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf[term]
+            for i, tf in postings:
+                norm = k1 * (1 - b + b * self.lengths[i] / average)
+                scores[i] += idf * tf * (k1 + 1) / (tf + norm)
+        return scores
+
+    def select(self, *day_texts):
+        """
+        Return the part of the file relevant to a day.
+
+        Args:
+            *day_texts: The day's transcripts (None entries are ignored)
+
+        Returns:
+            str: Selected entries, the whole file, or None if nothing is relevant
+        """
+        if not self.retrieve:
+            return self.text
+
+        scores = self.scores("\n".join(t for t in day_texts if t))
+        chosen = []
+        used = 0
+        for i in sorted(scores, key=lambda i: (-scores[i], i)):
+            if len(chosen) >= self.top_k:
+                break
+            size = len(self.entries[i][1]) + 1
+            if used + size > self.budget_chars:
+                continue
+            chosen.append(i)
+            used += size
+        if not chosen:
+            return None
+
+        # File order keeps the selection readable and the prompt prefix stable across dates
+        lines = []
+        heading = None
+        for i in sorted(chosen):
+            entry_heading, entry = self.entries[i]
+            if entry_heading and entry_heading != heading:
+                lines.append(entry_heading)
+            heading = entry_heading
+            lines.append(entry)
+        return "\n".join(lines)
+
+
+def create_fact_index(text, config):
+    """Build the index for a facts/errors file from the FACT_RETRIEVAL* settings."""
+    return FactIndex(
+        text,
+        top_k=config.get('FACT_RETRIEVAL_TOP_K', 20),
+        budget_chars=config.get('FACT_RETRIEVAL_BUDGET_CHARS', 4000),
+        enabled=config.get('FACT_RETRIEVAL', True)
+    )
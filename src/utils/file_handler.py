@@ -1,4 +1,6 @@
 import os
+import mmap
+import codecs
 
 def read_file(file_path):
     """Read the contents of a file and return it."""
@@ -15,6 +17,90 @@ def read_file(file_path):
         print(f"❌ Error reading file {file_path}: {e}")
         return None
 
+def read_text_prefix(file_path, max_chars=None, mmap_threshold=None):
+    """
+    Read at most max_chars characters of a UTF-8 text file without loading the rest.
+
+    Args:
+        file_path (str): File to read
+        max_chars (int): Character limit, or None to read the whole file
+        mmap_threshold (int): Map files of at least this many bytes instead of
+            reading them through a buffer (None disables mmap)
+
+    Returns:
+        tuple: (content, truncated, size_bytes)
+    """
+    size_bytes = os.path.getsize(file_path)
+    if max_chars is None:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return f.read(), False, size_bytes
+
+    if mmap_threshold and size_bytes >= mmap_threshold:
+        # A UTF-8 character is at most 4 bytes, so this slice covers max_chars + 1 characters
+        with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            head = mapped[:(max_chars + 1) * 4]
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        content = decoder.decode(head, final=len(head) == size_bytes)
+        # Same universal-newline translation as the text-mode branch
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    else:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read(max_chars + 1)
+
+    if len(content) > max_chars:
+        return content[:max_chars], True, size_bytes
+    return content, False, size_bytes
+
+class AtomicFileWriter:
+    """
+    Write a file through a hidden temporary file in the same directory and
+    rename it into place on commit, so readers never see a partial file.
+
+    Used as a context manager, the temporary file is discarded if the block
+    raises or exits without calling commit().
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        directory, name = os.path.split(file_path)
+        self.tmp_path = os.path.join(directory, f".{name}.partial")
+        self.chars_written = 0
+        self._file = open(self.tmp_path, 'w', encoding='utf-8')
+
+    def write(self, text):
+        """Append text and flush it so progress is visible on disk."""
+        self._file.write(text)
+        self._file.flush()
+        self.chars_written += len(text)
+
+    def reset(self):
+        """Discard everything written so far (e.g. before a retry)."""
+        self._file.seek(0)
+        self._file.truncate()
+        self.chars_written = 0
+
+    def commit(self):
+        """Make the content durable and atomically move it into place."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self.tmp_path, self.file_path)
+
+    def abort(self):
+        """Close and remove the temporary file."""
+        if not self._file.closed:
+            self._file.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if not self._file.closed:
+            self.abort()
+        return False
+
 def write_file(file_path, content):
     """Write content to a file."""
     try:
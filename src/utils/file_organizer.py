@@ -1,90 +1,186 @@
 import os
 import re
+import json
+import errno
 import calendar
 import shutil
-from utils.file_handler import ensure_directory_exists
+from config import get_cache_dir
 
 
 class FileOrganizer:
     """
     Handles organization of files into a year/month directory structure
     based on dates in filenames.
+
+    Work is split into a plan (one os.scandir pass per root collecting every
+    move) and its execution (each target directory created once, files moved
+    with os.replace). The plan is written to an operation journal before any
+    file moves, so a run interrupted halfway is completed by the next one.
     """
-    
-    def __init__(self):
+
+    def __init__(self, journal_path=None):
         # Pattern to extract date from filenames (assuming YYYY-MM-DD format)
         self.date_pattern = re.compile(r'(\d{4})-(\d{2})-\d{2}')
-    
-    def organize_directory(self, directory_path):
+        self.journal_path = journal_path
+        # Target directories known to exist, so they're created once per process
+        self._known_dirs = set()
+
+    def plan_directory(self, directory_path):
         """
-        Organizes files in a directory by moving them into a year/month structure
-        based on dates in the filenames.
-        
+        Plan the moves that organize the files at the root of a directory.
+
         Args:
             directory_path (str): Path to directory containing files to organize
-            
+
         Returns:
-            int: Number of files organized
+            list: (source_path, target_path) pairs
         """
-        # Get only files at the root level that need organization
+        moves = []
         try:
-            root_files = [f for f in os.listdir(directory_path) 
-                      if os.path.isfile(os.path.join(directory_path, f))]
+            with os.scandir(directory_path) as entries:
+                for entry in entries:
+                    # Hidden files include in-progress writes (.name.partial)
+                    if entry.name.startswith('.') or not entry.is_file():
+                        continue
+                    match = self.date_pattern.search(entry.name)
+                    if not match:
+                        continue
+                    year, month_num = match.groups()
+                    if not 1 <= int(month_num) <= 12:
+                        continue
+                    # Convert month number to name
+                    month_name = calendar.month_name[int(month_num)]
+                    moves.append((entry.path, os.path.join(directory_path, year, month_name, entry.name)))
         except FileNotFoundError:
             print(f"Directory not found: {directory_path}")
+        return moves
+
+    def execute_plan(self, moves):
+        """
+        Carry out planned moves, journaling them first when a journal path is set.
+
+        Moves whose source is gone and whose target exists were completed by an
+        earlier, interrupted run and are skipped.
+
+        Returns:
+            int: Number of files moved
+        """
+        if not moves:
+            return 0
+        self._write_journal(moves)
+
+        moved = 0
+        for source_path, target_path in moves:
+            target_dir = os.path.dirname(target_path)
+            if target_dir not in self._known_dirs:
+                os.makedirs(target_dir, exist_ok=True)
+                self._known_dirs.add(target_dir)
+            try:
+                os.replace(source_path, target_path)
+            except FileNotFoundError:
+                if not os.path.exists(target_path):
+                    print(f"⚠️ {source_path} disappeared before it could be organized")
+                continue
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise
+                # Target on another filesystem: fall back to copy and delete
+                shutil.move(source_path, target_path)
+            moved += 1
+
+        self._clear_journal()
+        return moved
+
+    def resume(self):
+        """Finish the moves of an interrupted run, if its journal is still present."""
+        moves = self._read_journal()
+        if moves is None:
             return 0
-            
-        if not root_files:
-            return 0  # No files need organizing
-        
-        organized_count = 0
-        for file in root_files:
-            match = self.date_pattern.search(file)
-            if match:
-                year, month_num = match.groups()
-                # Convert month number to name
-                month_name = calendar.month_name[int(month_num)]
-                
-                # Create year directory if it doesn't exist
-                year_dir = os.path.join(directory_path, year)
-                ensure_directory_exists(year_dir)
-                
-                # Create month directory if it doesn't exist
-                month_dir = os.path.join(year_dir, month_name)
-                ensure_directory_exists(month_dir)
-                
-                # Move the file to the appropriate directory
-                source_path = os.path.join(directory_path, file)
-                target_path = os.path.join(month_dir, file)
-                
-                # Only move if file isn't already in the correct location
-                if source_path != target_path:
-                    shutil.move(source_path, target_path)
-                    organized_count += 1
-        
-        return organized_count
-    
-    def organize_all_directories(self, config):
+        print(f"Resuming interrupted file organization ({len(moves)} planned moves)")
+        return self.execute_plan(moves)
+
+    def _write_journal(self, moves):
+        if not self.journal_path:
+            return
+        os.makedirs(os.path.dirname(self.journal_path), exist_ok=True)
+        tmp_path = self.journal_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'moves': moves}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.journal_path)
+
+    def _read_journal(self):
+        if not self.journal_path:
+            return None
+        try:
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                return [tuple(move) for move in json.load(f)['moves']]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️ Ignoring unreadable organizer journal {self.journal_path}: {e}")
+            self._clear_journal()
+            return None
+
+    def _clear_journal(self):
+        if self.journal_path and os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+
+    def organize_directory(self, directory_path, dry_run=False):
+        """
+        Organizes files in a directory by moving them into a year/month structure
+        based on dates in the filenames.
+
+        Args:
+            directory_path (str): Path to directory containing files to organize
+            dry_run (bool): Only print the planned moves
+
+        Returns:
+            int: Number of files organized (or planned, for a dry run)
+        """
+        moves = self.plan_directory(directory_path)
+        if dry_run:
+            self._print_plan(moves)
+            return len(moves)
+        return self.execute_plan(moves)
+
+    def _print_plan(self, moves):
+        for source_path, target_path in moves:
+            print(f"  {source_path} -> {target_path}")
+
+    def organize_all_directories(self, config, dry_run=False):
         """
         Organizes files in all configured directories (BEE_DATA, LIMITLESS_DATA, OUTPUT_DIR).
-        
+
         Args:
             config (dict): Application configuration containing directory paths
-            
+            dry_run (bool): Only print the planned moves
+
         Returns:
             tuple: Count of organized files in each directory (bee, limitless, output)
         """
-        # Check if organization is needed
-        bee_organized = self.organize_directory(config['BEE_DATA'])
-        limitless_organized = self.organize_directory(config['LIMITLESS_DATA'])
-        
         # Ensure OUTPUT_DIR exists
-        ensure_directory_exists(config['OUTPUT_DIR'])
-        output_organized = self.organize_directory(config['OUTPUT_DIR'])
-        
+        os.makedirs(config['OUTPUT_DIR'], exist_ok=True)
+        if self.journal_path is None:
+            self.journal_path = os.path.join(get_cache_dir(config), 'organizer_journal.json')
+        if not dry_run:
+            self.resume()
+
+        # Plan all three trees, then journal and execute them as one operation
+        plans = [self.plan_directory(config[key]) for key in ('BEE_DATA', 'LIMITLESS_DATA', 'OUTPUT_DIR')]
+        if dry_run:
+            for key, moves in zip(('BEE_DATA', 'LIMITLESS_DATA', 'OUTPUT_DIR'), plans):
+                print(f"{key}: {len(moves)} file(s) would be organized")
+                self._print_plan(moves)
+            return tuple(len(moves) for moves in plans)
+
+        self.execute_plan([move for moves in plans for move in moves])
+        bee_organized, limitless_organized, output_organized = (len(moves) for moves in plans)
+
         if bee_organized or limitless_organized or output_organized:
             print(f"✓ Organized {bee_organized} BEE files, {limitless_organized} LIMITLESS files, and {output_organized} OUTPUT files")
         else:
             print("No new files to organize in root directories")
-            
-        return (bee_organized, limitless_organized, output_organized)
\ No newline at end of file
+
+        return (bee_organized, limitless_organized, output_organized)
@@ -0,0 +1,221 @@
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+PROMETHEUS_PREFIX = 'ai_summarizer'
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+
+class RunMetrics:
+    """
+    Per-run telemetry: stage durations and counters, optionally per date
+    (a date's totals hold its stage seconds next to its counters).
+
+    Every observation is appended to a JSON lines file (when configured) as
+    it happens; finish() emits an end-of-run summary line, rewrites the
+    Prometheus textfile and starts a fresh run, so long-lived daemon and
+    watch processes report one run at a time. Safe to use from worker threads.
+    """
+
+    def __init__(self, jsonl_path=None, prometheus_path=None):
+        self.jsonl_path = jsonl_path
+        self.prometheus_path = prometheus_path
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.started = time.time()
+        self.durations = {}
+        self.counters = {}
+        self.per_date = {}
+
+    def observe(self, stage, seconds, date=None, **fields):
+        """Record one duration for a stage (and date, if given)."""
+        with self._lock:
+            self.durations.setdefault(stage, []).append(seconds)
+            if date:
+                stages = self.per_date.setdefault(date, {})
+                stages[stage] = stages.get(stage, 0.0) + seconds
+        self._emit({'type': 'stage', 'stage': stage, 'date': date, 'seconds': round(seconds, 6), **fields})
+
+    @contextmanager
+    def stage(self, stage, date=None):
+        """Time the enclosed block as one observation of a stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start, date)
+
+    def add(self, name, value=1, date=None):
+        """Increment a counter such as prompt_tokens or bytes_read (and its total for a date, if given)."""
+        if not value:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+            if date:
+                totals = self.per_date.setdefault(date, {})
+                totals[name] = totals.get(name, 0) + value
+        self._emit({'type': 'counter', 'name': name, 'date': date, 'value': value})
+
+    def event(self, record_type, date=None, **fields):
+        """Append a structured record (e.g. a per-date report) to the JSON lines file."""
+        self._emit({'type': record_type, 'date': date, **fields})
+
+    def export(self):
+        """Return the raw observations, e.g. to send metrics recorded in a worker process back."""
+        with self._lock:
+            return {'durations': {stage: list(values) for stage, values in self.durations.items()},
+                    'counters': dict(self.counters)}
+
+    def merge(self, exported, date=None):
+        """Fold observations from export() (of another process) into this run."""
+        for stage, values in exported['durations'].items():
+            for seconds in values:
+                self.observe(stage, seconds, date)
+        for name, value in exported['counters'].items():
+            self.add(name, value, date)
+
+    def summary(self):
+        """Return the aggregated metrics of the current run."""
+        with self._lock:
+            stages = {
+                stage: {
+                    'count': len(values),
+                    'total': round(sum(values), 4),
+                    'p50': round(_percentile(values, 0.5), 4),
+                    'p95': round(_percentile(values, 0.95), 4),
+                    'max': round(max(values), 4),
+                }
+                for stage, values in self.durations.items()
+            }
+            return {
+                'started': datetime.fromtimestamp(self.started).isoformat(timespec='seconds'),
+                'elapsed': round(time.time() - self.started, 3),
+                'stages': stages,
+                'counters': {name: round(value, 3) if isinstance(value, float) else value
+                             for name, value in self.counters.items()},
+                'dates': {date: {k: round(v, 4) for k, v in totals.items()}
+                          for date, totals in self.per_date.items()},
+            }
+
+    def finish(self, **results):
+        """
+        Close the current run: emit the summary, write the Prometheus textfile
+        and reset the aggregates.
+
+        Args:
+            **results: Extra run results (e.g. processed=3) folded into the counters
+
+        Returns:
+            dict: The run summary
+        """
+        for name, value in results.items():
+            self.add(name, value)
+        summary = self.summary()
+        self._emit({'type': 'summary', **summary})
+        if self.prometheus_path:
+            try:
+                self._write_prometheus(summary)
+            except OSError as e:
+                print(f"⚠️ Could not write Prometheus metrics to {self.prometheus_path}: {e}")
+        with self._lock:
+            self._reset()
+        return summary
+
+    def _emit(self, record):
+        if not self.jsonl_path:
+            return
+        record = {'ts': round(time.time(), 3), **record}
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            try:
+                with open(self.jsonl_path, 'a', encoding='utf-8') as f:
+                    f.write(line)
+            except OSError as e:
+                print(f"⚠️ Could not write metrics to {self.jsonl_path}: {e}")
+                self.jsonl_path = None
+
+    def _write_prometheus(self, summary):
+        """Write the run summary in the node_exporter textfile collector format."""
+        p = PROMETHEUS_PREFIX
+        lines = [
+            f"# HELP {p}_last_run_timestamp_seconds Unix time the last run finished.",
+            f"# TYPE {p}_last_run_timestamp_seconds gauge",
+            f"{p}_last_run_timestamp_seconds {time.time():.0f}",
+            f"# HELP {p}_last_run_duration_seconds Wall time of the last run.",
+            f"# TYPE {p}_last_run_duration_seconds gauge",
+            f"{p}_last_run_duration_seconds {summary['elapsed']}",
+            f"# HELP {p}_stage_seconds Total time spent in each stage during the last run.",
+            f"# TYPE {p}_stage_seconds gauge",
+        ]
+        lines += [f'{p}_stage_seconds{{stage="{stage}"}} {s["total"]}' for stage, s in sorted(summary['stages'].items())]
+        lines += [
+            f"# HELP {p}_stage_count Observations of each stage during the last run.",
+            f"# TYPE {p}_stage_count gauge",
+        ]
+        lines += [f'{p}_stage_count{{stage="{stage}"}} {s["count"]}' for stage, s in sorted(summary['stages'].items())]
+        lines += [
+            f"# HELP {p}_stage_p95_seconds 95th percentile duration of each stage during the last run.",
+            f"# TYPE {p}_stage_p95_seconds gauge",
+        ]
+        lines += [f'{p}_stage_p95_seconds{{stage="{stage}"}} {s["p95"]}' for stage, s in sorted(summary['stages'].items())]
+        for name, value in sorted(summary['counters'].items()):
+            lines += [f"# TYPE {p}_last_run_{name} gauge", f"{p}_last_run_{name} {value}"]
+
+        directory = os.path.dirname(os.path.abspath(self.prometheus_path))
+        os.makedirs(directory, exist_ok=True)
+        # node_exporter may read the file at any time, so replace it atomically
+        tmp_path = self.prometheus_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, self.prometheus_path)
+
+
+def create_metrics(config):
+    """Create the run metrics sink from METRICS_FILE / METRICS_PROMETHEUS_FILE."""
+    jsonl_path = config.get('METRICS_FILE')
+    if jsonl_path:
+        os.makedirs(os.path.dirname(os.path.abspath(jsonl_path)), exist_ok=True)
+    return RunMetrics(jsonl_path, config.get('METRICS_PROMETHEUS_FILE'))
+
+
+def print_metrics_summary(summary):
+    """Print the end-of-run metrics summary."""
+    stages = summary['stages']
+    counters = summary['counters']
+    if stages:
+        print("\nStage timings (seconds):")
+        print(f"  {'stage':<16}{'count':>7}{'total':>10}{'p50':>9}{'p95':>9}{'max':>9}")
+        for stage, s in sorted(stages.items(), key=lambda item: -item[1]['total']):
+            print(f"  {stage:<16}{s['count']:>7}{s['total']:>10.2f}{s['p50']:>9.2f}{s['p95']:>9.2f}{s['max']:>9.2f}")
+
+    if counters.get('prompt_tokens') or counters.get('completion_tokens'):
+        prompt_tokens = counters.get('prompt_tokens', 0)
+        cached = counters.get('cached_prompt_tokens', 0)
+        cached_share = f" ({cached} cached, {cached / prompt_tokens:.0%})" if cached and prompt_tokens else ""
+        print(f"Tokens: {prompt_tokens} prompt{cached_share}, {counters.get('completion_tokens', 0)} completion")
+    if counters.get('retries'):
+        print(f"Retries: {counters['retries']} "
+              f"({counters.get('retry_wait_seconds', 0):.1f}s backoff, "
+              f"{counters.get('rate_limit_wait_seconds', 0):.1f}s of it for rate limits)")
+    if counters.get('bytes_read'):
+        truncated = counters.get('bytes_truncated', 0)
+        print(f"Source data: {counters['bytes_read'] / 1_000_000:.2f} MB read"
+              + (f", {truncated / 1_000_000:.2f} MB truncated" if truncated else ""))
+    if counters.get('dedup_tokens_saved'):
+        print(f"Cross-source dedup: ~{counters['dedup_tokens_saved']} tokens of repeated Limitless data removed")
+    if counters.get('budget_compact_tokens') or counters.get('budget_trim_tokens'):
+        print(f"Token budget: {counters.get('budget_compact_tokens', 0)} tokens of whitespace compacted, "
+              f"{counters.get('budget_trim_tokens', 0)} tokens trimmed to fit the context")
+    if counters.get('supplement_chars_omitted'):
+        print(f"Fact retrieval: {counters['supplement_chars_omitted']} chars of facts/errors left out of prompts")
+    if counters.get('cache_hits') or counters.get('cache_misses'):
+        print(f"Response cache: {counters.get('cache_hits', 0)} hit(s), {counters.get('cache_misses', 0)} miss(es)")
@@ -1,39 +1,145 @@
 import time
 import random
-from openai import OpenAI
-# Update the error imports for newer OpenAI SDK versions
-from openai import APIError, APIConnectionError, RateLimitError, AuthenticationError # Added AuthenticationError
-import sys # Added import
+import os
+from config import get_cache_dir
+from utils.response_cache import ResponseCache
+from utils.metrics import RunMetrics
+from utils.rate_limiter import shared_rate_limiter, retry_after_seconds
+
+class ContextLengthExceededError(Exception):
+    """Raised when a prompt does not fit in the model's context window."""
+
+
+class FatalAPIError(Exception):
+    """Raised when no request can succeed (e.g. the API key was rejected), so the run should stop."""
+
 
 class OpenAIHandler:
-    def __init__(self, config):
-        self.client = OpenAI(api_key=config['OPENAI_API_KEY'])
+    def __init__(self, config, metrics=None):
+        # The SDK is imported here rather than at module level: it is by far the
+        # slowest import and isn't needed until services are set up
+        from openai import OpenAI
+        # OPENAI_BASE_URL points the client at any OpenAI-compatible server,
+        # e.g. benchmarks/stub_openai_server.py for load tests
+        # With the shared rate limiter, 429s must reach our own handler (which
+        # holds back every caller) instead of being retried inside the SDK
+        default_sdk_retries = 0 if config.get('RATE_LIMIT', True) else 2
+        self.client = OpenAI(api_key=config['OPENAI_API_KEY'],
+                             base_url=config.get('OPENAI_BASE_URL') or None,
+                             max_retries=config.get('OPENAI_SDK_MAX_RETRIES', default_sdk_retries))
         self.model = config['OPEN_AI_MODEL']
         # Load journal prompt template during initialization
         self.journal_prompt_path = config.get('JOURNAL_PROMPT', '')
         self.journal_template = self._load_prompt_template(self.journal_prompt_path)
+        self.cache = self._create_cache(config)
+        # API latency, token counts and retry/backoff time
+        self.metrics = metrics or RunMetrics()
+        self.rate_limiter = self._create_rate_limiter(config)
+        self.max_rate_limit_retries = config.get('RATE_LIMIT_MAX_RETRIES', 8)
+        self.completion_token_estimate = config.get('RATE_LIMIT_COMPLETION_TOKENS', 1000)
+
+    def _create_rate_limiter(self, config):
+        """Return the limiter shared by all handlers using the same endpoint and model, or None."""
+        if not config.get('RATE_LIMIT', True):
+            return None
+        return shared_rate_limiter(
+            (config.get('OPENAI_BASE_URL'), self.model),
+            requests_per_minute=config.get('RATE_LIMIT_RPM'),
+            tokens_per_minute=config.get('RATE_LIMIT_TPM'),
+            headroom=config.get('RATE_LIMIT_HEADROOM', 0.95)
+        )
+
+    def _create_cache(self, config):
+        """Create the on-disk response cache unless it is disabled."""
+        if not config.get('RESPONSE_CACHE', True):
+            return None
+        if not (config.get('CACHE_DIR') or config.get('OUTPUT_DIR')):
+            return None
+        max_mb = config.get('RESPONSE_CACHE_MAX_MB', 500)
+        max_age_days = config.get('RESPONSE_CACHE_MAX_AGE_DAYS')
+        cache = ResponseCache(
+            os.path.join(get_cache_dir(config), 'responses'),
+            max_bytes=max_mb * 1024 * 1024 if max_mb else None,
+            max_age_seconds=max_age_days * 86400 if max_age_days else None,
+            bypass=config.get('RESPONSE_CACHE_BYPASS', False)
+        )
+        if cache.bypass:
+            print("Response cache bypassed: all prompts will be sent to OpenAI")
+        return cache
         
-    def generate_text(self, prompt, max_retries=3, temperature=0.7):
-        """Generate text with retries for connection issues"""
+    def generate_text(self, prompt, max_retries=3, temperature=0.7, stream_to=None, date=None):
+        """
+        Generate text with retries for connection issues, serving repeats from the cache.
+
+        If stream_to is given (an object with write() and reset(), such as
+        AtomicFileWriter), the completion is streamed into it as tokens arrive;
+        it is reset before every attempt so retries start from a clean slate.
+        Token counts, retries and cache hits are recorded for date, if given.
+        """
+        from openai import APIError, APIConnectionError, RateLimitError, AuthenticationError
+
+        cache_key = None
+        if self.cache:
+            cache_key = ResponseCache.make_key(self.model, prompt, temperature)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                self.metrics.add('cache_hits', 1, date)
+                print(f"✓ Using cached response (prompt length: {len(prompt)} chars)")
+                return cached
+            self.metrics.add('cache_misses', 1, date)
+
         attempt = 0
+        rate_limited = 0
+        token_estimate = self.estimate_tokens(prompt)
         while attempt < max_retries:
+            # Tokens reserved on the rate limiter for this attempt, until settled
+            reservation = None
             try:
-                return self._send_prompt(prompt, temperature)
+                if self.rate_limiter:
+                    waited = self.rate_limiter.acquire(token_estimate)
+                    reservation = {'tokens': token_estimate}
+                    if waited > 0.01:
+                        self.metrics.add('throttle_wait_seconds', waited, date)
+                if stream_to is not None:
+                    stream_to.reset()
+                    response = self._send_prompt_stream(prompt, temperature, stream_to, reservation, date)
+                else:
+                    response = self._send_prompt(prompt, temperature, reservation, date)
+                # Without reported usage the estimate stands as the cost
+                reservation = None
+                if cache_key:
+                    self.cache.put(cache_key, response, self.model)
+                return response
             except AuthenticationError as e: # Catch AuthenticationError specifically
                 print(f"\n❌ FATAL ERROR: OpenAI Authentication Failed (Invalid API Key?):")
                 print(f"   {str(e)}")
                 print(f"\nPlease check your API key and ensure it's valid and has permissions.")
-                print("Exiting application.")
-                sys.exit(1) # Exit the application
+                raise FatalAPIError(f"OpenAI authentication failed: {e}") from e
+            except RateLimitError as e:
+                # Wait as long as the server asks; these waits don't use up the retry budget
+                rate_limited += 1
+                if rate_limited > self.max_rate_limit_retries:
+                    print(f"Still rate limited after {self.max_rate_limit_retries} waits, giving up")
+                    return None
+                headers = getattr(getattr(e, 'response', None), 'headers', None)
+                if self.rate_limiter:
+                    self.rate_limiter.update(headers)
+                sleep_time = retry_after_seconds(headers)
+                if sleep_time is None:
+                    sleep_time = 20 + random.uniform(0, 10)
+                print(f"Rate limit exceeded. Waiting {sleep_time:.2f} seconds...")
+                if self.rate_limiter:
+                    # Hold back every caller sharing the limiter, not just this one
+                    self.rate_limiter.penalize(sleep_time)
+                self._backoff(sleep_time, rate_limited=True, date=date)
             except (APIError, APIConnectionError) as e:
                 error_str = str(e)
                 
                 # Check specifically for context length exceeded error
+                # Retrying cannot help; let the caller split the input instead
                 if "context_length_exceeded" in error_str or "maximum context length" in error_str:
-                    print(f"\n❌ FATAL ERROR: The prompt is too large for the model's context window:")
-                    print(f"   {error_str}")
-                    print(f"\nThe application will now terminate. Please reduce the amount of data being processed.")
-                    sys.exit(1)  # Exit with error code
+                    print(f"\n❌ The prompt is too large for the model's context window ({len(prompt)} chars)")
+                    raise ContextLengthExceededError(error_str) from e
                     
                 # Handle other API errors with retry
                 attempt += 1
@@ -44,19 +150,28 @@ class OpenAIHandler:
                 # Exponential backoff with jitter
                 sleep_time = (2 ** attempt) + random.uniform(0, 1)
                 print(f"Connection error: {error_str}. Retrying in {sleep_time:.2f} seconds...")
-                time.sleep(sleep_time)
-            except RateLimitError:
-                # Special handling for rate limits
-                sleep_time = 20 + random.uniform(0, 10)
-                print(f"Rate limit exceeded. Waiting {sleep_time:.2f} seconds...")
-                time.sleep(sleep_time)
-                attempt += 1
+                self._backoff(sleep_time, date=date)
             except Exception as e:
                 print(f"Unexpected error: {str(e)}")
                 return None
+            finally:
+                # A failed attempt used no tokens: give the reservation back
+                self._settle(reservation, 0)
                 
         return None
 
+    def estimate_tokens(self, prompt):
+        """Rough token cost of a request for rate limiting: ~4 chars per prompt token plus the completion."""
+        return len(prompt) // 4 + self.completion_token_estimate
+
+    def _backoff(self, seconds, rate_limited=False, date=None):
+        """Sleep before a retry, recording the wait."""
+        self.metrics.add('retries', 1, date)
+        self.metrics.add('retry_wait_seconds', seconds, date)
+        if rate_limited:
+            self.metrics.add('rate_limit_wait_seconds', seconds, date)
+        time.sleep(seconds)
+
     def _load_prompt_template(self, path):
         """Load the prompt template from the specified path."""
         print(f"\nLoading prompt template from: {path}")
@@ -69,17 +184,82 @@ class OpenAIHandler:
             print(f"❌ Error loading prompt template: {e}")
             return None
 
-    def _send_prompt(self, prompt, temperature=0.7):
+    def build_request(self, prompt, temperature=0.7):
+        """Return the chat completion request body for a prompt."""
+        return {
+            'model': self.model,
+            'messages': [{"role": "user", "content": prompt}],
+            'temperature': temperature,
+        }
+
+    def _send_prompt(self, prompt, temperature=0.7, reservation=None, date=None):
         """Internal method to send a prompt to OpenAI and get the response content."""
         print(f"Sending prompt to OpenAI (length: {len(prompt)} chars)")
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=temperature
-        )
-        print("Received response from OpenAI")
+        start = time.perf_counter()
+        raw = self.client.chat.completions.with_raw_response.create(**self.build_request(prompt, temperature))
+        self._observe_headers(raw.headers)
+        response = raw.parse()
+        elapsed = time.perf_counter() - start
+        self.metrics.observe('api', elapsed, date, prompt_chars=len(prompt))
+        self._record_usage(getattr(response, 'usage', None), reservation, date)
+        print(f"Received response from OpenAI ({elapsed:.2f}s)")
         return response.choices[0].message.content
 
+    def _send_prompt_stream(self, prompt, temperature, writer, reservation=None, date=None):
+        """Stream a completion into writer as it arrives and return the full text."""
+        print(f"Streaming prompt to OpenAI (length: {len(prompt)} chars)")
+        start = time.perf_counter()
+        first_token = None
+        parts = []
+        raw = self.client.chat.completions.with_raw_response.create(
+            **self.build_request(prompt, temperature), stream=True, stream_options={'include_usage': True})
+        self._observe_headers(raw.headers)
+        for chunk in raw.parse():
+            # The final chunk carries token usage and no choices
+            usage = getattr(chunk, 'usage', None)
+            if usage:
+                self._record_usage(usage, reservation, date)
+            if not chunk.choices:
+                continue
+            text = chunk.choices[0].delta.content
+            if not text:
+                continue
+            if first_token is None:
+                first_token = time.perf_counter() - start
+            writer.write(text)
+            parts.append(text)
+        elapsed = time.perf_counter() - start
+        ttfb = first_token if first_token is not None else elapsed
+        self.metrics.observe('api_first_token', ttfb, date)
+        self.metrics.observe('api', elapsed, date, prompt_chars=len(prompt))
+        print(f"Received streamed response from OpenAI (first token {ttfb:.2f}s, total {elapsed:.2f}s)")
+        return "".join(parts)
+
+    def _observe_headers(self, headers):
+        """Feed the response's x-ratelimit-* headers to the rate limiter."""
+        if self.rate_limiter:
+            self.rate_limiter.update(headers)
+
+    def _settle(self, reservation, actual_tokens):
+        """Settle a rate limiter reservation once, with the tokens actually used."""
+        if not self.rate_limiter or not reservation or reservation['tokens'] is None:
+            return
+        self.rate_limiter.settle(reservation['tokens'], actual_tokens)
+        reservation['tokens'] = None
+
+    def _record_usage(self, usage, reservation=None, date=None):
+        """Add the token counts reported by the API to the run metrics and settle the limiter reservation."""
+        if not usage:
+            return
+        prompt_tokens = getattr(usage, 'prompt_tokens', 0) or 0
+        completion_tokens = getattr(usage, 'completion_tokens', 0) or 0
+        self.metrics.add('prompt_tokens', prompt_tokens, date)
+        self.metrics.add('completion_tokens', completion_tokens, date)
+        # Prompt tokens served from the provider's prefix cache (cheaper and faster)
+        details = getattr(usage, 'prompt_tokens_details', None)
+        self.metrics.add('cached_prompt_tokens', getattr(details, 'cached_tokens', 0) or 0, date)
+        self._settle(reservation, prompt_tokens + completion_tokens)
+
     def format_prompt(self, template, bee_content="", limitless_content="", facts_content="", errors_content=""):
         """Format the prompt template with all content."""
         print("\nFormatting prompt with:")
@@ -0,0 +1,223 @@
+import os
+import re
+import json
+import threading
+from config import get_cache_dir
+
+
+class OutputCatalog:
+    """
+    Persistent catalog of the generated journals in OUTPUT_DIR.
+
+    Each date maps to its journal's path (relative to OUTPUT_DIR), size, mtime
+    and the fingerprint of the source files it was generated from. Existence
+    checks and recent-file listings are answered from the catalog instead of
+    globbing the output tree. Every change is persisted atomically, right
+    after the journal itself was renamed into place. verify() reports drift
+    against the tree (journals edited, deleted or added by hand) and
+    rebuild() rescans it.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path, output_dir):
+        self.path = path
+        self.output_dir = output_dir
+        self.date_pattern = re.compile(r"(\d{4}-\d{2}-\d{2})")
+        self.entries = {}
+        self._lock = threading.Lock()
+        if not self.load():
+            print("Building the journal catalog (one-time scan of OUTPUT_DIR)...")
+            self.rebuild()
+
+    def load(self):
+        """
+        (Re)load the persisted catalog.
+
+        Returns:
+            bool: False if there is no usable catalog for this OUTPUT_DIR
+        """
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring unreadable journal catalog {self.path}: {e}")
+            return False
+        if data.get('version') != self.VERSION or data.get('output_dir') != self.output_dir:
+            return False
+        with self._lock:
+            self.entries = data.get('dates', {})
+        return True
+
+    def _save(self):
+        """Persist the catalog atomically; the caller holds the lock."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': self.VERSION, 'output_dir': self.output_dir, 'dates': self.entries},
+                      f, indent=1, sort_keys=True)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def __contains__(self, date):
+        return date in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, date):
+        """Return the catalog entry for a date, or None."""
+        return self.entries.get(date)
+
+    def exists(self, date):
+        """
+        Check that a date's cataloged journal is still on disk (one stat).
+
+        Entries whose journal was deleted by hand are dropped, so the date is
+        generated again.
+        """
+        file_path = self.path_for(date)
+        if file_path is None:
+            return False
+        if os.path.exists(file_path):
+            return True
+        with self._lock:
+            if self.entries.pop(date, None) is not None:
+                self._save()
+        print(f"⚠️ Journal for {date} was removed from OUTPUT_DIR; dropping it from the catalog")
+        return False
+
+    def path_for(self, date):
+        """Return the absolute path of a date's journal, or None."""
+        entry = self.entries.get(date)
+        return os.path.join(self.output_dir, entry['path']) if entry else None
+
+    def paths(self):
+        """Return {date: absolute journal path} for every cataloged journal."""
+        with self._lock:
+            return {date: os.path.join(self.output_dir, entry['path']) for date, entry in self.entries.items()}
+
+    def _entry(self, file_path, inputs=None):
+        st = os.stat(file_path)
+        return {
+            'path': os.path.relpath(file_path, self.output_dir),
+            'size': st.st_size,
+            'mtime_ns': st.st_mtime_ns,
+            'inputs': inputs,
+        }
+
+    def record(self, date, file_path, inputs=None):
+        """Catalog a freshly written journal; keeps the recorded inputs unless new ones are given."""
+        with self._lock:
+            entry = self._entry(file_path, inputs)
+            old = self.entries.get(date)
+            if inputs is None and old and old.get('path') == entry['path']:
+                entry['inputs'] = old.get('inputs')
+            self.entries[date] = entry
+            self._save()
+
+    def record_inputs(self, date, inputs):
+        """Store the source fingerprint a date's journal was generated from."""
+        with self._lock:
+            entry = self.entries.get(date)
+            if entry is None or entry.get('inputs') == inputs:
+                return
+            entry['inputs'] = inputs
+            self._save()
+
+    def recent(self, count=10):
+        """Return the absolute paths of the count most recently written journals."""
+        with self._lock:
+            newest = sorted(self.entries.values(), key=lambda entry: entry['mtime_ns'], reverse=True)
+        return [os.path.join(self.output_dir, entry['path']) for entry in newest[:count]]
+
+    def scan(self):
+        """
+        Walk OUTPUT_DIR for dated journals, skipping hidden files and directories.
+
+        Returns:
+            dict: date -> absolute path (the last one found wins, as before)
+        """
+        found = {}
+        stack = [self.output_dir]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as entries:
+                    for entry in entries:
+                        if entry.name.startswith('.'):
+                            continue
+                        if entry.is_dir():
+                            stack.append(entry.path)
+                        elif entry.name.endswith('.md'):
+                            match = self.date_pattern.search(entry.name)
+                            if match:
+                                found[match.group(1)] = entry.path
+            except FileNotFoundError:
+                continue
+        return found
+
+    def verify(self):
+        """
+        Compare the catalog with OUTPUT_DIR.
+
+        Returns:
+            dict: Sorted dates that are 'missing' (cataloged file gone), 'changed'
+                  (file edited or moved) and 'untracked' (journal not cataloged)
+        """
+        on_disk = self.scan()
+        drift = {'missing': [], 'changed': [], 'untracked': sorted(set(on_disk) - set(self.entries))}
+        for date, entry in sorted(self.entries.items()):
+            file_path = os.path.join(self.output_dir, entry['path'])
+            try:
+                st = os.stat(file_path)
+            except OSError:
+                (drift['changed'] if date in on_disk else drift['missing']).append(date)
+                continue
+            if st.st_size != entry['size'] or st.st_mtime_ns != entry['mtime_ns']:
+                drift['changed'].append(date)
+        return drift
+
+    def rebuild(self):
+        """
+        Rebuild the catalog from OUTPUT_DIR, keeping the recorded source
+        fingerprints of journals that are still in place.
+
+        Returns:
+            int: Number of cataloged journals
+        """
+        found = self.scan()
+        with self._lock:
+            entries = {}
+            for date, file_path in found.items():
+                old = self.entries.get(date) or {}
+                try:
+                    entry = self._entry(file_path)
+                except OSError:
+                    continue
+                if old.get('path') == entry['path']:
+                    entry['inputs'] = old.get('inputs')
+                entries[date] = entry
+            self.entries = entries
+            self._save()
+        return len(entries)
+
+
+def print_catalog_drift(drift):
+    """Print a verify() report."""
+    labels = (('missing', "cataloged but missing"), ('changed', "changed since cataloged"),
+              ('untracked', "not in the catalog"))
+    if not any(drift.values()):
+        print("✓ Journal catalog matches OUTPUT_DIR")
+        return
+    for key, label in labels:
+        if drift[key]:
+            print(f"⚠️ {len(drift[key])} journal(s) {label}: {', '.join(drift[key])}")
+
+
+
+def create_output_catalog(config):
+    """Open (or build) the journal catalog for config's OUTPUT_DIR."""
+    return OutputCatalog(os.path.join(get_cache_dir(config), 'catalog.json'), config['OUTPUT_DIR'])
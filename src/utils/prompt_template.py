@@ -0,0 +1,75 @@
+from string import Formatter
+
+
+class PromptTemplate:
+    """
+    A str.format-style prompt template parsed once and rendered many times.
+
+    With cache_layout, fields that are the same for every prompt of a run
+    (static_fields, e.g. facts and errors) are moved in front of the per-date
+    fields, so every prompt starts with the same long prefix: instructions,
+    then the static fields. Providers that cache prompt prefixes can then
+    reuse it across dates. Each field moves together with its label, i.e.
+    the text between the previous field and itself ("Known Errors: ").
+    The rendered prefix is memoized for the last set of static values.
+    """
+
+    def __init__(self, text, static_fields=(), cache_layout=True):
+        self.text = text
+        self.static_fields = tuple(static_fields)
+        parsed = list(Formatter().parse(text))
+        self.fields = [field for _, field, _, _ in parsed if field is not None]
+
+        # (literal, field) pairs; a trailing literal has field None
+        segments = [(_escape(literal), field) for literal, field, _, _ in parsed]
+        if cache_layout and self.static_fields:
+            segments = self._reorder(segments)
+
+        # Split at the first per-date field: everything before it is the static prefix
+        split = next((i for i, (_, field) in enumerate(segments)
+                      if field is not None and field not in self.static_fields), len(segments))
+        self.prefix_format = "".join(literal + _placeholder(field) for literal, field in segments[:split])
+        self.suffix_format = "".join(literal + _placeholder(field) for literal, field in segments[split:])
+        self._prefix_cache = (None, None)
+
+    def _reorder(self, segments):
+        """Move static fields (with their labels) in front of the first per-date field."""
+        first = next((i for i, (_, field) in enumerate(segments)
+                      if field is not None and field not in self.static_fields), None)
+        if first is None:
+            return segments
+
+        # The literal before the first per-date field is the instructions plus
+        # that field's label on its last line; later literals are just labels
+        head, newline, first_label = segments[first][0].rpartition("\n")
+        labelled = [(first_label, segments[first][1])] + segments[first + 1:]
+        trailing = [labelled.pop()] if labelled[-1][1] is None else []
+
+        static = [(label, field) for label, field in labelled if field in self.static_fields]
+        dynamic = [(label, field) for label, field in labelled if field not in self.static_fields]
+        ordered = [(("\n\n" if n else head + newline) + label.strip("\n"), field)
+                   for n, (label, field) in enumerate(static + dynamic)]
+        return segments[:first] + ordered + trailing
+
+    def render_prefix(self, **values):
+        """Render the static prefix (memoized for the last static values)."""
+        key = tuple(values.get(field) for field in self.static_fields)
+        cached_key, prefix = self._prefix_cache
+        if key != cached_key:
+            prefix = self.prefix_format.format(**values)
+            # One assignment, so concurrent renders never see a mismatched pair
+            self._prefix_cache = (key, prefix)
+        return prefix
+
+    def render(self, **values):
+        """Render the full prompt: the static prefix followed by the per-date part."""
+        return self.render_prefix(**values) + self.suffix_format.format(**values)
+
+
+def _escape(literal):
+    """Re-escape braces that Formatter.parse unescaped, so the pieces can be formatted again."""
+    return literal.replace("{", "{{").replace("}", "}}")
+
+
+def _placeholder(field):
+    return "" if field is None else "{" + field + "}"
@@ -0,0 +1,193 @@
+import re
+import time
+import threading
+
+# Durations in x-ratelimit-reset-* headers look like "20ms", "1s", "6m0s" or "1h2m3.5s"
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+
+
+def parse_duration(value):
+    """Parse a rate-limit reset duration ("6m0s", "20ms", "1.5") into seconds, or None."""
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def retry_after_seconds(headers):
+    """Return how long a 429 response asks us to wait, or None if it doesn't say."""
+    if not headers:
+        return None
+    retry_after_ms = headers.get('retry-after-ms')
+    if retry_after_ms is not None:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+    retry_after = parse_duration(headers.get('retry-after'))
+    if retry_after is not None:
+        return retry_after
+    # Fall back to the reset time of whichever limit is exhausted
+    waits = [parse_duration(headers.get(f'x-ratelimit-reset-{kind}'))
+             for kind in ('requests', 'tokens')
+             if headers.get(f'x-ratelimit-remaining-{kind}') == '0']
+    waits = [w for w in waits if w is not None]
+    return max(waits) if waits else None
+
+
+class _Bucket:
+    """Token bucket refilled continuously at limit-per-minute / 60."""
+
+    def __init__(self, per_minute=None):
+        self.capacity = None
+        self.level = 0.0
+        self.updated = time.monotonic()
+        if per_minute:
+            self.set_limit(per_minute, per_minute)
+
+    def set_limit(self, per_minute, level):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = min(float(level), self.capacity)
+
+    def refill(self, now):
+        if self.capacity is not None:
+            self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount):
+        """Seconds until amount is available (amounts above capacity only need a full bucket)."""
+        if self.capacity is None:
+            return 0.0
+        missing = min(amount, self.capacity) - self.level
+        return missing / self.rate if missing > 0 else 0.0
+
+
+class RateLimiter:
+    """
+    Client-side limiter with separate request and token buckets.
+
+    Limits come from config (requests/tokens per minute) and are corrected by
+    the x-ratelimit-* headers of every response, so callers sharing one
+    limiter settle just under the account's real ceiling. A 429 blocks all
+    callers until its Retry-After has passed. Thread-safe.
+    """
+
+    def __init__(self, requests_per_minute=None, tokens_per_minute=None, headroom=0.95):
+        """
+        Args:
+            requests_per_minute (int): Initial request limit, until headers report the real one
+            tokens_per_minute (int): Initial token limit, until headers report the real one
+            headroom (float): Fraction of the reported limits to use
+        """
+        self.headroom = headroom
+        self.buckets = {
+            'requests': _Bucket(requests_per_minute and requests_per_minute * headroom),
+            'tokens': _Bucket(tokens_per_minute and tokens_per_minute * headroom),
+        }
+        self.blocked_until = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self, tokens):
+        """
+        Block until one request of the given token estimate fits the limits,
+        then reserve it.
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        start = time.monotonic()
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                for bucket in self.buckets.values():
+                    bucket.refill(now)
+                wait = max(self.blocked_until - now,
+                           self.buckets['requests'].wait_time(1),
+                           self.buckets['tokens'].wait_time(tokens))
+                if wait <= 0:
+                    self.buckets['requests'].level -= 1
+                    self.buckets['tokens'].level -= tokens
+                    return time.monotonic() - start
+                self._cond.wait(wait)
+
+    def settle(self, estimated_tokens, actual_tokens):
+        """Return the difference between a reservation and the tokens actually used."""
+        if actual_tokens is None:
+            return
+        with self._cond:
+            bucket = self.buckets['tokens']
+            bucket.level += estimated_tokens - actual_tokens
+            if bucket.capacity is not None:
+                bucket.level = min(bucket.level, bucket.capacity)
+            self._cond.notify_all()
+
+    def update(self, headers):
+        """Adopt the limits and remaining budget reported by x-ratelimit-* headers."""
+        if not headers:
+            return
+        with self._cond:
+            now = time.monotonic()
+            for kind, bucket in self.buckets.items():
+                limit = _to_float(headers.get(f'x-ratelimit-limit-{kind}'))
+                remaining = _to_float(headers.get(f'x-ratelimit-remaining-{kind}'))
+                if limit:
+                    bucket.refill(now)
+                    # Keep the headroom slack out of what the server says is left
+                    slack = limit * (1 - self.headroom)
+                    if bucket.capacity is None:
+                        level = (remaining if remaining is not None else limit) - slack
+                    else:
+                        level = bucket.level
+                    bucket.set_limit(limit * self.headroom, level)
+                if remaining is not None and bucket.capacity is not None:
+                    bucket.refill(now)
+                    bucket.level = min(bucket.level, remaining - (limit or 0) * (1 - self.headroom))
+                if remaining == 0:
+                    reset = parse_duration(headers.get(f'x-ratelimit-reset-{kind}'))
+                    if reset:
+                        self.blocked_until = max(self.blocked_until, now + reset)
+            self._cond.notify_all()
+
+    def penalize(self, seconds):
+        """Hold back every caller for the given number of seconds (after a 429)."""
+        with self._cond:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self._cond.notify_all()
+
+    def limits(self):
+        """Return the current (requests, tokens) per-minute capacities; None where unknown."""
+        with self._cond:
+            return tuple(self.buckets[kind].capacity for kind in ('requests', 'tokens'))
+
+
+def _to_float(value):
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+_shared_limiters = {}
+_shared_lock = threading.Lock()
+
+
+def shared_rate_limiter(key, requests_per_minute=None, tokens_per_minute=None, headroom=0.95):
+    """
+    Return the process-wide limiter for key (e.g. endpoint and model), creating
+    it on first use, so every handler talking to the same limits shares buckets.
+    """
+    with _shared_lock:
+        limiter = _shared_limiters.get(key)
+        if limiter is None:
+            limiter = RateLimiter(requests_per_minute, tokens_per_minute, headroom)
+            _shared_limiters[key] = limiter
+        return limiter
@@ -0,0 +1,155 @@
+import os
+import json
+import time
+import hashlib
+import threading
+
+
+class ResponseCache:
+    """
+    Content-addressed on-disk cache of model responses.
+
+    Entries are keyed on a SHA-256 of (model, temperature, prompt) and stored
+    as one JSON file each, sharded by the first two hex digits of the key.
+    An entry's mtime is its creation time, which the age limit is based on.
+    Reading an entry refreshes only its atime, so size-based eviction drops
+    the least recently used entries first without making them look newer.
+    """
+
+    def __init__(self, cache_dir, max_bytes=None, max_age_seconds=None, bypass=False):
+        """
+        Args:
+            cache_dir (str): Directory holding the cache entries
+            max_bytes (int): Evict least recently used entries above this total size
+            max_age_seconds (float): Entries older than this are treated as missing
+            bypass (bool): Skip lookups (always call the API) but still store responses
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.bypass = bypass
+        self.hits = 0
+        self.misses = 0
+        self.total_bytes = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.evict()
+
+    @staticmethod
+    def make_key(model, prompt, temperature):
+        """Return the cache key for a request."""
+        payload = json.dumps([model, temperature, prompt], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, key):
+        """Return the cached response for a key, or None on a miss."""
+        if self.bypass:
+            self._count(hit=False)
+            return None
+
+        path = self._entry_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self._count(hit=False)
+            return None
+
+        if self.max_age_seconds and time.time() - entry.get('created', 0) > self.max_age_seconds:
+            self._remove(path)
+            self._count(hit=False)
+            return None
+
+        try:
+            # Mark as recently used, keeping the mtime (creation time) for the age rule
+            os.utime(path, (time.time(), os.stat(path).st_mtime))
+        except OSError:
+            pass
+        self._count(hit=True)
+        return entry.get('response')
+
+    def put(self, key, response, model=None):
+        """Store a response, evicting old entries if the cache grew too large."""
+        if not response:
+            return
+        path = self._entry_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        entry = {'model': model, 'created': time.time(), 'response': response}
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️ Could not write response cache entry: {e}")
+            self._remove(tmp_path)
+            return
+
+        with self._lock:
+            self.total_bytes += os.path.getsize(path)
+            over_budget = self.max_bytes and self.total_bytes > self.max_bytes
+        if over_budget:
+            self.evict()
+
+    def evict(self):
+        """
+        Drop expired entries (by creation time, the mtime), then the least
+        recently used ones (by atime) until the cache fits within max_bytes.
+
+        Returns:
+            int: Number of entries removed
+        """
+        with self._lock:
+            now = time.time()
+            entries = []
+            removed = 0
+            for root, dirs, files in os.walk(self.cache_dir):
+                for name in files:
+                    path = os.path.join(root, name)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    if name.endswith('.tmp') and now - st.st_mtime > 3600:
+                        # Leftover from an interrupted write
+                        self._remove(path)
+                        continue
+                    if not name.endswith('.json'):
+                        continue
+                    if self.max_age_seconds and now - st.st_mtime > self.max_age_seconds:
+                        self._remove(path)
+                        removed += 1
+                        continue
+                    entries.append((max(st.st_atime, st.st_mtime), st.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            if self.max_bytes and total > self.max_bytes:
+                entries.sort()
+                for used, size, path in entries:
+                    if total <= self.max_bytes:
+                        break
+                    self._remove(path)
+                    total -= size
+                    removed += 1
+            self.total_bytes = total
+            return removed
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self):
+        """Return hit/miss counters for reporting."""
+        return {'hits': self.hits, 'misses': self.misses, 'bytes': self.total_bytes}
@@ -0,0 +1,89 @@
+import os
+import json
+import hashlib
+import threading
+from datetime import datetime
+
+
+def fingerprint_files(file_paths, hash_content=False):
+    """
+    Fingerprint a set of input files by path, size and mtime (and optionally content).
+
+    Files that disappear while fingerprinting are simply left out.
+
+    Returns:
+        str: Hex digest that changes whenever any input file changes
+    """
+    digest = hashlib.sha256()
+    for path in sorted(file_paths):
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        digest.update(f"{path}\0{st.st_size}\0{st.st_mtime_ns}\n".encode('utf-8'))
+        if hash_content:
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(block)
+    return digest.hexdigest()
+
+
+def fingerprint_text(text):
+    """Return a short hash of a text (e.g. the prompt template)."""
+    return hashlib.sha256((text or "").encode('utf-8')).hexdigest()[:16]
+
+
+class RunManifest:
+    """
+    Persistent record of the inputs each date's journal was generated from.
+
+    Entries map a date to the fingerprint of its source files and the hash of
+    the prompt template, so a run can tell exactly which journals are stale.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring unreadable run manifest {self.path}: {e}")
+            return
+        if data.get('version') == self.VERSION:
+            self.entries = data.get('dates', {})
+
+    def get(self, date):
+        """Return the recorded entry for a date, or None."""
+        return self.entries.get(date)
+
+    def matches(self, date, inputs, template):
+        """Check whether the recorded inputs and template for a date are unchanged."""
+        entry = self.entries.get(date)
+        return entry is not None and entry.get('inputs') == inputs and entry.get('template') == template
+
+    def record(self, date, inputs, template):
+        """Record the inputs and template a date's journal was generated from."""
+        with self._lock:
+            self.entries[date] = {
+                'inputs': inputs,
+                'template': template,
+                'updated': datetime.now().isoformat(timespec='seconds'),
+            }
+
+    def save(self):
+        """Persist the manifest atomically."""
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': self.VERSION, 'dates': self.entries}, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)
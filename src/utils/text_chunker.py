@@ -0,0 +1,40 @@
+def split_text(text, max_chars):
+    """
+    Split text into chunks of at most max_chars characters.
+
+    Chunks break at file section headers ("--- File: ... ---") where possible,
+    then at paragraph breaks, then at whitespace, so a chunk never cuts a word
+    unless a single word is longer than max_chars.
+
+    Returns:
+        list: Non-empty chunks in their original order
+    """
+    if not text:
+        return []
+    if max_chars <= 0:
+        raise ValueError("max_chars must be positive")
+
+    chunks = []
+    start = 0
+    length = len(text)
+    while start < length:
+        end = start + max_chars
+        if end >= length:
+            chunks.append(text[start:])
+            break
+
+        window = text[start:end]
+        cut = -1
+        for separator in ("\n\n--- File:", "\n\n", "\n", " "):
+            cut = window.rfind(separator)
+            # Avoid degenerate tiny chunks when the only break is near the start
+            if cut > max_chars // 4:
+                break
+            cut = -1
+        if cut == -1:
+            cut = max_chars
+
+        chunks.append(text[start:start + cut])
+        start += cut
+
+    return [chunk for chunk in (c.strip() for c in chunks) if chunk]
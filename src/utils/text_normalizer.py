@@ -0,0 +1,163 @@
+import re
+from collections import Counter
+from utils.stopwords import ENGLISH_STOPWORDS
+
+# NLTK is only needed by the 'compat' pipeline and is loaded on first use
+_nltk = None
+
+
+def _load_nltk(allow_download=False):
+    """
+    Import NLTK and its tokenizer data on first use.
+
+    Missing tokenizer data is only downloaded when allow_download is set, so
+    hosts without network access fail fast instead of hanging.
+
+    Returns:
+        tuple: (word_tokenize function, stopword set)
+    """
+    global _nltk
+    if _nltk is not None:
+        return _nltk
+
+    import nltk
+    from nltk.tokenize import word_tokenize
+
+    for resource, path in (('punkt', 'tokenizers/punkt'), ('punkt_tab', 'tokenizers/punkt_tab')):
+        try:
+            nltk.data.find(path)
+        except LookupError:
+            if not allow_download:
+                raise LookupError(
+                    f"NLTK resource '{resource}' is not installed. Run nltk.download('{resource}'), "
+                    f"set NLTK_DOWNLOAD to true, or use PREPROCESS_MODE 'fast'.")
+            nltk.download(resource)
+
+    # Prefer the installed corpus so 'compat' matches the original output exactly
+    try:
+        from nltk.corpus import stopwords
+        words = set(stopwords.words('english'))
+    except LookupError:
+        words = set(ENGLISH_STOPWORDS)
+
+    _nltk = (word_tokenize, words)
+    return _nltk
+
+
+# Approximates the Treebank tokenizer used by word_tokenize: contractions are
+# split ("don't" -> "do", "n't"; "Bee's" -> "Bee", "'s"), numbers keep their
+# separators ("10:30", "1,000", "3.5") and other punctuation stands alone.
+_TOKEN_PATTERN = re.compile(r"""
+    \w+?(?=n't\b)                       # stem of a negative contraction
+  | n't\b
+  | '(?:[sdmSDM]|re|ve|ll|RE|VE|LL)\b   # clitics
+  | \d+(?:[.,:]\d+)+                    # numbers and times
+  | \w+(?:-\w+)*                        # words, hyphenated compounds
+  | \.\.\.|--
+  | [^\w\s]
+""", re.VERBOSE)
+
+
+def remove_stopwords(text):
+    """Remove stop words from a given text (NLTK tokenizer)."""
+    if not text:
+        return text
+    word_tokenize, stop_words = _load_nltk()
+    word_tokens = word_tokenize(text)
+    filtered_sentence = [w for w in word_tokens if not w.lower() in stop_words]
+    return " ".join(filtered_sentence)
+
+
+def remove_repetitive_phrases(text, n=2, threshold=0.2):
+    """Remove repetitive phrases from a given text (NLTK tokenizer)."""
+    if not text:
+        return text
+
+    # Tokenize the text into words
+    word_tokenize, _ = _load_nltk()
+    words = word_tokenize(text)
+
+    # Avoid processing if text is too short for n-grams
+    if len(words) < n:
+        return text
+
+    filtered_words = _suppress_repetitions(words, n, threshold)
+    if filtered_words is None:
+        return text
+
+    # Join the filtered words back into a text
+    return " ".join(filtered_words)
+
+
+def _suppress_repetitions(words, n, threshold):
+    """
+    Drop every occurrence of n-grams whose share of all n-grams exceeds the
+    threshold. Returns None when no n-grams could be formed.
+    """
+    # Generate n-grams (phrases of n words)
+    ngrams = list(zip(*(words[i:] for i in range(n))))
+
+    # Avoid division by zero if no n-grams are generated
+    if not ngrams:
+        return None
+
+    # Count the frequency of each n-gram and keep those above the threshold
+    total_ngrams = len(ngrams)
+    repetitive_ngrams = {ngram for ngram, count in Counter(ngrams).items()
+                         if count / total_ngrams > threshold}
+    if not repetitive_ngrams:
+        return words
+
+    # Remove repetitive n-grams from the text
+    filtered_words = []
+    i = 0
+    last_start = len(words) - n
+    while i < len(words):
+        # Check only if there are enough words left for an n-gram
+        if i <= last_start and ngrams[i] in repetitive_ngrams:
+            i += n  # Skip the entire n-gram
+            continue
+        filtered_words.append(words[i])
+        i += 1
+    return filtered_words
+
+
+class TextNormalizer:
+    """
+    Transcript preprocessing: stopword removal followed by suppression of
+    over-represented phrases.
+
+    The 'fast' mode tokenizes once with a compiled regular expression and runs
+    both passes over the same token list, using the vendored stopword list.
+    The 'compat' mode runs the original NLTK word_tokenize pipeline
+    (tokenizing twice) so its output can be diffed against the fast path;
+    NLTK is only imported when that mode is first used.
+    """
+
+    MODES = ('fast', 'compat')
+
+    def __init__(self, mode='fast', n=2, threshold=0.2, allow_download=False):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown preprocessing mode: {mode} (expected one of {', '.join(self.MODES)})")
+        self.mode = mode
+        self.n = n
+        self.threshold = threshold
+        self.allow_download = allow_download
+
+    def tokenize(self, text):
+        """Split text into Treebank-like tokens with the compiled tokenizer."""
+        return _TOKEN_PATTERN.findall(text)
+
+    def normalize(self, text):
+        """Remove stopwords and repetitive phrases from text."""
+        if not text:
+            return text
+        if self.mode == 'compat':
+            _load_nltk(self.allow_download)
+            return remove_repetitive_phrases(remove_stopwords(text), self.n, self.threshold)
+
+        tokens = [t for t in _TOKEN_PATTERN.findall(text) if t.lower() not in ENGLISH_STOPWORDS]
+        if len(tokens) < self.n:
+            return " ".join(tokens)
+        filtered = _suppress_repetitions(tokens, self.n, self.threshold)
+        return " ".join(tokens if filtered is None else filtered)
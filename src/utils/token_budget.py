@@ -0,0 +1,359 @@
+import os
+import re
+import hashlib
+import tempfile
+from utils.dedup import FILE_HEADER
+
+# Context windows by model name prefix, most specific first (TOKEN_BUDGET_CONTEXT overrides)
+MODEL_CONTEXT_TOKENS = (
+    ('gpt-4.1', 1047576),
+    ('gpt-4o', 128000),
+    ('gpt-4-turbo', 128000),
+    ('gpt-4', 8192),
+    ('gpt-3.5-turbo', 16385),
+    ('o1', 200000),
+    ('o3', 200000),
+    ('o4', 200000),
+)
+DEFAULT_CONTEXT_TOKENS = 128000
+
+# Prompt components in the order they are reported
+COMPONENTS = ('FACTS', 'ERRORS', 'BEE', 'LIMITLESS')
+DEFAULT_PRIORITIES = {'BEE': 3, 'LIMITLESS': 2, 'FACTS': 1, 'ERRORS': 1}
+
+TRIM_MARKER = "[... trimmed to fit the context ...]"
+
+# Where tiktoken downloads its encoding data from (and the cache key it stores it under)
+_ENCODING_URL = "https://openaipublic.blob.core.windows.net/encodings/{}.tiktoken"
+_ENCODING_FILES = {'p50k_edit': 'p50k_base'}
+
+# Words, digit groups (BPE vocabularies split numbers into up to 3 digits), runs of
+# newlines or spaces and single symbols
+_APPROX_PATTERN = re.compile(r"[A-Za-z]+|\d{1,3}|\n+|[ \t]{2,}|[^\sA-Za-z\d]")
+_TRAILING_SPACE = re.compile(r"[ \t]+$", re.MULTILINE)
+_SPACE_RUNS = re.compile(r"[ \t]{2,}")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+def context_tokens(config):
+    """Return the model's context window in tokens (TOKEN_BUDGET_CONTEXT, or by model name)."""
+    if config.get('TOKEN_BUDGET_CONTEXT'):
+        return config['TOKEN_BUDGET_CONTEXT']
+    model = config.get('OPEN_AI_MODEL') or ''
+    for prefix, tokens in MODEL_CONTEXT_TOKENS:
+        if model.startswith(prefix):
+            return tokens
+    return DEFAULT_CONTEXT_TOKENS
+
+
+def max_file_chars(config):
+    """
+    Per-file read limit: MAX_FILE_CHARS when set, else 8 characters per context token.
+
+    Days that don't fit the context are trimmed by the planner (TOKEN_BUDGET)
+    or summarized in chunks, so by default a file is only capped at what
+    could never fit the context anyway.
+    """
+    if 'MAX_FILE_CHARS' in config:
+        return config['MAX_FILE_CHARS']
+    return context_tokens(config) * 8
+
+
+def max_prompt_chars(config):
+    """
+    Prompt size above which a day is summarized in chunks: MAX_PROMPT_CHARS
+    when set, else ~4 characters per context token left after the completion
+    reserve. With TOKEN_BUDGET the planner already fits prompts by counting
+    tokens, so there is no default limit. Prompts that still overflow fall
+    back to chunks on the API's context length error.
+    """
+    if 'MAX_PROMPT_CHARS' in config:
+        return config['MAX_PROMPT_CHARS']
+    if config.get('TOKEN_BUDGET', False):
+        return None
+    reserve = config.get('TOKEN_BUDGET_COMPLETION_RESERVE', 4096)
+    return max(context_tokens(config) - reserve, 0) * 4
+
+
+def _encoding_cached(name):
+    """
+    Check whether tiktoken's data file for an encoding is in its local cache
+    (TIKTOKEN_CACHE_DIR, DATA_GYM_CACHE_DIR or the temp directory, as tiktoken
+    resolves it), so loading it won't go to the network.
+    """
+    if 'TIKTOKEN_CACHE_DIR' in os.environ:
+        cache_dir = os.environ['TIKTOKEN_CACHE_DIR']
+    elif 'DATA_GYM_CACHE_DIR' in os.environ:
+        cache_dir = os.environ['DATA_GYM_CACHE_DIR']
+    else:
+        cache_dir = os.path.join(tempfile.gettempdir(), 'data-gym-cache')
+    if not cache_dir:
+        # Caching disabled: every load downloads
+        return False
+    url = _ENCODING_URL.format(_ENCODING_FILES.get(name, name))
+    return os.path.exists(os.path.join(cache_dir, hashlib.sha1(url.encode()).hexdigest()))
+
+
+def _load_encoding(model, required=False):
+    """
+    Return the tiktoken encoding for a model, or None if tiktoken or its data is unavailable.
+
+    Unless required (TOKEN_COUNTER 'tiktoken'), an encoding whose data file isn't
+    cached yet is not downloaded: counting falls back to the approximation.
+    """
+    try:
+        import tiktoken
+        from tiktoken.model import encoding_name_for_model
+    except ImportError:
+        if required:
+            raise ImportError("TOKEN_COUNTER 'tiktoken' needs the tiktoken package (pip install tiktoken)")
+        return None
+    try:
+        name = encoding_name_for_model(model or '')
+    except KeyError:
+        name = 'o200k_base'
+    if not required and not _encoding_cached(name):
+        print(f"⚠️ tiktoken data for {name} isn't cached (TIKTOKEN_CACHE_DIR); approximating token counts")
+        return None
+    try:
+        return tiktoken.get_encoding(name)
+    except Exception as e:
+        if required:
+            raise
+        print(f"⚠️ tiktoken encoding unavailable ({e}); approximating token counts")
+        return None
+
+
+class TokenCounter:
+    """
+    Counts tokens locally, without API calls.
+
+    Uses the model's tiktoken encoding when tiktoken is installed and its
+    encoding file is already cached (nothing is downloaded unless the mode
+    is 'tiktoken'). Otherwise BPE tokenization is approximated:
+    a word is one token plus one per further 8 letters, digits count in
+    groups of three, a run of newlines or of several spaces is one token,
+    and every other symbol is a token of its own.
+    """
+
+    def __init__(self, model=None, mode='auto'):
+        self.encoding = None
+        if mode != 'approximate':
+            self.encoding = _load_encoding(model, required=(mode == 'tiktoken'))
+        self.method = 'tiktoken' if self.encoding is not None else 'approximate'
+
+    def count(self, text):
+        if not text:
+            return 0
+        if self.encoding is not None:
+            return len(self.encoding.encode(text, disallowed_special=()))
+        return sum(1 + (len(piece) - 1) // 8 if piece[0].isalpha() else 1
+                   for piece in _APPROX_PATTERN.findall(text))
+
+
+def allocate(needs, budget, weights=None):
+    """
+    Split a token budget across components by weighted max-min fairness.
+
+    Components needing less than their weighted share get all they need and
+    the rest is shared again among the others, so headroom left by small
+    components isn't wasted.
+
+    Args:
+        needs (dict): name -> tokens wanted
+        budget (int): Tokens available
+        weights (dict): name -> priority weight (default 1)
+
+    Returns:
+        dict: name -> tokens allocated (never more than needed)
+    """
+    weights = weights or {}
+    allocation = {name: 0 for name in needs}
+    active = {name for name, need in needs.items() if need > 0}
+    left = max(0, budget)
+    while active and left > 0:
+        total_weight = sum(weights.get(name, 1) for name in active)
+        shares = {name: left * weights.get(name, 1) / total_weight for name in active}
+        satisfied = {name for name in active if needs[name] - allocation[name] <= shares[name]}
+        if not satisfied:
+            for name in active:
+                allocation[name] += int(shares[name])
+            break
+        for name in satisfied:
+            left -= needs[name] - allocation[name]
+            allocation[name] = needs[name]
+        active -= satisfied
+    return allocation
+
+
+def compact(text):
+    """Drop trailing spaces, runs of spaces and extra blank lines (no information is lost)."""
+    if not text:
+        return text
+    return _BLANK_LINES.sub("\n\n", _SPACE_RUNS.sub(" ", _TRAILING_SPACE.sub("", text)))
+
+
+class BudgetPlanner:
+    """
+    Fits one day's prompt components into the model's context window.
+
+    The budget is the context window minus a completion reserve and the
+    tokens of the prompt template itself. Days that fit are left untouched.
+    Otherwise reductions are applied cheapest first, stopping as soon as the
+    day fits:
+      1. compact: whitespace that carries no information is removed;
+      2. trim: the budget is split across facts, errors, Bee and Limitless by
+         priority (components that need less than their share keep all of
+         it), and only components over their allocation are cut. Facts and
+         errors are cut at line boundaries; transcripts are split fairly
+         across their files, so one long file can't crowd out the others.
+    """
+
+    def __init__(self, counter, context_tokens=DEFAULT_CONTEXT_TOKENS, completion_reserve=4096, priorities=None):
+        self.counter = counter
+        self.context_tokens = context_tokens
+        self.completion_reserve = completion_reserve
+        self.priorities = dict(DEFAULT_PRIORITIES, **(priorities or {}))
+
+    def plan(self, fixed_tokens, components):
+        """
+        Reduce the components of one prompt to the budget.
+
+        Args:
+            fixed_tokens (int): Tokens of the prompt outside the components (instructions, labels)
+            components (dict): Component name ('FACTS', 'ERRORS', 'BEE', 'LIMITLESS') -> text or None
+
+        Returns:
+            tuple: (dict of reduced components, budget report dict)
+        """
+        budget = self.context_tokens - self.completion_reserve - fixed_tokens
+        components = dict(components)
+        counts = {name: self.counter.count(text) for name, text in components.items()}
+        report = {
+            'counter': self.counter.method,
+            'context': self.context_tokens,
+            'reserve': self.completion_reserve,
+            'fixed': fixed_tokens,
+            'budget': budget,
+            'components': {name: {'tokens': counts[name]} for name in components},
+            'saved': {},
+        }
+
+        if sum(counts.values()) > budget:
+            # 1. Free: whitespace
+            before = sum(counts.values())
+            for name, text in components.items():
+                if text:
+                    components[name] = compact(text)
+                    counts[name] = self.counter.count(components[name])
+            report['saved']['compact'] = before - sum(counts.values())
+
+        if sum(counts.values()) > budget:
+            # 2. Lossy: cut the components over their allocation
+            before = sum(counts.values())
+            allocation = allocate(counts, budget, self.priorities)
+            for name, text in components.items():
+                report['components'][name]['allocated'] = allocation[name]
+                if counts[name] <= allocation[name]:
+                    continue
+                if name in ('BEE', 'LIMITLESS'):
+                    components[name], files_trimmed = self._trim_transcript(text, allocation[name])
+                    report['components'][name]['files_trimmed'] = files_trimmed
+                else:
+                    components[name] = self._trim_text(text, allocation[name])
+                counts[name] = self.counter.count(components[name])
+            report['saved']['trim'] = before - sum(counts.values())
+
+        for name in components:
+            report['components'][name]['final'] = counts[name]
+        report['total'] = fixed_tokens + sum(counts.values())
+        report['fits'] = sum(counts.values()) <= budget
+        return components, report
+
+    def _trim_text(self, text, limit):
+        """Keep the leading lines (and words of the first line that doesn't fit) within limit tokens."""
+        if not text:
+            return text
+        limit -= self.counter.count(TRIM_MARKER) + 1
+        kept = []
+        used = 0
+        for line in text.split("\n"):
+            cost = self.counter.count(line) + 1
+            if used + cost <= limit:
+                kept.append(line)
+                used += cost
+                continue
+            words = []
+            for word in line.split(" "):
+                cost = self.counter.count(word) + 1
+                if used + cost > limit:
+                    break
+                words.append(word)
+                used += cost
+            if words:
+                kept.append(" ".join(words))
+            break
+        return "\n".join(kept) + "\n" + TRIM_MARKER
+
+    def _trim_transcript(self, text, limit):
+        """
+        Trim a day's transcript file by file: files that fit their fair share
+        stay whole, the longer ones share what is left.
+
+        Returns:
+            tuple: (trimmed text, number of files trimmed)
+        """
+        parts = FILE_HEADER.split(text)
+        if len(parts) < 3:
+            return self._trim_text(text, limit), 1
+        preamble, headers, contents = parts[0], parts[1::2], parts[2::2]
+        header_tokens = self.counter.count(preamble) + sum(self.counter.count(h) for h in headers)
+        needs = {i: self.counter.count(content) for i, content in enumerate(contents)}
+        allocation = allocate(needs, limit - header_tokens)
+
+        pieces = [preamble]
+        files_trimmed = 0
+        for i, (header, content) in enumerate(zip(headers, contents)):
+            if needs[i] > allocation[i]:
+                content = self._trim_text(content, allocation[i])
+                files_trimmed += 1
+            pieces += [header, content]
+        return "".join(pieces), files_trimmed
+
+
+def format_budget_report(date, report):
+    """Return the per-date budget report as printable text."""
+    used = report['total']
+    head = (f"Token budget for {date}: {used:,} of {report['context']:,} tokens "
+            f"({report['reserve']:,} reserved for the completion, {report['counter']} count)")
+    if not report['saved']:
+        return f"✓ {head}"
+    lines = [f"⚠️ {head}"]
+    for name in COMPONENTS:
+        row = report['components'].get(name)
+        if row is None or not row['tokens']:
+            continue
+        line = f"    {name.lower():<10}{row['tokens']:>9,} -> {row['final']:>9,}"
+        if 'allocated' in row:
+            line += f"  (allocated {row['allocated']:,})"
+        if row.get('files_trimmed'):
+            line += f", {row['files_trimmed']} file(s) trimmed"
+        lines.append(line)
+    saved = ", ".join(f"{reduction} {tokens:,}" for reduction, tokens in report['saved'].items() if tokens)
+    lines.append(f"    tokens saved: {saved or 'none'}")
+    if not report['fits']:
+        lines.append("    still over budget")
+    return "\n".join(lines)
+
+
+def create_budget_planner(config):
+    """Create the token-budget planner, or None unless TOKEN_BUDGET is on."""
+    if not config.get('TOKEN_BUDGET', False):
+        return None
+    counter = TokenCounter(config.get('OPEN_AI_MODEL'), config.get('TOKEN_COUNTER', 'auto'))
+    return BudgetPlanner(
+        counter,
+        context_tokens=context_tokens(config),
+        completion_reserve=config.get('TOKEN_BUDGET_COMPLETION_RESERVE', 4096),
+        priorities=config.get('TOKEN_BUDGET_PRIORITIES')
+    )
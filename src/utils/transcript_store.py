@@ -0,0 +1,186 @@
+import os
+import json
+import sqlite3
+import threading
+
+
+class TranscriptStore:
+    """
+    Local SQLite store of ingested transcripts, indexed by date and source.
+
+    Each source file is stored once with its preprocessed text (what goes into
+    the prompt) and its raw text (for full-text search through an FTS5 index,
+    when the SQLite build has FTS5). Ingestion is incremental: only files
+    whose size or mtime changed are read again, and files that disappeared
+    are dropped. Rows are tied to the preprocessing settings; when those
+    change, everything is ingested again.
+    """
+
+    SCHEMA_VERSION = 1
+
+    def __init__(self, path, settings=None):
+        """
+        Args:
+            path (str): Database file
+            settings (dict): Preprocessing settings the stored text depends on
+        """
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # Watch mode and worker pools may touch the store from other threads
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+                CREATE TABLE IF NOT EXISTS files (
+                    id INTEGER PRIMARY KEY,
+                    path TEXT UNIQUE NOT NULL,
+                    source TEXT NOT NULL,
+                    date TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    truncated INTEGER NOT NULL,
+                    content TEXT NOT NULL,
+                    normalized TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS files_by_date ON files (date, source, path);
+            """)
+            self.fts = self._create_fts()
+            self._check_settings(settings or {})
+
+    def _create_fts(self):
+        """Create the FTS5 index and its sync triggers; returns False without FTS5."""
+        try:
+            self.conn.executescript("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS files_fts USING fts5(
+                    content, content='files', content_rowid='id');
+                CREATE TRIGGER IF NOT EXISTS files_ai AFTER INSERT ON files BEGIN
+                    INSERT INTO files_fts (rowid, content) VALUES (new.id, new.content);
+                END;
+                CREATE TRIGGER IF NOT EXISTS files_ad AFTER DELETE ON files BEGIN
+                    INSERT INTO files_fts (files_fts, rowid, content) VALUES ('delete', old.id, old.content);
+                END;
+                CREATE TRIGGER IF NOT EXISTS files_au AFTER UPDATE ON files BEGIN
+                    INSERT INTO files_fts (files_fts, rowid, content) VALUES ('delete', old.id, old.content);
+                    INSERT INTO files_fts (rowid, content) VALUES (new.id, new.content);
+                END;
+            """)
+            return True
+        except sqlite3.OperationalError as e:
+            print(f"⚠️ SQLite has no FTS5 ({e}); transcript search is disabled")
+            return False
+
+    def _check_settings(self, settings):
+        """Drop every stored transcript if the schema or preprocessing settings changed."""
+        stamp = json.dumps({'schema': self.SCHEMA_VERSION, 'settings': settings}, sort_keys=True)
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'settings'").fetchone()
+        if row and row[0] == stamp:
+            return
+        if row:
+            print("Preprocessing settings changed; transcripts will be ingested again")
+        self.conn.execute("DELETE FROM files")
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('settings', ?)", (stamp,))
+
+    def ingest(self, source, files_by_date, load):
+        """
+        Bring the stored transcripts of one source up to date with its files.
+
+        Args:
+            source (str): Source name ('BEE' or 'LIMITLESS')
+            files_by_date (dict): date -> list of file paths currently on disk
+            load (callable): load(path, date) -> (content, normalized, truncated),
+                or None if the file can't be read
+
+        Returns:
+            tuple: (files ingested, files removed)
+        """
+        with self._lock:
+            stored = {path: (size, mtime_ns, date) for path, size, mtime_ns, date in self.conn.execute(
+                "SELECT path, size, mtime_ns, date FROM files WHERE source = ?", (source,))}
+
+        changed = []
+        current = set()
+        for date, files in files_by_date.items():
+            for path in files:
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                current.add(path)
+                if stored.get(path) != (st.st_size, st.st_mtime_ns, date):
+                    changed.append((path, date, st))
+
+        # Read outside the lock; only the writes are serialized
+        rows = []
+        for path, date, st in changed:
+            loaded = load(path, date)
+            if loaded is None:
+                continue
+            content, normalized, truncated = loaded
+            rows.append((path, source, date, st.st_size, st.st_mtime_ns, int(truncated), content, normalized))
+        removed = [(path,) for path in stored if path not in current]
+
+        with self._lock, self.conn:
+            self.conn.executemany("""
+                INSERT INTO files (path, source, date, size, mtime_ns, truncated, content, normalized)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (path) DO UPDATE SET
+                    source = excluded.source, date = excluded.date, size = excluded.size,
+                    mtime_ns = excluded.mtime_ns, truncated = excluded.truncated,
+                    content = excluded.content, normalized = excluded.normalized
+            """, rows)
+            self.conn.executemany("DELETE FROM files WHERE path = ?", removed)
+        return len(rows), len(removed)
+
+    def dates(self, source=None):
+        """Return the set of dates with stored transcripts (optionally of one source)."""
+        query, args = "SELECT DISTINCT date FROM files", ()
+        if source:
+            query, args = query + " WHERE source = ?", (source,)
+        with self._lock:
+            return {date for (date,) in self.conn.execute(query, args)}
+
+    def files_for_date(self, date, source):
+        """Return the stored file paths of a date and source, sorted."""
+        with self._lock:
+            return [path for (path,) in self.conn.execute(
+                "SELECT path FROM files WHERE date = ? AND source = ? ORDER BY path", (date, source))]
+
+    def transcripts_for_date(self, date, source):
+        """Return [(path, preprocessed text, size in bytes, truncated)] for a date and source."""
+        with self._lock:
+            return [(path, normalized, size, bool(truncated)) for path, normalized, size, truncated in
+                    self.conn.execute("SELECT path, normalized, size, truncated FROM files "
+                                      "WHERE date = ? AND source = ? ORDER BY path", (date, source))]
+
+    def search(self, query, limit=20):
+        """
+        Full-text search over the raw transcripts.
+
+        Args:
+            query (str): FTS5 query, e.g. 'dentist' or '"project kickoff" NOT draft'
+
+        Returns:
+            list: (date, source, path, snippet) tuples, best matches first
+                  (empty, after printing why, if the query is malformed)
+        """
+        if not self.fts:
+            return []
+        try:
+            with self._lock:
+                return self.conn.execute("""
+                    SELECT files.date, files.source, files.path,
+                           snippet(files_fts, 0, '[', ']', '...', 16)
+                    FROM files_fts JOIN files ON files.id = files_fts.rowid
+                    WHERE files_fts MATCH ?
+                    ORDER BY rank LIMIT ?
+                """, (query, limit)).fetchall()
+        except sqlite3.OperationalError as e:
+            print(f"❌ Invalid search query {query!r}: {e}")
+            print('   Use words, "quoted phrases", AND/OR/NOT and prefix* terms; quote words with symbols')
+            return []
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
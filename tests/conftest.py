@@ -0,0 +1,63 @@
+import os
+import sys
+import pytest
+
+# Application modules import each other as top-level packages (e.g. utils.file_handler)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from services.summarizer import Summarizer  # noqa: E402
+
+JOURNAL_PROMPT = "Facts: {FACTS_CONTENT}\nErrors: {ERRORS_CONTENT}\nBee: {BEE_CONTENT}\nLimitless: {LIMITLESS_CONTENT}"
+
+
+def write(path, content):
+    """Write a text file, creating its directories."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(content)
+
+
+def make_summarizer_config(root, prompt=JOURNAL_PROMPT, **settings):
+    """
+    Return a Summarizer (and DirectoryReader) config rooted at root: the
+    journal prompt written to root/prompt.md, source directories and
+    OUTPUT_DIR under root, and no response cache. settings are added on top.
+    """
+    root = str(root)
+    prompt_path = os.path.join(root, "prompt.md")
+    write(prompt_path, prompt)
+    config = {
+        'OPENAI_API_KEY': 'test-key',
+        'OPEN_AI_MODEL': 'gpt-4o-mini',
+        'JOURNAL_PROMPT': prompt_path,
+        'BEE_DATA': os.path.join(root, "bee"),
+        'LIMITLESS_DATA': os.path.join(root, "limitless"),
+        'FACTS': os.path.join(root, "facts"),
+        'ERRORS': os.path.join(root, "errors"),
+        'OUTPUT_DIR': os.path.join(root, "journal"),
+        'RESPONSE_CACHE': False,
+    }
+    config.update(settings)
+    return config
+
+
+def record_prompts(summarizer, reply=lambda prompt: "Journal"):
+    """Replace the summarizer's API calls: every prompt is kept in summarizer.prompts and answered with reply(prompt)."""
+    summarizer.prompts = []
+
+    def generate_text(prompt, **kwargs):
+        summarizer.prompts.append(prompt)
+        return reply(prompt)
+    summarizer.openai.generate_text = generate_text
+    return summarizer
+
+
+@pytest.fixture
+def summarizer_config(tmp_path):
+    return make_summarizer_config(tmp_path)
+
+
+@pytest.fixture
+def summarizer(summarizer_config):
+    """A Summarizer on summarizer_config that records its prompts instead of calling the API."""
+    return record_prompts(Summarizer(summarizer_config))
@@ -0,0 +1,87 @@
+import json
+import types
+import pytest
+from services.batch_backfill import BatchBackfill
+
+
+class FakeBatchEndpoints:
+    """Local stand-in for the OpenAI files and batches endpoints."""
+
+    def __init__(self, fail_dates=(), polls_before_done=1):
+        self.fail_dates = set(fail_dates)
+        self.polls_before_done = polls_before_done
+        self.uploads = {}
+        self.batch_input = {}
+        self.polls = 0
+        self.interrupt_next_poll = False
+        self.files = types.SimpleNamespace(create=self._create_file, content=self._file_content)
+        self.batches = types.SimpleNamespace(create=self._create_batch, retrieve=self._retrieve_batch)
+
+    def _create_file(self, file, purpose):
+        file_id = f"file-{len(self.uploads) + 1}"
+        self.uploads[file_id] = file.read().decode('utf-8')
+        return types.SimpleNamespace(id=file_id)
+
+    def _create_batch(self, input_file_id, endpoint, completion_window):
+        self.batch_input['batch-1'] = input_file_id
+        return types.SimpleNamespace(id='batch-1', status='validating')
+
+    def _retrieve_batch(self, batch_id):
+        if self.interrupt_next_poll:
+            self.interrupt_next_poll = False
+            raise KeyboardInterrupt()
+        self.polls += 1
+        if self.polls <= self.polls_before_done:
+            counts = types.SimpleNamespace(completed=0, total=1)
+            return types.SimpleNamespace(id=batch_id, status='in_progress', request_counts=counts)
+        return types.SimpleNamespace(id=batch_id, status='completed', output_file_id='file-out')
+
+    def _file_content(self, file_id):
+        lines = []
+        for line in self.uploads[self.batch_input['batch-1']].splitlines():
+            request = json.loads(line)
+            date = request['custom_id']
+            if date in self.fail_dates:
+                lines.append(json.dumps({'custom_id': date, 'response': None,
+                                         'error': {'code': 'server_error'}}))
+                continue
+            body = {'choices': [{'message': {'content': f"Journal for {date}"}}]}
+            lines.append(json.dumps({'custom_id': date, 'error': None,
+                                     'response': {'status_code': 200, 'body': body}}))
+        return types.SimpleNamespace(text="\n".join(lines))
+
+
+@pytest.fixture
+def summarizer_config(summarizer_config):
+    return dict(summarizer_config, BATCH_POLL_SECONDS=0)
+
+
+def test_batch_saves_results_and_reports_failures(summarizer):
+    endpoints = FakeBatchEndpoints(fail_dates={'2025-04-22'})
+    backfill = BatchBackfill(summarizer.config, summarizer, client=endpoints)
+    jobs = [('2025-04-21', 'prompt one', 'fp1'), ('2025-04-22', 'prompt two', 'fp2')]
+
+    assert backfill.run(jobs) == (1, 1)
+    assert summarizer.file_exists_for_date('2025-04-21')
+    with open(summarizer.existing_files['2025-04-21']) as f:
+        assert f.read() == "Journal for 2025-04-21"
+    assert summarizer.manifest.get('2025-04-21')['inputs'] == 'fp1'
+    assert backfill.load_state() is None
+
+
+def test_interrupted_batch_resumes_without_resubmitting(summarizer):
+    endpoints = FakeBatchEndpoints()
+    endpoints.interrupt_next_poll = True
+    backfill = BatchBackfill(summarizer.config, summarizer, client=endpoints)
+    with pytest.raises(KeyboardInterrupt):
+        backfill.run([('2025-04-21', 'prompt one', 'fp1')])
+    assert backfill.load_state()['batch_id'] == 'batch-1'
+
+    def no_new_jobs():
+        raise AssertionError("jobs must not be rendered when resuming")
+        yield
+
+    resumed = BatchBackfill(summarizer.config, summarizer, client=endpoints)
+    assert resumed.run(no_new_jobs()) == (1, 0)
+    assert len(endpoints.uploads) == 1
+    assert summarizer.file_exists_for_date('2025-04-21')
@@ -0,0 +1,103 @@
+import os
+import pytest
+from directory_reader import DirectoryReader
+from main import read_date_inputs
+from services.summarizer import Summarizer
+from utils.openai_handler import ContextLengthExceededError
+from tests.conftest import make_summarizer_config, write
+
+CONTEXT_CHARS = 2000
+
+
+def transcript(source, words):
+    return " ".join(f"{source.lower()}{n}" for n in range(words))
+
+
+@pytest.fixture
+def make_summarizer(tmp_path):
+    chunk_prompt = str(tmp_path / "chunk_prompt.md")
+    write(chunk_prompt, "CHUNK {SOURCE} {PART}/{TOTAL}\n{CONTENT}")
+
+    def make(note_ratio=0.1, **settings):
+        summarizer = Summarizer(make_summarizer_config(
+            tmp_path, "JOURNAL\nBee: {BEE_CONTENT}\nLimitless: {LIMITLESS_CONTENT}",
+            CHUNK_PROMPT=chunk_prompt, CHUNK_CHARS=1000, **settings))
+        summarizer.calls = {'chunk': 0, 'journal': []}
+
+        def generate_text(prompt, stream_to=None, **kwargs):
+            if prompt.startswith("CHUNK"):
+                summarizer.calls['chunk'] += 1
+                # Notes keep the first words of their chunk
+                content = prompt.split("\n", 1)[1]
+                return content[:int(len(content) * note_ratio)].rsplit(" ", 1)[0]
+            # The model rejects journal prompts that exceed its context
+            if len(prompt) > CONTEXT_CHARS:
+                raise ContextLengthExceededError(f"{len(prompt)} chars")
+            summarizer.calls['journal'].append(prompt)
+            return "Journal from " + prompt
+        summarizer.openai.generate_text = generate_text
+        return summarizer
+    return make
+
+
+def read_journal(summarizer, date):
+    with open(summarizer.catalog.path_for(date)) as f:
+        return f.read()
+
+
+def test_context_length_error_falls_back_to_condensed_chunks(make_summarizer):
+    summarizer = make_summarizer()
+    bee, limitless = transcript("Bee", 1000), transcript("Limitless", 500)
+
+    assert summarizer.generate_journal("2025-04-21", bee, limitless)
+
+    journal = read_journal(summarizer, "2025-04-21")
+    assert journal.startswith("Journal from JOURNAL")
+    # Built from the notes: the first words of the chunks, not the whole transcripts
+    assert "bee0 " in journal and "limitless0 " in journal
+    assert "bee999" not in journal
+    assert summarizer.calls['chunk'] >= 10
+    assert len(summarizer.calls['journal']) == 1
+
+
+def test_prompt_over_max_prompt_chars_is_reduced_within_max_levels(make_summarizer, capsys):
+    summarizer = make_summarizer(note_ratio=0.5, MAX_PROMPT_CHARS=CONTEXT_CHARS)
+    bee = transcript("Bee", 1500)
+
+    assert summarizer.generate_journal("2025-04-21", bee, None)
+    assert "bee0 " in read_journal(summarizer, "2025-04-21")
+    # Oversized prompts are condensed again rather than sent: this day needs all 3 levels
+    assert len(summarizer.calls['journal']) == 1
+    output = capsys.readouterr().out
+    assert "(level 3)" in output and "(level 4)" not in output
+
+    # With fewer reduction levels than the day needs, no journal is produced
+    limited = make_summarizer(note_ratio=0.5, MAX_PROMPT_CHARS=CONTEXT_CHARS, MAX_REDUCE_LEVELS=2)
+    assert not limited.generate_journal("2025-04-22", bee, None)
+    assert not limited.file_exists_for_date("2025-04-22")
+    assert limited.calls['journal'] == []
+    assert "(level 3)" not in capsys.readouterr().out
+
+
+def test_days_over_the_old_file_cut_reach_the_map_step_in_full(make_summarizer, tmp_path):
+    # A 10,000-token context: files are read up to 80,000 chars and prompts over ~24,000 are chunked
+    summarizer = make_summarizer(TOKEN_BUDGET_CONTEXT=10000)
+    bee = transcript("Bee", 8000)
+    assert len(bee) > 60000
+    write(os.path.join(summarizer.config['BEE_DATA'], "2025-04-21-bee.md"), bee)
+    chunks = []
+    condense = summarizer.openai.generate_text
+
+    def generate_text(prompt, **kwargs):
+        if prompt.startswith("CHUNK Bee"):
+            chunks.append(prompt.split("\n", 1)[1])
+        return condense(prompt, **kwargs)
+    summarizer.openai.generate_text = generate_text
+
+    status, bee_data, limitless_data, _ = read_date_inputs(DirectoryReader(summarizer.config), summarizer, "2025-04-21")
+    assert status == 'ready'
+    assert summarizer.generate_journal("2025-04-21", bee_data, limitless_data)
+
+    # The map step saw every word of the file, not a 30,000-char prefix
+    words = set(" ".join(chunks).split())
+    assert {"bee0", "bee4000", "bee7999"} <= words
@@ -0,0 +1,53 @@
+import os
+from utils.date_index import DateIndex
+
+def _touch(path, content="x"):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(content)
+
+def _age_tree(root):
+    # Push directory mtimes into the past so the index trusts them
+    for dirpath, dirs, files in os.walk(root):
+        os.utime(dirpath, (1_000_000_000, 1_000_000_000))
+
+def test_index_maps_dates_to_files(tmp_path):
+    root = tmp_path / "bee"
+    _touch(str(root / "2025" / "April" / "2025-04-21-call.md"))
+    _touch(str(root / "2025" / "April" / "2025-04-21-walk.md"))
+    _touch(str(root / "2025" / "April" / "2025-04-22.md"))
+    _touch(str(root / "notes.md"))
+
+    index = DateIndex(str(root), str(tmp_path / "cache" / "index.json"))
+    index.refresh()
+
+    assert index.dates() == {"2025-04-21", "2025-04-22"}
+    assert [os.path.basename(f) for f in index.files_for_date("2025-04-21")] == [
+        "2025-04-21-call.md", "2025-04-21-walk.md"]
+    assert index.files_for_date("2025-01-01") == []
+
+def test_index_persists_and_refreshes_incrementally(tmp_path):
+    root = tmp_path / "limitless"
+    _touch(str(root / "2025" / "April" / "2025-04-21.md"))
+    _touch(str(root / "2025" / "May" / "2025-05-01.md"))
+    _age_tree(str(root))
+    cache_path = str(tmp_path / "cache" / "index.json")
+
+    first = DateIndex(str(root), cache_path)
+    assert first.refresh() == 4
+
+    # A fresh instance loads the cache; an unchanged tree needs no rescans
+    second = DateIndex(str(root), cache_path)
+    assert second.dates() == {"2025-04-21", "2025-05-01"}
+    assert second.refresh() == 0
+
+    # Adding a file only rescans the directory that changed
+    _touch(str(root / "2025" / "May" / "2025-05-02.md"))
+    third = DateIndex(str(root), cache_path)
+    assert third.refresh() == 1
+    assert "2025-05-02" in third.dates()
+
+def test_missing_root_yields_empty_index(tmp_path):
+    index = DateIndex(str(tmp_path / "missing"))
+    assert index.refresh() == 0
+    assert index.dates() == set()
@@ -0,0 +1,64 @@
+import random
+from utils.dedup import CrossSourceDeduplicator, OVERLAP_MARKER, DUPLICATE_NOTE
+
+VOCABULARY = ("walked dog park coffee friend doctor blood sugar reading morning afternoon "
+              "meeting project deadline lunch sandwich weather rain sunny tired happy call "
+              "mother sister garden tomatoes book chapter evening movie dinner pasta").split()
+
+
+def words(count, seed):
+    rng = random.Random(seed)
+    return [rng.choice(VOCABULARY) + str(rng.randint(0, 9)) for _ in range(count)]
+
+
+def noisy(tokens, rate, seed):
+    """Simulate a second device's transcription: replace a share of the words."""
+    rng = random.Random(seed)
+    return [rng.choice(VOCABULARY) if rng.random() < rate else token for token in tokens]
+
+
+def section(name, tokens):
+    return f"\n\n--- File: {name} ---\n" + " ".join(tokens)
+
+
+def test_overlapping_conversation_is_removed_from_secondary():
+    shared = words(300, seed=1)
+    unique = words(120, seed=2)
+    bee = section("2025-04-21-bee.md", shared + words(200, seed=3))
+    limitless = section("2025-04-21.md", unique + noisy(shared, 0.05, seed=4))
+
+    result, removed_chars, removed_windows = CrossSourceDeduplicator().deduplicate(bee, limitless)
+
+    assert result.startswith("\n\n--- File: 2025-04-21.md ---\n" + " ".join(unique))
+    assert result.endswith(OVERLAP_MARKER)
+    assert removed_windows >= 9
+    assert removed_chars > 0.6 * len(" ".join(shared))
+
+
+def test_fully_duplicated_file_keeps_header_with_note():
+    shared = words(90, seed=5)
+    limitless = section("a.md", words(60, seed=6)) + section("b.md", shared)
+    result, _, removed_windows = CrossSourceDeduplicator().deduplicate(section("bee.md", shared), limitless)
+    assert removed_windows == 3
+    assert result.endswith("--- File: b.md ---\n" + DUPLICATE_NOTE)
+    assert "--- File: a.md ---" in result
+
+
+def test_unrelated_sources_are_untouched():
+    limitless = section("l.md", words(200, seed=7))
+    assert CrossSourceDeduplicator().deduplicate(section("b.md", words(200, seed=8)), limitless) == (limitless, 0, 0)
+    assert CrossSourceDeduplicator().deduplicate(None, limitless) == (limitless, 0, 0)
+
+
+def test_line_structure_around_removed_windows_is_kept():
+    # 14 speaker turns of 10 words: 3 unique, 6 repeating the Bee transcript, 5 unique
+    lines = [f"Speaker {n % 2}: " + " ".join(words(8, seed=10 + n)) for n in range(14)]
+    bee = section("bee.md", " ".join(lines[3:9]).split())
+    limitless = "\n\n--- File: l.md ---\n" + "\n".join(lines)
+
+    result, removed_chars, removed_windows = CrossSourceDeduplicator().deduplicate(bee, limitless)
+
+    assert removed_windows == 2
+    assert result == ("\n\n--- File: l.md ---\n" + "\n".join(lines[:3]) + "\n" + OVERLAP_MARKER + "\n"
+                      + "\n".join(lines[9:]))
+    assert removed_chars == len("\n".join(lines[3:9]))
@@ -1,30 +1,59 @@
+import os
+import shutil
+import tempfile
 import unittest
 from src.directory_reader import DirectoryReader
 
 class TestDirectoryReader(unittest.TestCase):
 
     def setUp(self):
-        self.reader = DirectoryReader()
+        self.root = tempfile.mkdtemp()
+        self.config = {
+            'BEE_DATA': os.path.join(self.root, 'bee'),
+            'LIMITLESS_DATA': os.path.join(self.root, 'limitless'),
+            'FACTS': os.path.join(self.root, 'facts'),
+            'ERRORS': os.path.join(self.root, 'errors'),
+            'OUTPUT_DIR': os.path.join(self.root, 'journal'),
+        }
+        self._write('bee/2024/January/2024-01-05-bee.md', "walked the dog after breakfast")
+        self._write('limitless/2024-01-05.md', "meeting with the doctor about blood sugar")
+        self._write('limitless/2024/January/2024-01-06.md', "coffee with a friend")
+        self._write('facts/facts.md', "- The dog is called Bruce.")
+        self._write('errors/errors.md', "- Larry means Laurie.")
+        self.reader = DirectoryReader(self.config)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def _write(self, relative_path, content):
+        path = os.path.join(self.root, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(content)
 
     def test_read_bee_data(self):
-        data = self.reader.read_bee_data()
+        data = self.reader.read_bee_data_for_date('2024-01-05')
         self.assertIsNotNone(data)
-        # Add more assertions based on expected data structure
+        self.assertIn("--- File: 2024-01-05-bee.md ---", data)
+        self.assertIsNone(self.reader.read_bee_data_for_date('2024-01-06'))
 
     def test_read_limitless_data(self):
-        data = self.reader.read_limitless_data()
+        data = self.reader.read_limitless_data_for_date('2024-01-05')
         self.assertIsNotNone(data)
-        # Add more assertions based on expected data structure
+        self.assertIn("--- File: 2024-01-05.md ---", data)
+
+    def test_get_all_dates(self):
+        self.assertEqual(self.reader.get_all_dates(), {'2024-01-05', '2024-01-06'})
 
     def test_read_facts(self):
         data = self.reader.read_facts()
         self.assertIsNotNone(data)
-        # Add more assertions based on expected data structure
+        self.assertIn("Bruce", data)
 
     def test_read_errors(self):
         data = self.reader.read_errors()
         self.assertIsNotNone(data)
-        # Add more assertions based on expected data structure
+        self.assertIn("Laurie", data)
 
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,52 @@
+from utils.fact_index import FactIndex, index_terms, split_entries
+
+FACTS = """# People
+
+- Mark Armitage is my primary doctor.
+- Larry is my psychologist; visits are on Mondays at 3 pm.
+- Bruce walks the dog every morning.
+
+# Health
+
+- Blood sugar readings above 180 should be flagged.
+- Target weight is 80 kg,
+  measured on Sunday mornings.
+
+Gardening notes are kept in a separate vault.
+"""
+
+
+def test_split_entries():
+    entries = split_entries(FACTS)
+    assert len(entries) == 6
+    assert entries[0] == ("# People", "- Mark Armitage is my primary doctor.")
+    assert entries[4] == ("# Health", "- Target weight is 80 kg,\n  measured on Sunday mornings.")
+    assert entries[5][1] == "Gardening notes are kept in a separate vault."
+
+
+def test_index_terms_drop_stopwords_and_fold_plurals():
+    assert index_terms("The journals of my Doctors") == ["journal", "doctor"]
+
+
+def test_select_returns_relevant_entries_in_file_order():
+    index = FactIndex(FACTS, top_k=2, budget_chars=200)
+    assert index.retrieve
+    selected = index.select("Measured weight this morning, then blood sugar was 190", None)
+    assert selected == ("# Health\n- Blood sugar readings above 180 should be flagged.\n"
+                        "- Target weight is 80 kg,\n  measured on Sunday mornings.")
+
+
+def test_select_respects_budget():
+    index = FactIndex(FACTS, top_k=10, budget_chars=60)
+    selected = index.select("doctor psychologist dog blood sugar weight")
+    assert len(selected.replace("# People\n", "").replace("# Health\n", "")) <= 60
+
+
+def test_small_files_and_disabled_retrieval_fall_back_to_all():
+    assert FactIndex(FACTS, budget_chars=len(FACTS)).select("dog") == FACTS
+    assert FactIndex(FACTS, budget_chars=50, enabled=False).select("dog") == FACTS
+    assert FactIndex(None).select("dog") is None
+
+
+def test_nothing_relevant():
+    assert FactIndex(FACTS, budget_chars=100).select("quantum chromodynamics") is None
@@ -1,6 +1,6 @@
 import os
 import pytest
-from src.utils.file_handler import read_file, write_file, file_exists
+from utils.file_handler import AtomicFileWriter, read_file, read_text_prefix, write_file, file_exists
 
 def test_read_file_valid(tmp_path):
     # Create a test file with content
@@ -45,4 +45,50 @@ def test_file_exists(tmp_path):
     assert file_exists(str(test_file)) == True
     
     non_existent = tmp_path / "non_existent.txt"
-    assert file_exists(str(non_existent)) == False
\ No newline at end of file
+    assert file_exists(str(non_existent)) == False
+
+def test_read_text_prefix_truncates(tmp_path):
+    test_file = tmp_path / "large.md"
+    test_file.write_text("héllo wörld " * 1000, encoding="utf-8")
+    size = test_file.stat().st_size
+
+    assert read_text_prefix(str(test_file), 11) == ("héllo wörld", True, size)
+    assert read_text_prefix(str(test_file), 11, mmap_threshold=1) == ("héllo wörld", True, size)
+    content, truncated, _ = read_text_prefix(str(test_file))
+    assert len(content) == 12000 and not truncated
+
+def test_read_text_prefix_small_file(tmp_path):
+    test_file = tmp_path / "small.md"
+    test_file.write_text("short é", encoding="utf-8")
+    for threshold in (None, 1):
+        content, truncated, _ = read_text_prefix(str(test_file), 100, mmap_threshold=threshold)
+        assert content == "short é" and not truncated
+
+def test_read_text_prefix_translates_newlines_above_mmap_threshold(tmp_path):
+    test_file = tmp_path / "crlf.md"
+    test_file.write_bytes("Speaker 1: héllo\r\nSpeaker 2: wörld\rend\r\n".encode("utf-8") * 50)
+    size = test_file.stat().st_size
+    for max_chars in (10, 17, 18, 500, 100000):
+        # Below and above the threshold give the same text
+        assert read_text_prefix(str(test_file), max_chars, mmap_threshold=size + 1) == \
+            read_text_prefix(str(test_file), max_chars, mmap_threshold=1)
+    content, _, _ = read_text_prefix(str(test_file), 100000, mmap_threshold=1)
+    assert "\r" not in content and content.startswith("Speaker 1: héllo\nSpeaker 2: wörld\nend\n")
+
+def test_atomic_file_writer(tmp_path):
+    target = tmp_path / "journal.md"
+    target.write_text("old")
+
+    with AtomicFileWriter(str(target)) as writer:
+        writer.write("dropped ")
+        writer.reset()
+        writer.write("new ")
+        writer.write("content")
+        assert target.read_text() == "old"
+        writer.commit()
+    assert target.read_text() == "new content"
+
+    with AtomicFileWriter(str(target)) as writer:
+        writer.write("never committed")
+    assert target.read_text() == "new content"
+    assert sorted(os.listdir(tmp_path)) == ["journal.md"]
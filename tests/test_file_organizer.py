@@ -0,0 +1,69 @@
+import os
+import json
+from utils.file_organizer import FileOrganizer
+
+
+def make_config(tmp_path):
+    config = {key: str(tmp_path / name) for key, name in
+              (('BEE_DATA', 'bee'), ('LIMITLESS_DATA', 'limitless'), ('OUTPUT_DIR', 'journal'))}
+    for path in config.values():
+        os.makedirs(path)
+    return config
+
+
+def touch(path, content="x"):
+    with open(path, 'w') as f:
+        f.write(content)
+
+
+def test_organize_all_directories(tmp_path):
+    config = make_config(tmp_path)
+    touch(os.path.join(config['BEE_DATA'], "2025-04-21-bee.md"))
+    touch(os.path.join(config['BEE_DATA'], "notes.md"))
+    touch(os.path.join(config['LIMITLESS_DATA'], "2024-12-31.md"))
+    touch(os.path.join(config['OUTPUT_DIR'], "2025-04-20.md"))
+    touch(os.path.join(config['OUTPUT_DIR'], ".2025-04-22.md.partial"))
+    touch(os.path.join(config['BEE_DATA'], "2025-13-01.md"))
+
+    assert FileOrganizer().organize_all_directories(config) == (1, 1, 1)
+    assert os.path.exists(os.path.join(config['BEE_DATA'], "2025", "April", "2025-04-21-bee.md"))
+    assert os.path.exists(os.path.join(config['LIMITLESS_DATA'], "2024", "December", "2024-12-31.md"))
+    assert os.path.exists(os.path.join(config['OUTPUT_DIR'], "2025", "April", "2025-04-20.md"))
+    # Undated, invalid and in-progress files stay where they are
+    assert sorted(os.listdir(config['BEE_DATA'])) == ["2025", "2025-13-01.md", "notes.md"]
+    assert os.path.exists(os.path.join(config['OUTPUT_DIR'], ".2025-04-22.md.partial"))
+    assert not os.path.exists(os.path.join(config['OUTPUT_DIR'], ".cache", "organizer_journal.json"))
+
+
+def test_dry_run_moves_nothing(tmp_path, capsys):
+    config = make_config(tmp_path)
+    touch(os.path.join(config['BEE_DATA'], "2025-04-21-bee.md"))
+    assert FileOrganizer().organize_all_directories(config, dry_run=True) == (1, 0, 0)
+    assert os.listdir(config['BEE_DATA']) == ["2025-04-21-bee.md"]
+    assert "2025-04-21-bee.md ->" in capsys.readouterr().out
+
+
+def test_interrupted_run_is_resumed(tmp_path):
+    config = make_config(tmp_path)
+    bee = config['BEE_DATA']
+    moves = []
+    for day in (1, 2, 3):
+        name = f"2025-04-0{day}.md"
+        touch(os.path.join(bee, name), content=name)
+        moves.append([os.path.join(bee, name), os.path.join(bee, "2025", "April", name)])
+
+    # Simulate a crash after the journal was written and the first file was moved
+    journal_path = os.path.join(config['OUTPUT_DIR'], ".cache", "organizer_journal.json")
+    os.makedirs(os.path.dirname(journal_path))
+    with open(journal_path, 'w') as f:
+        json.dump({'moves': moves}, f)
+    os.makedirs(os.path.dirname(moves[0][1]))
+    os.rename(*moves[0])
+    # A file that showed up after the crash is picked up by the normal plan
+    touch(os.path.join(bee, "2025-05-01.md"))
+
+    FileOrganizer().organize_all_directories(config)
+
+    assert sorted(os.listdir(os.path.join(bee, "2025", "April"))) == ["2025-04-01.md", "2025-04-02.md", "2025-04-03.md"]
+    assert os.listdir(os.path.join(bee, "2025", "May")) == ["2025-05-01.md"]
+    assert not os.path.exists(journal_path)
@@ -0,0 +1,56 @@
+import json
+from utils.metrics import RunMetrics
+
+
+def test_stages_counters_and_per_date(tmp_path):
+    metrics = RunMetrics()
+    metrics.observe('api', 1.0)
+    metrics.observe('api', 3.0)
+    with metrics.stage('read', '2025-04-21'):
+        pass
+    metrics.add('prompt_tokens', 100)
+    metrics.add('prompt_tokens', 50)
+    metrics.add('retries', 0)
+
+    summary = metrics.summary()
+    assert summary['stages']['api']['count'] == 2
+    assert summary['stages']['api']['total'] == 4.0
+    assert summary['stages']['api']['max'] == 3.0
+    assert summary['counters'] == {'prompt_tokens': 150}
+    assert list(summary['dates']) == ['2025-04-21']
+
+
+def test_finish_writes_jsonl_and_prometheus_then_resets(tmp_path):
+    jsonl = tmp_path / "metrics.jsonl"
+    prom = tmp_path / "textfile" / "ai_summarizer.prom"
+    metrics = RunMetrics(str(jsonl), str(prom))
+    metrics.observe('generate', 2.5, '2025-04-21')
+    metrics.add('bytes_read', 1234, '2025-04-21')
+
+    summary = metrics.finish(dates_processed=1)
+    assert summary['counters']['dates_processed'] == 1
+
+    records = [json.loads(line) for line in jsonl.read_text().splitlines()]
+    assert [r['type'] for r in records] == ['stage', 'counter', 'counter', 'summary']
+    assert records[0]['date'] == '2025-04-21' and records[0]['seconds'] == 2.5
+
+    text = prom.read_text()
+    assert 'ai_summarizer_stage_seconds{stage="generate"} 2.5' in text
+    assert 'ai_summarizer_last_run_bytes_read 1234' in text
+    assert 'ai_summarizer_last_run_dates_processed 1' in text
+
+    assert metrics.summary()['stages'] == {}
+
+
+def test_counters_are_totalled_per_date():
+    metrics = RunMetrics()
+    metrics.observe('generate', 2.0, '2025-04-21')
+    metrics.add('prompt_tokens', 100, '2025-04-21')
+    metrics.add('prompt_tokens', 40, '2025-04-21')
+    metrics.add('prompt_tokens', 7, '2025-04-22')
+    metrics.add('prompt_tokens', 3)
+
+    summary = metrics.summary()
+    assert summary['counters'] == {'prompt_tokens': 150}
+    assert summary['dates'] == {'2025-04-21': {'generate': 2.0, 'prompt_tokens': 140},
+                                '2025-04-22': {'prompt_tokens': 7}}
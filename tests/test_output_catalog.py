@@ -0,0 +1,67 @@
+import os
+import time
+from utils.output_catalog import OutputCatalog
+from tests.conftest import write
+
+
+def open_catalog(tmp_path):
+    output_dir = str(tmp_path / "journal")
+    return OutputCatalog(os.path.join(output_dir, ".cache", "catalog.json"), output_dir)
+
+
+def test_first_open_catalogs_existing_journals(tmp_path):
+    journal = tmp_path / "journal"
+    write(str(journal / "2025" / "April" / "2025-04-21.md"), "one")
+    write(str(journal / "notes.md"), "undated")
+    write(str(journal / ".cache" / "2025-04-22.md"), "hidden")
+
+    catalog = open_catalog(tmp_path)
+    assert sorted(catalog.paths()) == ["2025-04-21"]
+    assert catalog.get("2025-04-21")['path'] == os.path.join("2025", "April", "2025-04-21.md")
+
+
+def test_records_persist_and_recent_orders_by_mtime(tmp_path):
+    catalog = open_catalog(tmp_path)
+    for i, date in enumerate(("2025-04-21", "2025-04-22", "2025-04-23")):
+        path = str(tmp_path / "journal" / "2025" / "April" / f"{date}.md")
+        write(path, date)
+        os.utime(path, (time.time(), time.time() + i))
+        catalog.record(date, path)
+    catalog.record_inputs("2025-04-22", "fp")
+
+    reopened = open_catalog(tmp_path)
+    assert "2025-04-21" in reopened and len(reopened) == 3
+    assert [os.path.basename(p) for p in reopened.recent(2)] == ["2025-04-23.md", "2025-04-22.md"]
+    assert reopened.get("2025-04-22")['inputs'] == "fp"
+
+
+def test_verify_reports_drift_and_rebuild_fixes_it(tmp_path):
+    catalog = open_catalog(tmp_path)
+    month = tmp_path / "journal" / "2025" / "April"
+    for date in ("2025-04-21", "2025-04-22"):
+        write(str(month / f"{date}.md"), date)
+        catalog.record(date, str(month / f"{date}.md"), inputs=f"fp-{date}")
+
+    os.remove(str(month / "2025-04-21.md"))
+    write(str(month / "2025-04-22.md"), "edited by hand")
+    write(str(month / "2025-04-23.md"), "added by hand")
+
+    assert catalog.verify() == {'missing': ["2025-04-21"], 'changed': ["2025-04-22"],
+                                'untracked': ["2025-04-23"]}
+    assert catalog.rebuild() == 2
+    assert catalog.verify() == {'missing': [], 'changed': [], 'untracked': []}
+    # Journals still in place keep their source fingerprint
+    assert catalog.get("2025-04-22")['inputs'] == "fp-2025-04-22"
+    assert catalog.get("2025-04-23")['inputs'] is None
+
+
+def test_journal_deleted_by_hand_is_dropped_and_regenerated(tmp_path):
+    catalog = open_catalog(tmp_path)
+    path = str(tmp_path / "journal" / "2025" / "April" / "2025-04-21.md")
+    write(path, "one")
+    catalog.record("2025-04-21", path, inputs="fp")
+    assert catalog.exists("2025-04-21")
+
+    os.remove(path)
+    assert not catalog.exists("2025-04-21")
+    assert "2025-04-21" not in open_catalog(tmp_path)
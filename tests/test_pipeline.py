@@ -0,0 +1,93 @@
+import os
+import threading
+import pytest
+from directory_reader import DirectoryReader
+from services.summarizer import Summarizer
+from main import process_dates
+from utils.openai_handler import FatalAPIError
+from tests.conftest import write
+
+DATES = ['2025-04-21', '2025-04-22', '2025-04-23', '2025-04-24', '2025-04-25']
+
+
+@pytest.fixture
+def services(summarizer_config):
+    config = dict(summarizer_config, PIPELINE_WORKERS=2, PIPELINE_QUEUE_SIZE=1)
+    for n, date in enumerate(DATES):
+        write(os.path.join(config['BEE_DATA'], f"{date}-bee.md"),
+              f"Morning walk number {n} with Bruce near the river, then lunch with Laurie about the garden fence.")
+        write(os.path.join(config['LIMITLESS_DATA'], f"{date}.md"),
+              f"Afternoon meeting {n} about the quarterly roadmap, hiring plans and the office move in June.")
+    reader = DirectoryReader(config)
+    summarizer = Summarizer(config)
+    return reader, summarizer
+
+
+def test_pipeline_generates_and_saves_every_date(services):
+    reader, summarizer = services
+    in_flight = []
+    lock = threading.Lock()
+
+    def generate_text(prompt, **kwargs):
+        with lock:
+            in_flight.append(prompt)
+        return "Journal from" + prompt.split("Bee:")[1].split("Limitless:")[0]
+    summarizer.openai.generate_text = generate_text
+
+    assert process_dates(reader, summarizer, DATES, max_concurrency=2) == (5, 0, 0)
+    assert len(in_flight) == 5
+    for date in DATES:
+        with open(summarizer.catalog.path_for(date)) as f:
+            assert f"--- File: {date}-bee.md ---" in f.read()
+        assert summarizer.manifest.get(date) is not None
+
+    counters = summarizer.metrics.summary()['counters']
+    assert counters['bytes_read'] > 0
+    assert 0 < counters['pipeline_preprocess_utilisation'] <= 1
+    assert counters['pipeline_write_busy_seconds'] >= 0
+    # Preprocessing metrics recorded in the worker processes are merged per date
+    assert set(summarizer.metrics.summary()['dates']) == set(DATES)
+
+    # A second run skips every date that is already up to date
+    assert process_dates(reader, summarizer, DATES) == (0, 0, 5)
+
+
+def test_failed_generation_is_counted(services):
+    reader, summarizer = services
+    summarizer.openai.generate_text = lambda prompt, **kwargs: None if "number 2" in prompt else "ok"
+
+    assert process_dates(reader, summarizer, DATES) == (4, 1, 0)
+    assert not summarizer.file_exists_for_date('2025-04-23')
+
+
+def run_with_timeout(function, *args, **kwargs):
+    """Run function on a thread; fail the test instead of hanging if it doesn't return."""
+    outcome = {}
+
+    def target():
+        try:
+            outcome['result'] = function(*args, **kwargs)
+        except BaseException as e:
+            outcome['error'] = e
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout=60)
+    assert not thread.is_alive(), "pipeline hung after a fatal API error"
+    return outcome
+
+
+@pytest.mark.parametrize("fatal", [FatalAPIError("OpenAI authentication failed"), SystemExit(1)])
+def test_fatal_api_error_stops_the_pipeline(services, fatal):
+    reader, summarizer = services
+    calls = []
+
+    def generate_text(prompt, **kwargs):
+        calls.append(prompt)
+        raise fatal
+    summarizer.openai.generate_text = generate_text
+
+    outcome = run_with_timeout(process_dates, reader, summarizer, DATES, max_concurrency=1)
+    assert outcome.get('error') is fatal
+    # The run stops at the first fatal error instead of failing every date
+    assert len(calls) == 1
+    assert len(summarizer.catalog) == 0
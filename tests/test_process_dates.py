@@ -0,0 +1,104 @@
+import os
+import time
+import pytest
+from directory_reader import DirectoryReader
+from services.summarizer import Summarizer
+from main import process_dates
+from tests.conftest import make_summarizer_config, write
+
+DATES = ['2025-04-21', '2025-04-22', '2025-04-23', '2025-04-24', '2025-04-25', '2025-04-26']
+
+
+def make_services(root):
+    config = make_summarizer_config(root, prompt="Bee: {BEE_CONTENT}\nLimitless: {LIMITLESS_CONTENT}")
+    for n, date in enumerate(DATES):
+        write(os.path.join(config['BEE_DATA'], f"{date}-bee.md"),
+              f"Walk number {n} with Bruce near the river, then lunch with Laurie about the garden fence.")
+    # One date only has Bee data
+    for date in DATES[:-1]:
+        write(os.path.join(config['LIMITLESS_DATA'], f"{date}.md"),
+              f"Meeting {date} about the quarterly roadmap, hiring plans and the office move.")
+    reader = DirectoryReader(config)
+    summarizer = Summarizer(config)
+
+    def generate_text(prompt, stream_to=None, **kwargs):
+        # Finish out of order, so concurrent completions interleave
+        time.sleep(0.01 * (len(prompt) % 3))
+        if "number 2" in prompt:
+            return None
+        return "Journal of " + prompt.split("Limitless:")[1].strip()
+    summarizer.openai.generate_text = generate_text
+    return reader, summarizer
+
+
+def journals(summarizer):
+    contents = {}
+    for date, path in summarizer.catalog.paths().items():
+        with open(path) as f:
+            contents[date] = (os.path.relpath(path, summarizer.output_dir), f.read())
+    return contents
+
+
+@pytest.mark.parametrize("max_concurrency", [2, 4])
+def test_concurrent_run_matches_serial_run(tmp_path, max_concurrency):
+    serial_reader, serial = make_services(str(tmp_path / "serial"))
+    concurrent_reader, concurrent = make_services(str(tmp_path / "concurrent"))
+    # An existing journal is skipped by both
+    for summarizer in (serial, concurrent):
+        summarizer.save_summary("Written earlier", DATES[0])
+
+    serial_counts = process_dates(serial_reader, serial, DATES, max_concurrency=1)
+    concurrent_counts = process_dates(concurrent_reader, concurrent, DATES, max_concurrency=max_concurrency)
+
+    assert serial_counts == concurrent_counts == (4, 1, 1)
+    assert journals(serial) == journals(concurrent)
+    assert not concurrent.file_exists_for_date(DATES[2])
+
+
+def test_changed_sources_regenerate_and_replace_an_adopted_journal(tmp_path):
+    root = str(tmp_path)
+    # A journal written before this tool's naming, adopted as the 2025-04-22 journal
+    adopted = os.path.join(root, "journal", "2025", "April", "Journal 2025-04-22 (draft).md")
+    write(adopted, "Written by hand")
+    reader, summarizer = make_services(root)
+
+    assert process_dates(reader, summarizer, DATES) == (4, 1, 1)
+    assert summarizer.catalog.path_for('2025-04-22') == adopted
+    assert process_dates(reader, summarizer, DATES) == (0, 1, 5)
+
+    # New recordings for the adopted date
+    source = os.path.join(reader.config['LIMITLESS_DATA'], "2025-04-22.md")
+    write(source, "Meeting moved to the new office, long discussion about the garden fence.")
+    os.utime(source, (time.time() + 10, time.time() + 10))
+    reader.refresh_index()
+
+    assert process_dates(reader, summarizer, DATES) == (1, 1, 4)
+    path = summarizer.catalog.path_for('2025-04-22')
+    assert os.path.basename(path) == "2025-04-22.md"
+    with open(path) as f:
+        assert "new office" in f.read()
+    assert not os.path.exists(adopted)
+
+
+def test_retrieved_facts_keep_the_prompt_prefix_identical_across_dates(tmp_path):
+    root = str(tmp_path)
+    reader, summarizer = make_services(root)
+    write(summarizer.config['JOURNAL_PROMPT'],
+          "Write a journal.\nBee: {BEE_CONTENT}\nLimitless: {LIMITLESS_CONTENT}\nFacts: {FACTS_CONTENT}")
+    write(os.path.join(summarizer.config['FACTS'], "facts.md"),
+          "- Bruce walks by the river every morning.\n- The quarterly roadmap is owned by Laurie.\n")
+    summarizer.config['FACT_RETRIEVAL_TOP_K'] = 1
+    summarizer.config['FACT_RETRIEVAL_BUDGET_CHARS'] = 60
+    prompts = {}
+
+    def generate_text(prompt, date=None, **kwargs):
+        prompts[date] = prompt
+        return "ok"
+    summarizer.openai.generate_text = generate_text
+
+    process_dates(reader, summarizer, DATES[:1] + DATES[-1:])
+    monday, sunday = prompts[DATES[0]], prompts[DATES[-1]]
+    assert "roadmap" in monday and "roadmap" not in sunday
+
+    # Facts selected per date follow the day's data instead of splitting the prefix
+    assert os.path.commonprefix([monday, sunday]).startswith("Write a journal.\nBee: ")
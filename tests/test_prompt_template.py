@@ -0,0 +1,50 @@
+import os
+from utils.prompt_template import PromptTemplate
+
+TEMPLATE = """Instructions {{not a field}}.
+
+Data:
+Bee Data: {BEE_CONTENT}
+
+Limitless Data: {LIMITLESS_CONTENT}
+
+Known Errors: {ERRORS_CONTENT}
+
+Facts Information: {FACTS_CONTENT}
+"""
+STATIC = ('FACTS_CONTENT', 'ERRORS_CONTENT')
+
+
+def values(bee="bee", limitless="limitless"):
+    return dict(BEE_CONTENT=bee, LIMITLESS_CONTENT=limitless, FACTS_CONTENT="facts", ERRORS_CONTENT="errors")
+
+
+def test_static_fields_move_in_front_of_the_day():
+    prompt = PromptTemplate(TEMPLATE, STATIC).render(**values())
+    assert prompt == ("Instructions {not a field}.\n\nData:\n"
+                      "Known Errors: errors\n\nFacts Information: facts\n\n"
+                      "Bee Data: bee\n\nLimitless Data: limitless\n")
+
+
+def test_prefix_is_identical_across_dates():
+    template = PromptTemplate(TEMPLATE, STATIC)
+    monday = template.render(**values("monday bee", "monday limitless"))
+    tuesday = template.render(**values("tuesday bee", "tuesday limitless"))
+    prefix = template.render_prefix(**values())
+    assert monday.startswith(prefix) and tuesday.startswith(prefix)
+    assert prefix.endswith("Facts Information: facts")
+
+
+def test_template_layout_matches_str_format():
+    template = PromptTemplate(TEMPLATE, STATIC, cache_layout=False)
+    assert template.render(**values()) == TEMPLATE.format(**values())
+
+
+def test_bundled_template_keeps_all_sections():
+    path = os.path.join(os.path.dirname(__file__), '..', 'src', 'templates', 'journal_prompt.md')
+    with open(path) as f:
+        text = f.read()
+    prompt = PromptTemplate(text, STATIC).render(**values())
+    original = text.format(**values())
+    assert sorted(filter(None, prompt.splitlines())) == sorted(filter(None, original.splitlines()))
+    assert prompt.index("Facts Information: facts") < prompt.index("Bee Data: bee")
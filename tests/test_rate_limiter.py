@@ -0,0 +1,97 @@
+import time
+import pytest
+from utils.rate_limiter import RateLimiter, parse_duration, retry_after_seconds, shared_rate_limiter
+from tests.conftest import make_summarizer_config
+
+
+def test_parse_duration():
+    assert parse_duration("6m0s") == 360
+    assert parse_duration("20ms") == 0.02
+    assert parse_duration("1h2m3.5s") == 3723.5
+    assert parse_duration("1.5") == 1.5
+    assert parse_duration(None) is None
+    assert parse_duration("soon") is None
+
+
+def test_retry_after_seconds():
+    assert retry_after_seconds({'retry-after-ms': '250', 'retry-after': '1'}) == 0.25
+    assert retry_after_seconds({'retry-after': '3'}) == 3
+    assert retry_after_seconds({'x-ratelimit-remaining-tokens': '0', 'x-ratelimit-reset-tokens': '1m30s',
+                                'x-ratelimit-remaining-requests': '10', 'x-ratelimit-reset-requests': '5s'}) == 90
+    assert retry_after_seconds({}) is None
+
+
+def test_unknown_limits_never_wait():
+    limiter = RateLimiter()
+    assert all(limiter.acquire(100_000) < 0.01 for _ in range(100))
+    assert limiter.limits() == (None, None)
+
+
+def test_token_bucket_throttles_to_the_limit():
+    # 60,000 tokens/minute = 1,000 tokens/second, starting with a full bucket
+    limiter = RateLimiter(tokens_per_minute=60_000, headroom=1.0)
+    assert limiter.acquire(60_000) < 0.01
+    start = time.monotonic()
+    limiter.acquire(50)
+    assert 0.03 < time.monotonic() - start < 0.5
+
+
+def test_headers_set_limits_and_remaining_budget():
+    limiter = RateLimiter(headroom=0.9)
+    limiter.update({'x-ratelimit-limit-requests': '100', 'x-ratelimit-remaining-requests': '50',
+                    'x-ratelimit-limit-tokens': '10000', 'x-ratelimit-remaining-tokens': '2000'})
+    assert limiter.limits() == (90.0, 9000.0)
+    tokens = limiter.buckets['tokens']
+    assert 1000 <= tokens.level <= 1001
+
+    # A lower remaining count from a later response wins over the local estimate
+    limiter.update({'x-ratelimit-remaining-tokens': '1500', 'x-ratelimit-limit-tokens': '10000'})
+    assert 500 <= tokens.level <= 501
+
+
+def test_settle_returns_unused_reservation():
+    limiter = RateLimiter(tokens_per_minute=10_000, headroom=1.0)
+    limiter.acquire(4000)
+    limiter.settle(4000, 1000)
+    assert limiter.buckets['tokens'].level >= 9000
+
+
+def test_penalize_blocks_callers():
+    limiter = RateLimiter()
+    limiter.penalize(0.05)
+    assert limiter.acquire(1) >= 0.04
+
+
+def test_shared_limiter_per_key():
+    a = shared_rate_limiter(('http://example', 'model-a'))
+    assert shared_rate_limiter(('http://example', 'model-a')) is a
+    assert shared_rate_limiter(('http://example', 'model-b')) is not a
+
+
+def failing_handler(tmp_path, monkeypatch, message):
+    from openai import APIConnectionError
+    from utils.openai_handler import OpenAIHandler
+    monkeypatch.setattr("utils.openai_handler.time.sleep", lambda seconds: None)
+    handler = OpenAIHandler(make_summarizer_config(
+        tmp_path, OPEN_AI_MODEL=f'limiter-test-{message}', RATE_LIMIT_TPM=60_000, RATE_LIMIT_HEADROOM=1.0))
+
+    def create(**request):
+        raise APIConnectionError(message=message, request=None)
+    handler.client.chat.completions.with_raw_response.create = create
+    return handler
+
+
+def test_failed_requests_return_their_token_reservation(tmp_path, monkeypatch):
+    from utils.openai_handler import ContextLengthExceededError
+    prompt = "word " * 20_000
+
+    handler = failing_handler(tmp_path, monkeypatch, "connection reset")
+    # 429s reach the shared limiter instead of being retried inside the SDK
+    assert handler.client.max_retries == 0
+    assert handler.generate_text(prompt) is None
+    assert handler.rate_limiter.buckets['tokens'].level > 59_000
+
+    handler = failing_handler(tmp_path, monkeypatch, "context_length_exceeded")
+    with pytest.raises(ContextLengthExceededError):
+        handler.generate_text(prompt)
+    assert handler.rate_limiter.buckets['tokens'].level > 59_000
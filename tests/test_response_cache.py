@@ -0,0 +1,73 @@
+import os
+import time
+import pytest
+from utils.response_cache import ResponseCache
+
+def test_cache_round_trip_and_counters(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses"))
+    key = ResponseCache.make_key("gpt-4o-mini", "Summarize my day", 0.7)
+
+    assert cache.get(key) is None
+    cache.put(key, "A quiet day.", "gpt-4o-mini")
+    assert cache.get(key) == "A quiet day."
+
+    # A new instance (next run) reads the same entry from disk
+    reloaded = ResponseCache(str(tmp_path / "responses"))
+    assert reloaded.get(key) == "A quiet day."
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+
+def test_key_depends_on_model_prompt_and_temperature():
+    base = ResponseCache.make_key("m", "p", 0.7)
+    assert base == ResponseCache.make_key("m", "p", 0.7)
+    assert base != ResponseCache.make_key("other", "p", 0.7)
+    assert base != ResponseCache.make_key("m", "p2", 0.7)
+    assert base != ResponseCache.make_key("m", "p", 0.2)
+
+def test_bypass_skips_lookup_but_stores(tmp_path):
+    cache_dir = str(tmp_path / "responses")
+    key = ResponseCache.make_key("m", "p", 0.7)
+    bypassed = ResponseCache(cache_dir, bypass=True)
+    bypassed.put(key, "fresh")
+    assert bypassed.get(key) is None
+    assert ResponseCache(cache_dir).get(key) == "fresh"
+
+def test_eviction_by_size_and_age(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses"), max_bytes=400)
+    keys = [ResponseCache.make_key("m", f"prompt {i}", 0.7) for i in range(5)]
+    for i, key in enumerate(keys):
+        cache.put(key, "x" * 100)
+        path = cache._entry_path(key)
+        os.utime(path, (time.time() - 100 + i, time.time() - 100 + i))
+    cache.evict()
+    assert cache.total_bytes <= 400
+    # Least recently used entries go first
+    assert cache.get(keys[0]) is None
+    assert cache.get(keys[-1]) == "x" * 100
+
+    aged = ResponseCache(str(tmp_path / "aged"), max_age_seconds=60)
+    key = ResponseCache.make_key("m", "old", 0.7)
+    aged.put(key, "stale")
+    old = time.time() - 3600
+    os.utime(aged._entry_path(key), (old, old))
+    assert aged.evict() == 1
+    assert aged.get(key) is None
+
+def test_reading_an_entry_does_not_extend_its_age(tmp_path, monkeypatch):
+    now = time.time()
+    clock = [now - 50]
+    monkeypatch.setattr(time, "time", lambda: clock[0])
+    cache = ResponseCache(str(tmp_path / "responses"), max_age_seconds=60)
+    key = ResponseCache.make_key("m", "prompt", 0.7)
+    cache.put(key, "cached")
+    os.utime(cache._entry_path(key), (clock[0], clock[0]))
+
+    # A hit marks the entry as recently used without making it younger
+    clock[0] = now
+    assert cache.get(key) == "cached"
+    assert os.stat(cache._entry_path(key)).st_mtime == pytest.approx(now - 50)
+
+    # get() and evict() agree that it has expired 60 seconds after it was created
+    clock[0] = now + 30
+    assert cache.evict() == 1
+    assert cache.get(key) is None
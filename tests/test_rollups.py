@@ -0,0 +1,69 @@
+import os
+import time
+from datetime import date
+import pytest
+from services.rollups import RollupBuilder
+from tests.conftest import record_prompts
+
+
+@pytest.fixture
+def summarizer(summarizer):
+    return record_prompts(summarizer, lambda prompt: f"rollup {len(summarizer.prompts)}")
+
+
+def save_days(summarizer, first, last):
+    for day in range(first, last + 1):
+        summarizer.save_summary(f"journal of April {day}", f"2025-04-{day:02d}")
+
+
+def test_builds_weeklies_from_dailies_and_monthly_from_weeklies(summarizer):
+    save_days(summarizer, 21, 30)
+    counts = RollupBuilder(summarizer).build(today=date(2025, 5, 10))
+
+    assert counts == {'generated': 3, 'current': 0, 'failed': 0, 'pending': 0}
+    week17, week18, april = summarizer.prompts
+    assert "## 2025-04-22 (Tuesday)\n\njournal of April 22" in week17
+    assert "2025-04-28" not in week17
+    assert "(2025-W18, 2025-04-28 to 2025-05-04)" in week18
+    assert "## 2025-W18 (2025-04-28 to 2025-05-04)" in april
+    # The monthly sees the weeklies, not the dailies
+    assert "## 2025-W17 (2025-04-21 to 2025-04-27)\n\nrollup 1" in april
+    assert "journal of April" not in april
+
+    journal = summarizer.output_dir
+    assert open(os.path.join(journal, "2025", "Weeks", "2025-W17.md")).read() == "rollup 1"
+    assert open(os.path.join(journal, "2025", "April", "2025-04.md")).read() == "rollup 3"
+    # Rollups aren't mistaken for daily journals
+    assert summarizer.catalog.verify()['untracked'] == []
+
+
+def test_only_rollups_of_a_changed_daily_are_regenerated(summarizer):
+    save_days(summarizer, 21, 30)
+    RollupBuilder(summarizer).build(today=date(2025, 5, 10))
+
+    assert RollupBuilder(summarizer).build(today=date(2025, 5, 10))['generated'] == 0
+    assert len(summarizer.prompts) == 3
+
+    path = summarizer.save_summary("journal of April 22, regenerated", "2025-04-22")
+    os.utime(path, (time.time(), time.time() + 10))
+    counts = RollupBuilder(summarizer).build(today=date(2025, 5, 10))
+    assert counts['generated'] == 2 and counts['current'] == 1
+    assert "regenerated" in summarizer.prompts[3]
+    assert "rollup 4" in summarizer.prompts[4]
+
+
+def test_periods_in_progress_wait_unless_partial_rollups_are_enabled(summarizer):
+    save_days(summarizer, 21, 23)
+    assert RollupBuilder(summarizer).build(today=date(2025, 4, 24)) == {
+        'generated': 0, 'current': 0, 'failed': 0, 'pending': 2}
+    assert summarizer.prompts == []
+
+    summarizer.config['ROLLUP_INCLUDE_PARTIAL'] = True
+    assert RollupBuilder(summarizer).build(today=date(2025, 4, 24))['generated'] == 2
+
+
+def test_monthly_waits_for_a_failed_weekly(summarizer):
+    save_days(summarizer, 21, 30)
+    summarizer.openai.generate_text = lambda prompt: None
+    counts = RollupBuilder(summarizer).build(today=date(2025, 5, 10))
+    assert counts == {'generated': 0, 'current': 0, 'failed': 2, 'pending': 1}
@@ -0,0 +1,32 @@
+import os
+from utils.run_manifest import RunManifest, fingerprint_files, fingerprint_text
+
+def test_fingerprint_changes_with_inputs(tmp_path):
+    first = tmp_path / "2025-04-21.md"
+    first.write_text("morning walk")
+    baseline = fingerprint_files([str(first)])
+    assert fingerprint_files([str(first)]) == baseline
+
+    second = tmp_path / "2025-04-21-extra.md"
+    second.write_text("evening call")
+    with_new_file = fingerprint_files([str(first), str(second)])
+    assert with_new_file != baseline
+
+    first.write_text("morning walk, longer")
+    assert fingerprint_files([str(first), str(second)]) != with_new_file
+
+def test_fingerprint_ignores_missing_files(tmp_path):
+    assert fingerprint_files([str(tmp_path / "gone.md")]) == fingerprint_files([])
+
+def test_manifest_round_trip(tmp_path):
+    path = str(tmp_path / "cache" / "manifest.json")
+    template = fingerprint_text("Summarize {BEE_CONTENT}")
+    manifest = RunManifest(path)
+    manifest.record("2025-04-21", "abc", template)
+    manifest.save()
+
+    reloaded = RunManifest(path)
+    assert reloaded.matches("2025-04-21", "abc", template)
+    assert not reloaded.matches("2025-04-21", "def", template)
+    assert not reloaded.matches("2025-04-21", "abc", fingerprint_text("New prompt"))
+    assert not reloaded.matches("2025-04-22", "abc", template)
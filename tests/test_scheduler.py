@@ -0,0 +1,119 @@
+import os
+import sys
+import datetime
+import pytest
+import pytz
+from services.summarizer import Summarizer
+from tests.conftest import make_summarizer_config
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import scheduler
+
+TZ = pytz.timezone('US/Eastern')
+RUN_AT = datetime.time(1, 0)
+
+
+def at(*args):
+    return TZ.localize(datetime.datetime(*args))
+
+
+def last_due(now):
+    return scheduler.last_due_time(now, RUN_AT)
+
+
+def test_due_times_around_the_scheduled_time():
+    assert last_due(at(2025, 4, 21, 0, 59)) == at(2025, 4, 20, 1, 0)
+    assert last_due(at(2025, 4, 21, 1, 0)) == at(2025, 4, 21, 1, 0)
+    assert scheduler.next_due_time(at(2025, 4, 21, 0, 59), RUN_AT) == at(2025, 4, 21, 1, 0)
+    assert scheduler.next_due_time(at(2025, 4, 21, 1, 0), RUN_AT) == at(2025, 4, 22, 1, 0)
+
+
+def test_due_times_across_a_dst_change():
+    # Clocks moved forward at 2:00 on 2025-03-09; the run stays at 1:00 local time
+    assert scheduler.next_due_time(at(2025, 3, 8, 12, 0), RUN_AT) == at(2025, 3, 9, 1, 0)
+    assert scheduler.next_due_time(at(2025, 3, 9, 12, 0), RUN_AT).utcoffset() == datetime.timedelta(hours=-4)
+
+
+class StopDaemon(Exception):
+    pass
+
+
+def test_daemon_survives_a_failed_run(tmp_path, monkeypatch):
+    config = {'OUTPUT_DIR': str(tmp_path / "journal"), 'SCHEDULE_TIMEZONE': 'US/Eastern'}
+    runs = []
+
+    class App:
+        @staticmethod
+        def run_once(config, reader=None, summarizer=None):
+            runs.append(reader)
+            raise RuntimeError("bad date")
+
+    def sleep(seconds):
+        # The daemon went on to wait for its next run
+        raise StopDaemon()
+
+    monkeypatch.setattr(scheduler, 'load_application', lambda: (App, config))
+    monkeypatch.setattr(scheduler.time, 'sleep', sleep)
+    with pytest.raises(StopDaemon):
+        scheduler.run_daemon()
+
+    assert len(runs) == 1
+    # The failed attempt is recorded, so it isn't retried in a tight loop
+    state = scheduler.load_daemon_state(os.path.join(config['OUTPUT_DIR'], '.cache', 'scheduler_state.json'))
+    assert state is not None
+
+
+def failing_summarizer(tmp_path):
+    summarizer = Summarizer(make_summarizer_config(tmp_path, STREAM_RESPONSES=False))
+
+    def generate_text(prompt, **kwargs):
+        raise RuntimeError("unexpected response")
+    summarizer.openai.generate_text = generate_text
+    return summarizer
+
+
+def test_a_failing_date_does_not_exit_the_process(tmp_path):
+    summarizer = failing_summarizer(tmp_path)
+    # Daemon and watch mode catch Exception; process_all used to call sys.exit()
+    assert summarizer.process_all("bee", "limitless", None, None, "2025-04-21") is False
+    assert not summarizer.file_exists_for_date("2025-04-21")
+
+
+class StopWatch(Exception):
+    pass
+
+
+def test_watch_mode_survives_a_failing_date(tmp_path, monkeypatch):
+    summarizer = failing_summarizer(tmp_path)
+    config = {'BEE_DATA': str(tmp_path / "bee"), 'LIMITLESS_DATA': str(tmp_path / "limitless"),
+              'WATCH_QUIET_SECONDS': 0}
+    changes = [["/bee/2025-04-21.md"], ["/bee/2025-04-22.md"]]
+    summarized = []
+
+    class Watcher:
+        def wait_for_changes(self, timeout):
+            if not changes:
+                raise StopWatch()
+            return changes.pop(0)
+
+        def close(self):
+            pass
+
+    class App:
+        @staticmethod
+        def run_once(config):
+            return None, summarizer
+
+        @staticmethod
+        def summarize_dates(config, reader, summarizer, dates):
+            summarized.extend(dates)
+            for date in dates:
+                summarizer.process_all("bee", "limitless", None, None, date)
+
+    monkeypatch.setattr(scheduler, 'load_application', lambda: (App, config))
+    monkeypatch.setattr('services.watcher.create_watcher', lambda roots, backend, interval: Watcher())
+    with pytest.raises(StopWatch):
+        scheduler.run_watch()
+
+    # The failing first date didn't end watch mode
+    assert summarized == ["2025-04-21", "2025-04-22"]
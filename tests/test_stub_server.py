@@ -0,0 +1,100 @@
+import os
+import sys
+import pytest
+from utils.openai_handler import OpenAIHandler, ContextLengthExceededError
+from tests.conftest import make_summarizer_config
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'benchmarks'))
+
+from stub_openai_server import StubOpenAIServer, parse_latency  # noqa: E402
+
+
+def make_handler(server, tmp_path):
+    return OpenAIHandler(make_summarizer_config(
+        tmp_path, OPENAI_BASE_URL=server.base_url, OPENAI_SDK_MAX_RETRIES=0))
+
+
+class Collector:
+    def __init__(self):
+        self.parts = []
+
+    def write(self, text):
+        self.parts.append(text)
+
+    def reset(self):
+        self.parts = []
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr("utils.openai_handler.time.sleep", lambda seconds: None)
+
+
+def test_plain_and_streamed_completions(tmp_path):
+    with StubOpenAIServer(response_words=20, seed=1) as server:
+        handler = make_handler(server, tmp_path)
+        text = handler.generate_text("Summarize my day")
+        assert text.startswith("# Journal")
+
+        collector = Collector()
+        streamed = handler.generate_text("Summarize my day again", stream_to=collector)
+        assert streamed.startswith("# Journal") and "".join(collector.parts) == streamed
+        assert server.stats() == {'requests': 2, '200': 2}
+
+
+def test_token_usage_is_recorded_for_the_date(tmp_path):
+    with StubOpenAIServer(response_words=20, seed=1) as server:
+        handler = make_handler(server, tmp_path)
+        handler.generate_text("Summarize my day", date='2025-04-21')
+        handler.generate_text("Summarize my day again", stream_to=Collector(), date='2025-04-22')
+
+    summary = handler.metrics.summary()
+    for date in ('2025-04-21', '2025-04-22'):
+        assert summary['dates'][date]['prompt_tokens'] > 0
+        assert summary['dates'][date]['completion_tokens'] > 0
+    assert summary['counters']['prompt_tokens'] == sum(
+        summary['dates'][date]['prompt_tokens'] for date in ('2025-04-21', '2025-04-22'))
+
+
+def test_server_errors_are_retried(tmp_path):
+    with StubOpenAIServer(error_rate=1.0, seed=1) as server:
+        handler = make_handler(server, tmp_path)
+        assert handler.generate_text("Summarize my day", max_retries=3) is None
+        assert server.stats()['requests'] == 3
+
+
+def test_rate_limit_burst_then_success(tmp_path):
+    with StubOpenAIServer(retry_after_ms=20, seed=1) as server:
+        server.burst_remaining = 3
+        handler = make_handler(server, tmp_path)
+        # Rate-limit waits follow Retry-After and don't use up the retry budget
+        assert handler.generate_text("Summarize my day", max_retries=2) is not None
+        stats = server.stats()
+        assert stats['429'] == 3 and stats['200'] == 1
+        assert handler.metrics.summary()['counters']['rate_limit_wait_seconds'] == 0.06
+
+
+def test_rate_limit_headers_configure_limiter(tmp_path):
+    with StubOpenAIServer(rpm=600) as server:
+        handler = make_handler(server, tmp_path)
+        handler.generate_text("Summarize my day")
+        requests_per_minute, _ = handler.rate_limiter.limits()
+        assert requests_per_minute == 600 * 0.95
+
+
+def test_context_length_failure(tmp_path):
+    with StubOpenAIServer(max_prompt_chars=100) as server:
+        handler = make_handler(server, tmp_path)
+        with pytest.raises(ContextLengthExceededError):
+            handler.generate_text("x" * 500)
+        assert server.stats()['requests'] == 1
+
+
+def test_parse_latency():
+    import random
+    rng = random.Random(0)
+    assert parse_latency('fixed:250')(rng) == 0.25
+    assert 0.1 <= parse_latency('uniform:100:200')(rng) <= 0.2
+    assert parse_latency('lognormal:300:0.5')(rng) > 0
+    with pytest.raises(ValueError):
+        parse_latency('normal:1')
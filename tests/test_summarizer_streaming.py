@@ -0,0 +1,92 @@
+import os
+import types
+import pytest
+from openai import APIConnectionError
+from services.summarizer import Summarizer
+
+
+def _chunk(text):
+    return types.SimpleNamespace(choices=[types.SimpleNamespace(delta=types.SimpleNamespace(content=text))])
+
+
+class FakeCompletions:
+    """Streams canned tokens; the first attempt can be made to drop mid-stream."""
+
+    def __init__(self, tokens, fail_first_attempt=False):
+        self.tokens = tokens
+        self.fail_first_attempt = fail_first_attempt
+        self.calls = 0
+
+    def create(self, stream=False, **request):
+        self.calls += 1
+        failing = self.fail_first_attempt and self.calls == 1
+
+        def generate():
+            for i, token in enumerate(self.tokens):
+                if failing and i == 2:
+                    raise APIConnectionError(request=None)
+                yield _chunk(token)
+        return generate()
+
+    @property
+    def with_raw_response(self):
+        # Mirrors the SDK: create() returns the headers plus a parse() for the stream
+        return types.SimpleNamespace(create=lambda **request: types.SimpleNamespace(
+            headers={}, parse=lambda: self.create(**request)))
+
+
+@pytest.fixture
+def summarizer(summarizer_config, monkeypatch):
+    # Talks to a fake client through the real OpenAIHandler
+    monkeypatch.setattr("utils.openai_handler.time.sleep", lambda seconds: None)
+    return Summarizer(summarizer_config)
+
+
+def _journal_dir_listing(summarizer):
+    listing = []
+    for root, dirs, files in os.walk(summarizer.output_dir):
+        # The run caches (.cache) live in OUTPUT_DIR too
+        dirs[:] = [d for d in dirs if not d.startswith('.')]
+        listing.extend(files)
+    return sorted(listing)
+
+
+def test_streamed_journal_is_renamed_into_place(summarizer):
+    completions = FakeCompletions(["# Summary", " of ", "Monday"])
+    summarizer.openai.client = types.SimpleNamespace(chat=types.SimpleNamespace(completions=completions))
+
+    assert summarizer.generate_journal("2025-04-21", "bee", None)
+    with open(summarizer.existing_files["2025-04-21"]) as f:
+        assert f.read() == "# Summary of Monday"
+    assert _journal_dir_listing(summarizer) == ["2025-04-21.md"]
+    stages = summarizer.metrics.summary()['stages']
+    assert stages['api']['count'] == 1
+    assert stages['api_first_token']['total'] <= stages['api']['total']
+
+
+def test_dropped_stream_is_retried_from_scratch(summarizer):
+    completions = FakeCompletions(["one ", "two ", "three"], fail_first_attempt=True)
+    summarizer.openai.client = types.SimpleNamespace(chat=types.SimpleNamespace(completions=completions))
+
+    assert summarizer.generate_journal("2025-04-21", "bee", None)
+    assert completions.calls == 2
+    with open(summarizer.existing_files["2025-04-21"]) as f:
+        assert f.read() == "one two three"
+
+
+def test_failed_generation_leaves_no_partial_journal(summarizer):
+    summarizer.openai.generate_text = lambda prompt, **kwargs: kwargs['stream_to'].write("half a jour") or None
+
+    assert not summarizer.generate_journal("2025-04-21", "bee", None)
+    assert _journal_dir_listing(summarizer) == []
+    assert not summarizer.file_exists_for_date("2025-04-21")
+
+
+def test_journal_deleted_by_hand_needs_update(summarizer):
+    path = summarizer.save_summary("journal", "2025-04-21")
+    summarizer.record_inputs("2025-04-21", "fp")
+    assert not summarizer.needs_update("2025-04-21", "fp")
+
+    os.remove(path)
+    assert not summarizer.file_exists_for_date("2025-04-21")
+    assert summarizer.needs_update("2025-04-21", "fp")
@@ -0,0 +1,22 @@
+import pytest
+from utils.text_chunker import split_text
+
+def test_split_prefers_file_and_paragraph_boundaries():
+    text = "\n\n--- File: a.md ---\n" + "alpha " * 30 + "\n\n--- File: b.md ---\n" + "beta " * 30
+    chunks = split_text(text, 220)
+    assert len(chunks) == 2
+    assert chunks[0].startswith("--- File: a.md ---")
+    assert chunks[1].startswith("--- File: b.md ---")
+
+def test_split_respects_limit_and_keeps_words():
+    text = " ".join(f"word{i}" for i in range(500))
+    chunks = split_text(text, 100)
+    assert all(len(chunk) <= 100 for chunk in chunks)
+    assert " ".join(chunks).split() == text.split()
+
+def test_split_edge_cases():
+    assert split_text("", 10) == []
+    assert split_text(None, 10) == []
+    assert split_text("short", 10) == ["short"]
+    with pytest.raises(ValueError):
+        split_text("text", 0)
@@ -0,0 +1,29 @@
+import os
+import sys
+import subprocess
+import pytest
+from utils.text_normalizer import TextNormalizer
+
+def test_tokenizer_splits_like_treebank():
+    tokens = TextNormalizer().tokenize("I don't know, Bee's call at 10:30... it's well-known")
+    assert tokens == ['I', 'do', "n't", 'know', ',', 'Bee', "'s", 'call', 'at', '10:30',
+                      '...', 'it', "'s", 'well-known']
+
+def test_normalize_removes_stopwords_and_repetitions():
+    normalizer = TextNormalizer()
+    text = "I walked the dog to the park, then we had coffee and talked about the garden."
+    assert normalizer.normalize(text) == "walked dog park , coffee talked garden ."
+    assert normalizer.normalize("yeah yeah yeah yeah went store yeah yeah") == "went store"
+    assert normalizer.normalize("") == ""
+    assert normalizer.normalize(None) is None
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        TextNormalizer('slow')
+
+def test_importing_main_does_not_load_nltk_or_openai():
+    src_dir = os.path.join(os.path.dirname(__file__), '..', 'src')
+    code = ("import sys; sys.path.insert(0, %r); import main; "
+            "print('nltk' in sys.modules, 'openai' in sys.modules)" % src_dir)
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    assert result.stdout.split()[-2:] == ['False', 'False']
@@ -0,0 +1,149 @@
+import os
+import sys
+import types
+import hashlib
+from utils.token_budget import (TokenCounter, BudgetPlanner, TRIM_MARKER, allocate, compact,
+                                context_tokens, max_file_chars, max_prompt_chars,
+                                format_budget_report)
+from tests.conftest import make_summarizer_config, record_prompts
+
+
+def transcript(*files):
+    return "".join(f"\n\n--- File: {name} ---\n{content}" for name, content in files)
+
+
+def words(n, word="walk"):
+    return "\n".join(" ".join([word] * 10) for _ in range(n // 10))
+
+
+def test_approximate_counter():
+    counter = TokenCounter(mode='approximate')
+    assert counter.method == 'approximate'
+    assert counter.count("") == 0
+    assert counter.count("Met Laurie at 10:30, then lunch.") == 10
+    assert counter.count("internationalization") == 3
+    assert counter.count("123456789") == 3
+
+
+def test_allocate_is_weighted_and_keeps_no_headroom_idle():
+    # Small components keep all they need; the rest is shared by weight
+    allocation = allocate({'FACTS': 100, 'BEE': 5000, 'LIMITLESS': 5000}, 3100, {'BEE': 2, 'LIMITLESS': 1})
+    assert allocation['FACTS'] == 100
+    assert allocation['BEE'] == 2000 and allocation['LIMITLESS'] == 1000
+    assert allocate({'BEE': 10, 'LIMITLESS': 20}, 1000) == {'BEE': 10, 'LIMITLESS': 20}
+
+
+def test_days_that_fit_are_untouched():
+    planner = BudgetPlanner(TokenCounter(mode='approximate'), context_tokens=1000, completion_reserve=100)
+    components = {'FACTS': "- Bruce is the dog", 'ERRORS': None, 'BEE': "walk   walk\n\n\n\nwalk", 'LIMITLESS': None}
+    reduced, report = planner.plan(50, components)
+    assert reduced == components
+    assert report['fits'] and report['saved'] == {}
+    assert format_budget_report("2025-04-21", report).startswith("✓ Token budget for 2025-04-21")
+
+
+def test_compaction_is_tried_before_trimming():
+    planner = BudgetPlanner(TokenCounter(mode='approximate'), context_tokens=30, completion_reserve=0)
+    padded = "\n".join("walked   the    dog  " for _ in range(5))
+
+    # Whitespace alone pushes the day over budget: compacting it is enough
+    reduced, report = planner.plan(0, {'BEE': padded})
+    assert reduced['BEE'] == "\n".join("walked the dog" for _ in range(5))
+    assert report['saved'] == {'compact': 15}
+    assert report['fits']
+
+    # Otherwise the day is trimmed as well
+    reduced, report = planner.plan(0, {'BEE': padded * 2})
+    assert report['saved']['compact'] > 0 and report['saved']['trim'] > 0
+    assert reduced['BEE'].endswith(TRIM_MARKER)
+    assert report['fits']
+
+
+def test_transcripts_are_trimmed_fairly_across_files():
+    counter = TokenCounter(mode='approximate')
+    planner = BudgetPlanner(counter, context_tokens=700, completion_reserve=0)
+    bee = transcript(("short.md", words(50)), ("long-a.md", words(2000)), ("long-b.md", words(2000)))
+    facts = "- Bruce is the dog\n- Laurie is a friend"
+
+    reduced, report = planner.plan(0, {'FACTS': facts, 'ERRORS': None, 'BEE': bee, 'LIMITLESS': None})
+
+    assert report['fits'] and counter.count(reduced['BEE']) + counter.count(reduced['FACTS']) <= 700
+    # Facts fit their share and the short file is kept whole; both long files are cut
+    assert reduced['FACTS'] == facts
+    assert report['components']['BEE']['files_trimmed'] == 2
+    sections = reduced['BEE'].split("\n\n--- File: ")[1:]
+    assert sections[0] == "short.md ---\n" + words(50)
+    long_sizes = [counter.count(section) for section in sections[1:]]
+    assert abs(long_sizes[0] - long_sizes[1]) <= 12
+    assert "2 file(s) trimmed" in format_budget_report("2025-04-21", report)
+
+
+def test_context_and_read_limits_from_config():
+    assert context_tokens({'OPEN_AI_MODEL': 'gpt-4o-mini'}) == 128000
+    assert context_tokens({'OPEN_AI_MODEL': 'gpt-4'}) == 8192
+    assert context_tokens({'OPEN_AI_MODEL': 'gpt-4.1-mini', 'TOKEN_BUDGET_CONTEXT': 5000}) == 5000
+    assert max_file_chars({'OPEN_AI_MODEL': 'gpt-4o-mini'}) == 128000 * 8
+    assert max_file_chars({'MAX_FILE_CHARS': None, 'TOKEN_BUDGET': True}) is None
+    assert max_file_chars({'TOKEN_BUDGET': True, 'OPEN_AI_MODEL': 'gpt-4'}) == 8192 * 8
+    assert max_prompt_chars({'OPEN_AI_MODEL': 'gpt-4'}) == (8192 - 4096) * 4
+    assert max_prompt_chars({'OPEN_AI_MODEL': 'gpt-4', 'MAX_PROMPT_CHARS': None}) is None
+    assert max_prompt_chars({'OPEN_AI_MODEL': 'gpt-4', 'TOKEN_BUDGET': True}) is None
+    assert compact("a  b \n\n\n\nc") == "a b\n\nc"
+
+
+def budget_summarizer(tmp_path, prompt):
+    """A Summarizer with a 1,000-token budget that records its prompts."""
+    from services.summarizer import Summarizer
+    return record_prompts(Summarizer(make_summarizer_config(
+        tmp_path, prompt, STREAM_RESPONSES=False, TOKEN_BUDGET=True, TOKEN_BUDGET_CONTEXT=1200,
+        TOKEN_BUDGET_COMPLETION_RESERVE=200, TOKEN_COUNTER='approximate')))
+
+
+def test_summarizer_fits_prompt_and_reports(tmp_path):
+    summarizer = budget_summarizer(tmp_path, "Write a journal.\nFacts: {FACTS_CONTENT}\nErrors: {ERRORS_CONTENT}\n"
+                                             "Bee: {BEE_CONTENT}\nLimitless: {LIMITLESS_CONTENT}")
+    prompts = summarizer.prompts
+
+    bee = transcript(("2025-04-21-bee.md", words(3000)))
+    assert summarizer.generate_journal("2025-04-21", bee, None, "- Bruce is the dog")
+    assert summarizer.budget.counter.count(prompts[0]) <= 1000
+    assert "- Bruce is the dog" in prompts[0] and TRIM_MARKER in prompts[0]
+    counters = summarizer.metrics.summary()['counters']
+    assert counters['budget_trim_tokens'] > 2000
+
+
+def test_prompt_prefix_stays_identical_when_the_budget_trims_facts(tmp_path):
+    summarizer = budget_summarizer(tmp_path, "Write a journal.\nBee: {BEE_CONTENT}\nLimitless: {LIMITLESS_CONTENT}\n"
+                                             "Facts: {FACTS_CONTENT}\nErrors: {ERRORS_CONTENT}")
+    prompts = summarizer.prompts
+
+    facts = words(400, "fact")
+    assert summarizer.generate_journal("2025-04-21", transcript(("2025-04-21-bee.md", words(100))), None, facts)
+    assert summarizer.generate_journal("2025-04-22", transcript(("2025-04-22-bee.md", words(3000))), None, facts)
+    assert facts in prompts[0] and facts not in prompts[1]
+
+    # Facts trimmed for one date only follow the day's data instead of splitting the prefix
+    assert os.path.commonprefix(prompts).startswith("Write a journal.\nBee: ")
+
+
+def test_tiktoken_data_is_never_downloaded_in_auto_mode(tmp_path, monkeypatch):
+    loaded = []
+    encoding = types.SimpleNamespace(encode=lambda text, disallowed_special=(): text.split())
+    model = types.ModuleType("tiktoken.model")
+    model.encoding_name_for_model = lambda name: "o200k_base"
+    fake = types.ModuleType("tiktoken")
+    fake.model = model
+    fake.get_encoding = lambda name: loaded.append(name) or encoding
+    monkeypatch.setitem(sys.modules, "tiktoken", fake)
+    monkeypatch.setitem(sys.modules, "tiktoken.model", model)
+    monkeypatch.setenv("TIKTOKEN_CACHE_DIR", str(tmp_path))
+
+    # Not cached: approximate without asking tiktoken to load (and download) the encoding
+    assert TokenCounter("gpt-4o-mini").method == 'approximate'
+    assert loaded == []
+
+    url = "https://openaipublic.blob.core.windows.net/encodings/o200k_base.tiktoken"
+    (tmp_path / hashlib.sha1(url.encode()).hexdigest()).write_bytes(b"cached")
+    counter = TokenCounter("gpt-4o-mini")
+    assert counter.method == 'tiktoken' and loaded == ["o200k_base"]
+    assert counter.count("two words") == 2
@@ -0,0 +1,86 @@
+import os
+import pytest
+from directory_reader import DirectoryReader
+from utils.transcript_store import TranscriptStore
+
+TRANSCRIPTS = {
+    'bee/2025/April/2025-04-21-bee.md': "Met Laurie at the dentist to talk about the garden project and the new fence.",
+    'bee/2025-04-22-bee.md': "Long walk with Bruce along the river, then groceries and a call with mum.",
+    'limitless/2025-04-21.md': "Standup about the quarterly roadmap, followed by a dentist appointment downtown.",
+}
+
+
+def write(root, relative_path, content):
+    path = os.path.join(root, relative_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(content)
+    return path
+
+
+def make_config(tmp_path, store='sqlite'):
+    root = str(tmp_path)
+    for relative_path, content in TRANSCRIPTS.items():
+        write(root, relative_path, content)
+    return {
+        'BEE_DATA': os.path.join(root, 'bee'),
+        'LIMITLESS_DATA': os.path.join(root, 'limitless'),
+        'OUTPUT_DIR': os.path.join(root, 'journal'),
+        'TRANSCRIPT_STORE': store,
+    }
+
+
+def test_sqlite_backend_matches_file_backend(tmp_path):
+    config = make_config(tmp_path)
+    store_reader = DirectoryReader(config)
+    file_reader = DirectoryReader(dict(config, TRANSCRIPT_STORE='files', CACHE_DIR=str(tmp_path / "other")))
+
+    assert store_reader.get_all_dates() == file_reader.get_all_dates() == {'2025-04-21', '2025-04-22'}
+    for date in ('2025-04-21', '2025-04-22', '2025-04-23'):
+        for source in ('BEE', 'LIMITLESS'):
+            assert store_reader.get_files_for_date(date, source) == file_reader.get_files_for_date(date, source)
+            assert store_reader.read_data_for_date(date, source) == file_reader.read_data_for_date(date, source)
+
+
+def test_ingestion_is_incremental(tmp_path):
+    config = make_config(tmp_path)
+    reader = DirectoryReader(config)
+    reader.refresh_index()
+
+    # Nothing changed: nothing is read again
+    reader._load_file = lambda *args: pytest.fail("unchanged file was read again")
+    reader.refresh_index()
+    del reader._load_file
+
+    root = str(tmp_path)
+    write(root, 'bee/2025-04-22-bee.md', "Rewritten transcript about painting the shed.")
+    write(root, 'limitless/2025-04-23.md', "A brand new day with a haircut.")
+    os.remove(os.path.join(root, 'bee/2025/April/2025-04-21-bee.md'))
+    reopened = DirectoryReader(config)
+    reopened.refresh_index()
+
+    assert reopened.get_all_dates() == {'2025-04-21', '2025-04-22', '2025-04-23'}
+    assert reopened.get_files_for_date('2025-04-21', 'BEE') == []
+    (content,) = reopened.store.conn.execute(
+        "SELECT content FROM files WHERE path LIKE '%2025-04-22-bee.md'").fetchone()
+    assert "shed" in content
+
+
+def test_search_and_settings_change(tmp_path):
+    config = make_config(tmp_path)
+    reader = DirectoryReader(config)
+    if not reader.store.fts:
+        pytest.skip("SQLite build without FTS5")
+
+    results = reader.search('dentist')
+    assert sorted((date, source) for date, source, _, _ in results) == [('2025-04-21', 'BEE'), ('2025-04-21', 'LIMITLESS')]
+    assert all('[dentist]' in snippet for _, _, _, snippet in results)
+    assert reader.search('"garden project"')[0][2].endswith('2025-04-21-bee.md')
+    # Malformed FTS5 syntax is reported instead of raising
+    assert reader.search('"garden project') == []
+    reader.store.close()
+
+    # Stored text depends on the preprocessing settings
+    db_path = os.path.join(config['OUTPUT_DIR'], '.cache', 'transcripts.db')
+    store = TranscriptStore(db_path, settings={'MAX_FILE_CHARS': 10})
+    assert store.dates() == set()
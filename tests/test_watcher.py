@@ -0,0 +1,31 @@
+import os
+from services.watcher import DateDebouncer, PollingWatcher
+
+def test_debouncer_releases_dates_after_quiet_period():
+    debouncer = DateDebouncer(quiet_seconds=60)
+    assert debouncer.record(["/bee/2025/April/2025-04-21.md", "/bee/notes.md"], now=0) == {"2025-04-21"}
+    debouncer.record(["/limitless/2025-04-22.md"], now=30)
+
+    assert debouncer.pop_settled(now=59) == []
+    assert debouncer.next_deadline(now=59) == 1
+
+    # Another change restarts the quiet period for that date only
+    debouncer.record(["/bee/2025/April/2025-04-21-late.md"], now=59)
+    assert debouncer.pop_settled(now=90) == ["2025-04-22"]
+    assert debouncer.pop_settled(now=119) == ["2025-04-21"]
+    assert debouncer.next_deadline() is None
+
+def test_polling_watcher_reports_new_changed_and_deleted_files(tmp_path):
+    existing = tmp_path / "2025-04-20.md"
+    existing.write_text("a")
+    watcher = PollingWatcher([str(tmp_path)], interval=0)
+
+    added = tmp_path / "April" / "2025-04-21.md"
+    added.parent.mkdir()
+    added.write_text("b")
+    assert watcher.wait_for_changes(0) == [str(added)]
+
+    existing.write_text("longer content")
+    os.remove(added)
+    assert sorted(watcher.wait_for_changes(0)) == sorted([str(existing), str(added)])
+    assert watcher.wait_for_changes(0) == []